@@ -8,56 +8,136 @@ import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import json
-import requests
-import io
+from flask import jsonify
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from dashboard.dashboard_components import create_kpi_card, create_header, create_footer
+from dashboard.dashboard_components import (create_kpi_card, create_header, create_footer, create_filter_bar,
+                                             create_tab_placeholder)
 from dashboard.pages.reports import get_reports_layout
 from dashboard.pages.settings import get_settings_layout
+from src.artifact_store import ArtifactStore
+from src.figure_cache import FigureCache
+from src.scatter_plots import scatter_figure
+from src.shared_dataset import SharedDataset, publish_dataset
 
-# Import pipeline scripts
-from scripts.run_pipeline import run_cleaning_pipeline
-from scripts.run_features import run_feature_engineering
-from scripts.run_forecasting import run_forecasting
-from scripts.run_advanced import run_advanced_analytics
+# Background jobs for dataset loading
+from src.job_queue import JobExecutor, TERMINAL_STATES, SUCCEEDED
+from dashboard.dataset_jobs import ingest_dataset
 
 # Load Data
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed')
-RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw')
+JOBS_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'jobs.db')
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'reports')
+FIGURE_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'cache', 'figures')
+SHARED_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'shared')
+
+# Published (memory-mapped) dataset shared by every server worker; see src/shared_dataset.py
+shared_dataset = SharedDataset(SHARED_DIR)
+
+# data/shared is not checked in: publish the cleaned artifact once at startup so a
+# fresh checkout has data before the pipeline or an ingest job publishes again
+if shared_dataset.current_version() is None and ArtifactStore(DATA_DIR).exists('retail_sales_cleaned'):
+    publish_dataset(ArtifactStore(DATA_DIR), base_dir=SHARED_DIR)
+
+def load_shared_dataset():
+    """The published dataset CURRENT points to, or None before anything has been published.
+
+    Publishing happens at startup, in the pipeline and in ingest jobs, never inside a request.
+    """
+    return shared_dataset.get()
+
+def load_aggregates_cached():
+    shared = load_shared_dataset()
+    return shared.aggs if shared is not None else None
+
+def load_query_engine():
+    shared = load_shared_dataset()
+    return shared.engine if shared is not None else None
+
+# Rendered figures keyed by data version, figure id and filters (memory LRU + disk tier)
+figure_cache = FigureCache(disk_dir=FIGURE_CACHE_DIR)
+
+def cached_figure(figure_id, build, filters=None):
+    """Figure for the current data version; build() only runs on a cache miss."""
+    return figure_cache.get_or_build(shared_dataset.version, figure_id, build, filters)
+
+# Columns of the transactions shown in the Profit vs Discount chart
+SCATTER_COLUMNS = ['Discount', 'Profit', 'Category', 'Product Name']
+
+def current_filters(start_date, end_date, regions, categories, segments):
+    """Query engine filters from the filter bar, or None when nothing is filtered."""
+    filters = {'start': start_date, 'end': end_date, 'Region': regions or [],
+               'Category': categories or [], 'Segment': segments or []}
+    return filters if any(filters.values()) else None
+
+def filtered_aggregates(filters):
+    """Dashboard aggregates for the filters (the materialized ones when unfiltered)."""
+    if filters is None:
+        return load_aggregates_cached()
+    return load_query_engine().aggregate(filters)
+
+def profit_vs_discount_figure(filters=None, x_range=None, y_range=None):
+    """Profit vs Discount for the given zoom window: markers when few points are in view, 2-D bins otherwise."""
+    return style_figure(scatter_figure(
+        load_query_engine().frame(filters, SCATTER_COLUMNS), 'Discount', 'Profit', color='Category',
+        x_range=x_range, y_range=y_range, hover_name='Product Name', color_sequence=px.colors.qualitative.Vivid
+    )).update_layout(hovermode='closest', uirevision='profit-vs-discount')
+
+def zoom_ranges(relayout_data):
+    """(x_range, y_range) from a graph's relayoutData; None for an axis that is autoscaled."""
+    ranges = []
+    for axis in ('xaxis', 'yaxis'):
+        if f'{axis}.range[0]' in relayout_data:
+            ranges.append([relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']])
+        elif f'{axis}.range' in relayout_data:
+            ranges.append(list(relayout_data[f'{axis}.range']))
+        else:
+            ranges.append(None)
+    return tuple(ranges)
+
+def load_reports():
+    """(metrics, insights) written by the forecasting and advanced analytics stages."""
+    # Rolling-origin backtests take precedence over the single holdout while they were
+    # computed on the current features
+    backtest_path = os.path.join(REPORTS_DIR, 'backtest_metrics.json')
+    metrics_path = os.path.join(REPORTS_DIR, 'model_metrics.json')
+    backtest = None
+    if os.path.exists(backtest_path):
+        with open(backtest_path, 'r') as f:
+            backtest = json.load(f)
+        if backtest.get('data_version') != ArtifactStore(DATA_DIR).data_version('daily_sales_features'):
+            backtest = None
+    if backtest is not None:
+        metrics = backtest['summary']
+    elif os.path.exists(metrics_path):
+        with open(metrics_path, 'r') as f:
+            metrics = json.load(f)
+    else:
+        metrics = {}
+        
+    # Load advanced insights if available
+    insights_path = os.path.join(REPORTS_DIR, 'advanced_insights.json')
+    if os.path.exists(insights_path):
+        with open(insights_path, 'r') as f:
+            insights = json.load(f)
+    else:
+        insights = {}
+    return metrics, insights
 
 def load_global_data():
     try:
-        df = pd.read_csv(os.path.join(DATA_DIR, 'retail_sales_cleaned.csv'))
-        df['Order Date'] = pd.to_datetime(df['Order Date'])
-        
-        # Load forecast metrics if available
-        metrics_path = os.path.join(REPORTS_DIR, 'model_metrics.json')
-        if os.path.exists(metrics_path):
-            with open(metrics_path, 'r') as f:
-                metrics = json.load(f)
-        else:
-            metrics = {}
-            
-        # Load advanced insights if available
-        insights_path = os.path.join(REPORTS_DIR, 'advanced_insights.json')
-        if os.path.exists(insights_path):
-            with open(insights_path, 'r') as f:
-                insights = json.load(f)
-        else:
-            insights = {}
-            
-        return df, metrics, insights
+        aggs = load_aggregates_cached()
+        metrics, insights = load_reports()
+        return aggs, metrics, insights
         
     except Exception as e:
         print(f"Error loading data: {e}")
-        return pd.DataFrame(), {}, {}
+        return None, {}, {}
 
 # Initial Load
-df, metrics, insights = load_global_data()
+aggs, metrics, insights = load_global_data()
 
 # Initialize App with Dark Theme
 app = dash.Dash(__name__, 
@@ -65,6 +145,23 @@ app = dash.Dash(__name__,
                 suppress_callback_exceptions=True)
 app.title = "Retail Analytics AI"
 
+# WSGI entry point for multi-worker serving, e.g. gunicorn -w 4 dashboard.dashboard_app:server
+server = app.server
+
+# Local job executor (no external broker); the job table persists in data/jobs.db
+job_executor = JobExecutor(db_path=JOBS_DB_PATH, max_workers=1)
+
+@app.server.route('/api/jobs/<job_id>')
+def job_status_endpoint(job_id):
+    job = job_executor.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.server.route('/api/figure-cache')
+def figure_cache_endpoint():
+    return jsonify(figure_cache.stats())
+
 # Helper to style figures
 def style_figure(fig):
     fig.update_layout(
@@ -77,166 +174,185 @@ def style_figure(fig):
     )
     return fig
 
-# Dashboard Layout (The original layout)
+# Summary chart builders for a set of aggregates, keyed by figure id
+def summary_figures(aggs):
+    return {
+        'sales_trend': lambda: style_figure(px.line(
+            aggs['monthly'], 
+            x='Order Date', y='Total Sales', 
+            color_discrete_sequence=['#3b82f6']
+        )).update_layout(height=350),
+        'category_pie': lambda: style_figure(px.pie(
+            aggs['category'], values='Total Sales', names='Category', 
+            color_discrete_sequence=px.colors.qualitative.Pastel
+        ).update_traces(textposition='inside', textinfo='percent+label')).update_layout(height=350),
+        'region_sales': lambda: style_figure(px.bar(
+            aggs['region'],
+            x='Region', y='Total Sales', color='Region',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )),
+        'region_profit': lambda: style_figure(px.bar(
+            aggs['region'],
+            x='Region', y='Profit', color='Region',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )),
+        'state_map': lambda: style_figure(px.choropleth(
+            aggs['state'],
+            locations='State', locationmode="USA-states",
+            color='Total Sales', scope="usa", 
+            color_continuous_scale="Viridis"
+        )),
+        'top_products': lambda: style_figure(px.bar(
+            aggs['product'].nlargest(10, 'Total Sales'),
+            y='Product Name', x='Total Sales', orientation='h',
+            color='Total Sales', color_continuous_scale='Bluyl'
+        )),
+    }
+
+def kpi_cards(kpis):
+    return [
+        dbc.Col(create_kpi_card("Total Sales", f"${kpis['Total Sales']:,.0f}", "success"), width=12, md=6, lg=3),
+        dbc.Col(create_kpi_card("Total Profit", f"${kpis['Total Profit']:,.0f}", "info"), width=12, md=6, lg=3),
+        dbc.Col(create_kpi_card("Total Orders", f"{kpis['Total Orders']:,}", "primary"), width=12, md=6, lg=3),
+        dbc.Col(create_kpi_card("Profit Margin", f"{kpis['Profit Margin']:.1f}%", "warning"), width=12, md=6, lg=3),
+    ]
+
+# Dashboard tabs: value -> label. Only the selected tab is rendered (see render_tab)
+DASHBOARD_TABS = {
+    'summary': 'Executive Summary',
+    'regional': 'Regional Performance',
+    'products': 'Product Insights',
+    'forecasting': 'Forecasting & Analytics',
+}
+
+def chart_card(title, graph_id, figure, class_name="glass-card p-4", **graph_kwargs):
+    return html.Div([
+        html.H4(title, className="text-white mb-3"),
+        dcc.Graph(id=graph_id, figure=figure, **graph_kwargs)
+    ], className=class_name)
+
+def summary_tab(filters):
+    aggs = filtered_aggregates(filters)
+    figures = summary_figures(aggs)
+    return [
+        dbc.Row(kpi_cards(aggs['kpis']), id='kpi-row', className="g-4 mb-4"),
+        dbc.Row([
+            dbc.Col([
+                chart_card("Sales Trend", 'sales-trend-graph', cached_figure('sales_trend', figures['sales_trend'], filters),
+                           config={'responsive': True, 'displayModeBar': False}, style={'height': '350px'})
+            ], width=12, lg=8),
+            dbc.Col([
+                chart_card("Category Distribution", 'category-pie-graph',
+                           cached_figure('category_pie', figures['category_pie'], filters),
+                           config={'responsive': True, 'displayModeBar': False}, style={'height': '350px'})
+            ], width=12, lg=4),
+        ], className="g-4 mb-4")
+    ]
+
+def regional_tab(filters):
+    figures = summary_figures(filtered_aggregates(filters))
+    return [
+        dbc.Row([
+            dbc.Col([
+                chart_card("Sales by Region", 'region-sales-graph',
+                           cached_figure('region_sales', figures['region_sales'], filters), "glass-card p-4 mb-4")
+            ], width=6),
+            dbc.Col([
+                chart_card("Profit by Region", 'region-profit-graph',
+                           cached_figure('region_profit', figures['region_profit'], filters), "glass-card p-4 mb-4")
+            ], width=6),
+        ]),
+        dbc.Row([
+            dbc.Col([
+                chart_card("Geographic Sales Map", 'state-map-graph',
+                           cached_figure('state_map', figures['state_map'], filters))
+            ], width=12)
+        ])
+    ]
+
+def products_tab(filters):
+    figures = summary_figures(filtered_aggregates(filters))
+    return [
+        dbc.Row([
+            dbc.Col([
+                chart_card("Top 10 Products by Sales", 'top-products-graph',
+                           cached_figure('top_products', figures['top_products'], filters), "glass-card p-4 mb-4")
+            ], width=6),
+            dbc.Col([
+                chart_card("Profit vs Discount", 'profit-discount-graph',
+                           cached_figure('profit_vs_discount', lambda: profit_vs_discount_figure(filters), filters),
+                           "glass-card p-4 mb-4")
+            ], width=6),
+        ])
+    ]
+
+def format_metric(value, spec):
+    """Formats a metric, with a dash for missing values (e.g. the std of a single fold)."""
+    if value is None or pd.isna(value):
+        return "–"
+    return format(value, spec)
+
+def forecasting_tab(filters):
+    # Model metrics and insights come from the reports and do not depend on the filters
+    metrics, insights = load_reports()
+    return [
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.H4("Model Performance", className="text-white mb-3"),
+                    dbc.Table([
+                        html.Thead(html.Tr([html.Th("Model"), html.Th("RMSE"), html.Th("MAE"), html.Th("MAPE"), html.Th("Folds")])),
+                        html.Tbody([
+                            html.Tr([html.Td(name),
+                                     html.Td(format_metric(m.get('RMSE'), '.2f')
+                                             + (f" ± {format_metric(m['RMSE Std'], '.2f')}" if 'RMSE Std' in m else "")),
+                                     html.Td(format_metric(m.get('MAE'), '.2f')),
+                                     html.Td(format_metric(m.get('MAPE'), '.2%')),
+                                     html.Td(m.get('Folds', 1))])
+                            for name, m in metrics.items()
+                        ])
+                    ], className="table table-dark table-hover table-borderless mb-0")
+                ], className="glass-card p-4 mb-4")
+            ], width=12)
+        ]),
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.H4("Anomaly Detection", className="text-white mb-3"),
+                    html.P(f"Detected {insights.get('anomalies_detected', 0)} anomalies in the dataset.", className="lead text-warning"),
+                    html.P("These anomalies represent unusual sales spikes or deep discount transactions that deviate significantly from normal patterns.", className="text-muted")
+                ], className="glass-card p-4")
+            ], width=12)
+        ])
+    ]
+
+TAB_RENDERERS = {
+    'summary': summary_tab,
+    'regional': regional_tab,
+    'products': products_tab,
+    'forecasting': forecasting_tab,
+}
+
+# Dashboard Layout: filter bar, tab strip and a placeholder that render_tab fills
 def get_dashboard_layout():
-    # Reload data to ensure fresh view
-    global df, metrics, insights
-    df, metrics, insights = load_global_data()
+    shared = load_shared_dataset()
     
-    if df.empty:
+    if shared is None:
         return dbc.Container([
             html.H3("No Data Available", className="text-white text-center mt-5"),
             html.P("Please load a dataset via Settings or run the pipeline.", className="text-muted text-center")
         ])
 
+    engine = shared.engine
+    
     return dbc.Container([
-        dcc.Tabs(className="custom-tabs mb-4", children=[
-            # Tab 1: Executive Summary
-            dcc.Tab(label='Executive Summary', className="custom-tab", selected_className="custom-tab--selected", children=[
-                html.Br(),
-                dbc.Row([
-                    dbc.Col(create_kpi_card("Total Sales", f"${df['Total Sales'].sum():,.0f}", "success"), width=12, md=6, lg=3),
-                    dbc.Col(create_kpi_card("Total Profit", f"${df['Profit'].sum():,.0f}", "info"), width=12, md=6, lg=3),
-                    dbc.Col(create_kpi_card("Total Orders", f"{len(df):,}", "primary"), width=12, md=6, lg=3),
-                    dbc.Col(create_kpi_card("Profit Margin", f"{(df['Profit'].sum()/df['Total Sales'].sum()*100):.1f}%", "warning"), width=12, md=6, lg=3),
-                ], className="g-4 mb-4"),
-                
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Sales Trend", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.line(
-                                    df.groupby(pd.Grouper(key='Order Date', freq='ME'))['Total Sales'].sum().reset_index(), 
-                                    x='Order Date', y='Total Sales', 
-                                    color_discrete_sequence=['#3b82f6']
-                                )).update_layout(height=350),
-                                config={'responsive': True, 'displayModeBar': False},
-                                style={'height': '350px'}
-                            )
-                        ], className="glass-card p-4")
-                    ], width=12, lg=8),
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Category Distribution", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.pie(
-                                    df, values='Total Sales', names='Category', 
-                                    color_discrete_sequence=px.colors.qualitative.Pastel
-                                ).update_traces(textposition='inside', textinfo='percent+label')).update_layout(height=350),
-                                config={'responsive': True, 'displayModeBar': False},
-                                style={'height': '350px'}
-                            )
-                        ], className="glass-card p-4")
-                    ], width=12, lg=4),
-                ], className="g-4 mb-4")
-            ]),
-            
-            # Tab 2: Regional Performance
-            dcc.Tab(label='Regional Performance', className="custom-tab", selected_className="custom-tab--selected", children=[
-                html.Br(),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Sales by Region", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.bar(
-                                    df.groupby('Region')['Total Sales'].sum().reset_index(),
-                                    x='Region', y='Total Sales', color='Region',
-                                    color_discrete_sequence=px.colors.qualitative.Bold
-                                ))
-                            )
-                        ], className="glass-card p-4 mb-4")
-                    ], width=6),
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Profit by Region", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.bar(
-                                    df.groupby('Region')['Profit'].sum().reset_index(),
-                                    x='Region', y='Profit', color='Region',
-                                    color_discrete_sequence=px.colors.qualitative.Bold
-                                ))
-                            )
-                        ], className="glass-card p-4 mb-4")
-                    ], width=6),
-                ]),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Geographic Sales Map", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.choropleth(
-                                    df.groupby('State')['Total Sales'].sum().reset_index(),
-                                    locations='State', locationmode="USA-states",
-                                    color='Total Sales', scope="usa", 
-                                    color_continuous_scale="Viridis"
-                                ))
-                            )
-                        ], className="glass-card p-4")
-                    ], width=12)
-                ])
-            ]),
-            
-            # Tab 3: Product Insights
-            dcc.Tab(label='Product Insights', className="custom-tab", selected_className="custom-tab--selected", children=[
-                html.Br(),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Top 10 Products by Sales", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.bar(
-                                    df.groupby('Product Name')['Total Sales'].sum().sort_values(ascending=False).head(10).reset_index(),
-                                    y='Product Name', x='Total Sales', orientation='h',
-                                    color='Total Sales', color_continuous_scale='Bluyl'
-                                ))
-                            )
-                        ], className="glass-card p-4 mb-4")
-                    ], width=6),
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Profit vs Discount", className="text-white mb-3"),
-                            dcc.Graph(
-                                figure=style_figure(px.scatter(
-                                    df, x='Discount', y='Profit', color='Category',
-                                    size='Quantity', hover_data=['Product Name'],
-                                    color_discrete_sequence=px.colors.qualitative.Vivid
-                                ))
-                            )
-                        ], className="glass-card p-4 mb-4")
-                    ], width=6),
-                ])
-            ]),
-            
-            # Tab 4: Forecasting & Advanced Analytics
-            dcc.Tab(label='Forecasting & Analytics', className="custom-tab", selected_className="custom-tab--selected", children=[
-                html.Br(),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Model Performance", className="text-white mb-3"),
-                            dbc.Table([
-                                html.Thead(html.Tr([html.Th("Model"), html.Th("RMSE"), html.Th("MAPE")])),
-                                html.Tbody([
-                                    html.Tr([html.Td("SARIMA"), html.Td(f"{metrics.get('SARIMA', {}).get('RMSE', 0):.2f}"), html.Td(f"{metrics.get('SARIMA', {}).get('MAPE', 0):.2%}")]),
-                                    html.Tr([html.Td("Prophet"), html.Td(f"{metrics.get('Prophet', {}).get('RMSE', 0):.2f}"), html.Td(f"{metrics.get('Prophet', {}).get('MAPE', 0):.2%}")]),
-                                ])
-                            ], className="table table-dark table-hover table-borderless mb-0")
-                        ], className="glass-card p-4 mb-4")
-                    ], width=12)
-                ]),
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.H4("Anomaly Detection", className="text-white mb-3"),
-                            html.P(f"Detected {insights.get('anomalies_detected', 0)} anomalies in the dataset.", className="lead text-warning"),
-                            html.P("These anomalies represent unusual sales spikes or deep discount transactions that deviate significantly from normal patterns.", className="text-muted")
-                        ], className="glass-card p-4")
-                    ], width=12)
-                ])
-            ])
-        ])
+        create_filter_bar(engine.options('Region'), engine.options('Category'), engine.options('Segment'),
+                          *engine.date_bounds()),
+        dcc.Tabs(id='dashboard-tabs', value='summary', className="custom-tabs mb-4", children=[
+            dcc.Tab(label=label, value=value, className="custom-tab", selected_className="custom-tab--selected")
+            for value, label in DASHBOARD_TABS.items()
+        ]),
+        dcc.Loading(html.Div(create_tab_placeholder(), id='tab-content'), type='circle', color='#3b82f6')
     ], fluid=True)
 
 # Main Layout with Routing
@@ -258,51 +374,94 @@ def display_page(pathname):
     else:
         return get_dashboard_layout()
 
+FILTER_INPUTS = [
+    Input('filter-dates', 'start_date'),
+    Input('filter-dates', 'end_date'),
+    Input('filter-region', 'value'),
+    Input('filter-category', 'value'),
+    Input('filter-segment', 'value'),
+]
+
+FILTER_STATES = [State(item.component_id, item.component_property) for item in FILTER_INPUTS]
+
+# Tab Callback: renders only the selected tab, for the current filters
+@app.callback(
+    Output('tab-content', 'children'),
+    [Input('dashboard-tabs', 'value')] + FILTER_INPUTS
+)
+def render_tab(tab, start_date, end_date, regions, categories, segments):
+    filters = current_filters(start_date, end_date, regions, categories, segments)
+    return [html.Br()] + TAB_RENDERERS.get(tab, summary_tab)(filters)
+
+# Scatter Callback: re-query at finer resolution for the zoomed window
+@app.callback(
+    Output('profit-discount-graph', 'figure'),
+    [Input('profit-discount-graph', 'relayoutData')] + FILTER_STATES,
+    prevent_initial_call=True
+)
+def update_profit_vs_discount(relayout_data, start_date, end_date, regions, categories, segments):
+    if not relayout_data:
+        return dash.no_update
+    filters = current_filters(start_date, end_date, regions, categories, segments)
+    x_range, y_range = zoom_ranges(relayout_data)
+    reset = any(key.endswith('autorange') for key in relayout_data)
+    if x_range is None and y_range is None and not reset:
+        return dash.no_update
+    key = dict(filters or {}, x_range=x_range, y_range=y_range) if filters or x_range or y_range else None
+    return cached_figure('profit_vs_discount', lambda: profit_vs_discount_figure(filters, x_range, y_range), key)
+
 # Dataset Loading Callback
 @app.callback(
     Output("dataset-loading-output", "children"),
+    Output("job-id-store", "data"),
     Input("load-dataset-btn", "n_clicks"),
     State("dataset-url-input", "value"),
     prevent_initial_call=True
 )
 def load_custom_dataset(n_clicks, url):
     if not url:
-        return dbc.Alert("Please enter a valid URL.", color="warning")
+        return dbc.Alert("Please enter a valid URL.", color="warning"), dash.no_update
     
-    try:
-        # 1. Download Dataset
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        # 2. Validate CSV
-        content = response.content.decode('utf-8')
-        df_new = pd.read_csv(io.StringIO(content))
-        
-        required_cols = ['Order Date', 'Total Sales', 'Profit', 'Category', 'Region', 'State', 'Product Name']
-        missing_cols = [col for col in required_cols if col not in df_new.columns]
-        
-        if missing_cols:
-            return dbc.Alert(f"Missing required columns: {', '.join(missing_cols)}", color="danger")
-            
-        # 3. Save to Raw Data
-        raw_path = os.path.join(RAW_DATA_DIR, 'retail_sales_dataset.csv')
-        df_new.to_csv(raw_path, index=False)
-        
-        # 4. Run Pipeline
-        # We run these sequentially. In a production app, this should be a background task (Celery/Redis)
-        run_cleaning_pipeline()
-        run_feature_engineering()
-        run_forecasting()
-        run_advanced_analytics()
-        
-        # 5. Reload Global Data
-        global df, metrics, insights
-        df, metrics, insights = load_global_data()
-        
-        return dbc.Alert("Dataset loaded and analyzed successfully! Go to Dashboard to view results.", color="success")
-        
-    except Exception as e:
-        return dbc.Alert(f"Error processing dataset: {str(e)}", color="danger")
+    # Download and pipeline run happen in a background worker; identical
+    # submissions while a job is active return the existing job
+    job_id = job_executor.submit('ingest_dataset', ingest_dataset, url=url)
+    return dbc.Alert("Dataset job queued. Progress is shown below.", color="info"), job_id
+
+# Job Progress Polling Callback
+@app.callback(
+    Output("job-progress", "value"),
+    Output("job-progress", "label"),
+    Output("job-status-output", "children"),
+    Output("job-poll-interval", "disabled"),
+    Input("job-poll-interval", "n_intervals"),
+    Input("job-id-store", "data"),
+    prevent_initial_call=True
+)
+def poll_job_status(n_intervals, job_id):
+    job = job_executor.status(job_id) if job_id else None
+    if job is None:
+        return 0, "", "", True
+    
+    percent = round(job['progress'] * 100)
+    done = job['status'] in TERMINAL_STATES
+    if done:
+        color = "success" if job['status'] == SUCCEEDED else "danger" if job['status'] == 'failed' else "secondary"
+        status = dbc.Alert(job['message'] or job['status'].title(), color=color)
+    else:
+        status = html.Span(f"{job['status'].title()} - {job['stage']}: {job['message'] or ''}", className="text-muted")
+    return percent, f"{percent}%", status, done
+
+# Job Cancellation Callback
+@app.callback(
+    Output("job-cancel-output", "children"),
+    Input("cancel-job-btn", "n_clicks"),
+    State("job-id-store", "data"),
+    prevent_initial_call=True
+)
+def cancel_dataset_job(n_clicks, job_id):
+    if job_id and job_executor.cancel(job_id):
+        return html.Small("Cancellation requested.", className="text-warning")
+    return html.Small("No active job to cancel.", className="text-muted")
 
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
@@ -8,6 +8,34 @@ def create_kpi_card(title, value, color="primary", icon=None):
         html.H3(value, className="kpi-value"),
     ], className="kpi-card glass-card mb-4 animate-fade-in")
 
+def create_filter_bar(regions, categories, segments, min_date=None, max_date=None):
+    """Creates the date range and Region/Category/Segment filter bar."""
+    def dropdown(filter_id, label, options):
+        return dbc.Col([
+            html.Label(label, className="text-muted small"),
+            dcc.Dropdown(id=filter_id, options=[{'label': str(o), 'value': o} for o in options],
+                         multi=True, placeholder=f"All {label.lower()}s", className="text-dark"),
+        ], width=12, md=6, lg=3)
+
+    return html.Div(dbc.Row([
+        dbc.Col([
+            html.Label("Order Date", className="text-muted small"),
+            dcc.DatePickerRange(id='filter-dates', min_date_allowed=min_date, max_date_allowed=max_date,
+                                start_date_placeholder_text="Start", end_date_placeholder_text="End",
+                                clearable=True, className="d-block"),
+        ], width=12, md=6, lg=3),
+        dropdown('filter-region', "Region", regions),
+        dropdown('filter-category', "Category", categories),
+        dropdown('filter-segment', "Segment", segments),
+    ], className="g-3"), className="glass-card p-3 mb-4")
+
+def create_tab_placeholder():
+    """Creates the lightweight placeholder shown until a dashboard tab is rendered."""
+    return html.Div([
+        dbc.Spinner(color="primary", size="sm", spinner_class_name="me-2"),
+        html.Span("Loading...", className="text-muted"),
+    ], className="glass-card p-4 text-center")
+
 def create_header():
     """Creates the dashboard header."""
     return dbc.Navbar(
@@ -0,0 +1,198 @@
+import sys
+import os
+import gzip
+import zipfile
+import tempfile
+import contextlib
+import pandas as pd
+import requests
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.artifact_store import ArtifactStore
+from src.schema import COLUMN_TYPES
+from scripts.run_all import run_all
+
+RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw')
+REQUIRED_COLUMNS = ['Order Date', 'Total Sales', 'Profit', 'Category', 'Region', 'State', 'Product Name']
+
+# Download limits
+MAX_DOWNLOAD_BYTES = 500 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+PARSE_CHUNK_ROWS = 200_000
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+
+def download_to_tempfile(url, max_bytes=MAX_DOWNLOAD_BYTES, on_progress=None):
+    """Streams a URL to a temporary file, aborting once it exceeds max_bytes."""
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+
+        declared = int(response.headers.get('Content-Length') or 0)
+        if declared > max_bytes:
+            raise ValueError(f"Dataset is {declared / 1e6:.0f} MB; the limit is {max_bytes / 1e6:.0f} MB.")
+
+        fd, path = tempfile.mkstemp(suffix='.download')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    written += len(block)
+                    if written > max_bytes:
+                        raise ValueError(f"Dataset exceeds the {max_bytes / 1e6:.0f} MB download limit.")
+                    f.write(block)
+                    if on_progress is not None and declared:
+                        on_progress(written / declared)
+        except BaseException:
+            os.remove(path)
+            raise
+    return path
+
+@contextlib.contextmanager
+def open_csv(path):
+    """Opens a downloaded CSV as a binary stream, transparently decompressing gzip or zip.
+
+    Yields (stream, raw): raw is the underlying file, whose position tells how much
+    of the download has been consumed.
+    """
+    with open(path, 'rb') as raw:
+        magic = raw.read(4)
+        raw.seek(0)
+
+        if magic.startswith(GZIP_MAGIC):
+            with gzip.GzipFile(fileobj=raw, mode='rb') as stream:
+                yield stream, raw
+        elif magic.startswith(ZIP_MAGIC):
+            with zipfile.ZipFile(raw) as archive:
+                members = [m for m in archive.namelist() if m.lower().endswith('.csv')] or archive.namelist()
+                with archive.open(members[0]) as stream:
+                    yield stream, raw
+        else:
+            yield raw, raw
+
+def read_header(path):
+    """Returns the column names without parsing the body."""
+    with open_csv(path) as (stream, _):
+        return list(pd.read_csv(stream, nrows=0).columns)
+
+# Dtypes a chunk column can take, narrowest first; conflicting chunks widen to the broader one
+DTYPE_ORDER = ['boolean', 'Int64', 'float64', 'string']
+
+def _chunk_dtypes(chunk):
+    # Integers are nullable because a later chunk may contain missing values;
+    # all-missing columns say nothing about the type and are left out
+    dtypes = {}
+    for col, dtype in chunk.dtypes.items():
+        if chunk[col].isna().all():
+            continue
+        if pd.api.types.is_bool_dtype(dtype):
+            dtypes[col] = 'boolean'
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = 'Int64'
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = 'float64'
+        else:
+            dtypes[col] = 'string'
+    return dtypes
+
+def _widen(dtypes, chunk):
+    """dtypes widened so the chunk's values fit: Int64 -> float64 -> string (booleans mix only with text)."""
+    widened = dict(dtypes)
+    for col, dtype in _chunk_dtypes(chunk).items():
+        current = widened.get(col)
+        if current is None or current == dtype:
+            widened[col] = dtype
+        elif 'boolean' in (current, dtype):
+            widened[col] = 'string'
+        else:
+            widened[col] = max(current, dtype, key=DTYPE_ORDER.index)
+    for col in chunk.columns:
+        # Columns missing from every chunk so far
+        widened.setdefault(col, 'float64')
+    return widened
+
+def _declared_dtypes(columns):
+    # Money and rate columns are declared as floats in the schema registry
+    return {col: 'float64' for col in columns if COLUMN_TYPES.get(col, '').startswith('float')}
+
+def _rewrite_widened(store, name, writer, dtypes, chunksize):
+    """Closes writer, casts the rows it wrote to dtypes and returns a writer positioned after them."""
+    writer.close()
+    with tempfile.TemporaryDirectory(prefix='widen-', dir=store.base_dir) as scratch_dir:
+        scratch = ArtifactStore(scratch_dir, fmt=store.fmt)
+        os.replace(writer.path, scratch.path(name))
+        writer = store.open_writer(name, compact=False)
+        try:
+            for chunk in scratch.iter_chunks(name, chunksize=chunksize):
+                writer.write(chunk.astype(dtypes))
+        except BaseException:
+            writer.close()
+            raise
+    return writer
+
+def parse_to_store(path, store, name, chunksize=PARSE_CHUNK_ROWS, on_progress=None):
+    """Parses a CSV in chunks and streams it into the artifact store; returns the row count.
+
+    Every chunk is written with one set of column types. When a later chunk does not
+    fit them (e.g. a float or text in a column inferred as integer), the types are
+    widened and the rows already written are converted to them; the CSV is read once.
+    on_progress(fraction, message=None) is called after each chunk with the share of
+    the file read, and with a message when written rows are converted.
+    """
+    total_bytes = os.path.getsize(path) or 1
+    dtypes = _declared_dtypes(read_header(path))
+    # The widened types are written as-is; narrowing per chunk could disagree between chunks
+    writer = store.open_writer(name, compact=False)
+    try:
+        with open_csv(path) as (stream, raw):
+            for chunk in pd.read_csv(stream, chunksize=chunksize):
+                widened = _widen(dtypes, chunk)
+                # CSV output has no column types, so only typed formats are converted
+                if writer.rows and store.fmt != 'csv' and any(widened[col] != dtypes.get(col) for col in dtypes):
+                    if on_progress is not None:
+                        on_progress(min(raw.tell() / total_bytes, 1.0),
+                                    f"Column types changed after {writer.rows:,} rows; converting them...")
+                    writer = _rewrite_widened(store, name, writer, widened, chunksize)
+                dtypes = widened
+                writer.write(chunk.astype(dtypes))
+                if on_progress is not None:
+                    on_progress(min(raw.tell() / total_bytes, 1.0))
+    finally:
+        writer.close()
+    return writer.rows
+
+def ingest_dataset(ctx, url, max_bytes=MAX_DOWNLOAD_BYTES):
+    """Background job: downloads a CSV, validates it and runs the full pipeline.
+
+    Runs in a JobExecutor worker; ctx.report() records progress and raises
+    JobCancelled when the user cancels from the Settings page.
+    """
+    # 1. Download Dataset (streamed to disk, never held in memory)
+    ctx.report('download', 0.02, 'Downloading dataset...')
+    path = download_to_tempfile(url, max_bytes=max_bytes,
+                                on_progress=lambda frac: ctx.report('download', 0.02 + 0.1 * frac))
+    try:
+        # 2. Validate columns from the header alone
+        ctx.report('validate', 0.12, 'Validating columns...')
+        columns = read_header(path)
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+
+        # 3. Parse in chunks straight into the raw store
+        ctx.report('parse', 0.15, 'Parsing dataset...')
+        rows = parse_to_store(path, ArtifactStore(RAW_DATA_DIR), 'retail_sales_dataset',
+                              on_progress=lambda frac, message=None: ctx.report('parse', 0.15 + 0.05 * frac, message))
+    finally:
+        os.remove(path)
+
+    # 4. Run Pipeline, mapping stage completion onto the remaining 80% of the bar
+    def on_stage(name, event, completed, total):
+        ctx.report(f"pipeline: {name}", 0.2 + 0.8 * completed / total, f"Stage '{name}' {event}")
+
+    ctx.report('pipeline', 0.2, f'Running pipeline on {rows:,} rows...')
+    run_all(progress=on_stage)
+
+    return "Dataset loaded and analyzed successfully! Go to Dashboard to view results."
@@ -75,7 +75,16 @@ def get_settings_layout():
                     dbc.Button([html.I(className="bi bi-cloud-download me-2"), "Load & Analyze Dataset"], 
                                id="load-dataset-btn", color="success", className="w-100"),
                     
-                    html.Div(id="dataset-loading-output", className="mt-3")
+                    html.Div(id="dataset-loading-output", className="mt-3"),
+                    
+                    # Background job progress, polled while a job is active
+                    dcc.Store(id="job-id-store"),
+                    dcc.Interval(id="job-poll-interval", interval=1000, disabled=True),
+                    dbc.Progress(id="job-progress", value=0, striped=True, animated=True, className="mt-3"),
+                    html.Div(id="job-status-output", className="mt-2"),
+                    dbc.Button([html.I(className="bi bi-x-circle me-2"), "Cancel Job"],
+                               id="cancel-job-btn", color="danger", outline=True, size="sm", className="mt-2"),
+                    html.Div(id="job-cancel-output", className="mt-2")
                     
                 ], className="glass-card p-4 mt-4")
             ], width=12)
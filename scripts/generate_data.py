@@ -1,145 +1,249 @@
+import sys
+import os
+import argparse
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
-import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.artifact_store import ArtifactStore
+
+# Definitions
+CATEGORIES = {
+    'Furniture': ['Bookcases', 'Chairs', 'Tables', 'Furnishings'],
+    'Office Supplies': ['Labels', 'Storage', 'Art', 'Binders', 'Appliances', 'Paper', 'Accessories', 'Envelopes', 'Fasteners', 'Supplies'],
+    'Technology': ['Phones', 'Accessories', 'Copiers', 'Machines'],
+    'Clothing': ['T-Shirts', 'Trousers', 'Jackets', 'Dresses'],
+    'Home & Garden': ['Garden Tools', 'Plants', 'Decor', 'Kitchenware']
+}
+
+# Base unit price range per category (same order as CATEGORIES)
+PRICE_RANGES = {
+    'Furniture': (50, 1000),
+    'Office Supplies': (5, 100),
+    'Technology': (100, 2000),
+    'Clothing': (20, 200),
+    'Home & Garden': (10, 300)
+}
+
+REGIONS = {
+    'West': ['California', 'Washington', 'Oregon', 'Arizona'],
+    'East': ['New York', 'Pennsylvania', 'Ohio', 'Massachusetts'],
+    'Central': ['Texas', 'Illinois', 'Michigan', 'Indiana'],
+    'South': ['Florida', 'North Carolina', 'Virginia', 'Tennessee']
+}
 
-def generate_retail_data(start_date='2021-01-01', end_date='2024-12-31', num_orders=15000):
+SEGMENTS = ['Consumer', 'Corporate', 'Home Office']
+SHIP_MODES = ['Standard Class', 'Second Class', 'First Class', 'Same Day']
+BRANDS = ['Acme', 'Global', 'Best', 'Value', 'Premium']
+DISCOUNT_LEVELS = [0.1, 0.2, 0.3, 0.4, 0.5]
+
+# Seasonal weights (Month 1-12) - Higher sales in Q4 (Holiday season)
+SEASONAL_WEIGHTS = [0.8, 0.8, 0.9, 0.9, 1.0, 1.0, 1.1, 1.1, 1.2, 1.1, 1.3, 1.5]
+
+COLUMNS = [
+    'Order ID', 'Order Date', 'Ship Date', 'Ship Mode',
+    'Customer ID', 'Customer Name', 'Segment',
+    'City', 'State', 'Region',
+    'Category', 'Sub-Category', 'Product Name',
+    'Unit Price', 'Quantity', 'Discount', 'Total Sales', 'Profit'
+]
+
+
+def day_probabilities(start_date, end_date):
+    """Returns (days, probabilities) of an order landing on each day.
+
+    Matches the rejection sampling of the original generator: a uniform day is
+    kept with probability weight/2, otherwise a second uniform day is drawn.
+    """
+    days = pd.date_range(start_date, end_date, inclusive='left').values.astype('datetime64[D]')
+    accept = np.asarray(SEASONAL_WEIGHTS)[pd.DatetimeIndex(days).month - 1] / 2.0
+    probs = (accept + (1 - accept.mean())) / len(days)
+    return days, probs / probs.sum()
+
+
+def _generate_chunk(days, probs, num_orders, first_order_id, seed):
+    """Generates one chunk of orders with every column drawn as an array."""
+    rng = np.random.default_rng(seed)
+
+    # Order and ship dates, sorted so chunks can be streamed in date order
+    order_date = np.sort(rng.choice(days, size=num_orders, p=probs))
+    ship_date = order_date + rng.integers(0, 6, size=num_orders).astype('timedelta64[D]')
+
+    # Category & Product
+    cat_names = np.array(list(CATEGORIES.keys()))
+    cat_idx = rng.integers(0, len(cat_names), size=num_orders)
+    sub_counts = np.array([len(subs) for subs in CATEGORIES.values()])
+    sub_offsets = np.concatenate([[0], np.cumsum(sub_counts)[:-1]])
+    all_subs = np.array([sub for subs in CATEGORIES.values() for sub in subs])
+    sub_idx = sub_offsets[cat_idx] + (rng.random(num_orders) * sub_counts[cat_idx]).astype(int)
+    subcategory = all_subs[sub_idx]
+    product_name = (pd.Series(np.array(BRANDS)[rng.integers(0, len(BRANDS), size=num_orders)]) + ' '
+                    + subcategory + ' '
+                    + rng.integers(100, 999, size=num_orders).astype(str))
+
+    # Region & Location
+    region_names = np.array(list(REGIONS.keys()))
+    states = np.array(list(REGIONS.values()))
+    region_idx = rng.integers(0, len(region_names), size=num_orders)
+    state = states[region_idx, rng.integers(0, states.shape[1], size=num_orders)]
+    city = pd.Series(state) + ' City ' + rng.integers(1, 5, size=num_orders).astype(str)
+
+    # Customer
+    segment = rng.choice(SEGMENTS, size=num_orders, p=[0.5, 0.3, 0.2])
+    customer_id = rng.integers(1000, 5000, size=num_orders)
+
+    # Sales Details
+    quantity = rng.integers(1, 10, size=num_orders)
+    low = np.array([PRICE_RANGES[c][0] for c in cat_names])[cat_idx]
+    high = np.array([PRICE_RANGES[c][1] for c in cat_names])[cat_idx]
+    unit_price = np.round(rng.uniform(low, high), 2)
+
+    # Discount (30% chance)
+    discount = np.where(rng.random(num_orders) < 0.3,
+                        rng.choice(DISCOUNT_LEVELS, size=num_orders), 0.0)
+
+    # Holiday spike (Black Friday / Christmas)
+    dates = pd.DatetimeIndex(order_date)
+    month, day = dates.month.values, dates.day.values
+    holiday = ((month == 11) & (day > 20)) | ((month == 12) & (day < 25))
+    quantity = quantity + np.where(holiday, rng.integers(1, 5, size=num_orders), 0)
+    discount = np.where(holiday, np.maximum(discount, 0.2), discount)
+
+    total_sales = np.round(unit_price * quantity * (1 - discount), 2)
+
+    # Profit (Random margin between -10% to 40% depending on discount)
+    margin = rng.uniform(0.2, 0.4, size=num_orders) - discount
+    profit = np.round(total_sales * margin, 2)
+
+    # Add some outliers (0.5% of orders)
+    n_outliers = int(num_orders * 0.005)
+    outliers = rng.choice(num_orders, size=n_outliers, replace=False)
+    total_sales[outliers] *= rng.uniform(3, 5)
+    profit[outliers] *= rng.uniform(2, 4)
+
+    return pd.DataFrame({
+        'Order ID': np.arange(first_order_id, first_order_id + num_orders),
+        'Order Date': order_date.astype('datetime64[ns]'),
+        'Ship Date': ship_date.astype('datetime64[ns]'),
+        'Ship Mode': np.array(SHIP_MODES)[rng.integers(0, len(SHIP_MODES), size=num_orders)],
+        'Customer ID': customer_id,
+        'Customer Name': ('Customer ' + pd.Series(customer_id).astype(str)).values,
+        'Segment': segment,
+        'City': city.values,
+        'State': state,
+        'Region': region_names[region_idx],
+        'Category': cat_names[cat_idx],
+        'Sub-Category': subcategory,
+        'Product Name': product_name.values,
+        'Unit Price': unit_price,
+        'Quantity': quantity,
+        'Discount': discount,
+        'Total Sales': total_sales,
+        'Profit': profit
+    }, columns=COLUMNS)
+
+
+def _generate_shard(args):
+    days, probs, num_orders, first_order_id, seed = args
+    return _generate_chunk(days, probs, num_orders, first_order_id, seed)
+
+
+def plan_shards(start_date, end_date, num_orders, num_shards, seed=42):
+    """Splits the date range into contiguous blocks and assigns each a seeded order count.
+
+    Returns a list of (days, probs, num_orders, first_order_id, seed) tuples in date order.
+    """
+    days, probs = day_probabilities(start_date, end_date)
+    num_shards = max(1, min(num_shards, len(days)))
+
+    root = np.random.SeedSequence(seed)
+    plan_seed, *shard_seeds = root.spawn(num_shards + 1)
+
+    blocks = np.array_split(np.arange(len(days)), num_shards)
+    block_probs = np.array([probs[block].sum() for block in blocks])
+    counts = np.random.default_rng(plan_seed).multinomial(num_orders, block_probs / block_probs.sum())
+
+    shards = []
+    first_order_id = 1
+    for block, count, shard_seed in zip(blocks, counts, shard_seeds):
+        block_p = probs[block] / probs[block].sum()
+        shards.append((days[block], block_p, int(count), first_order_id, shard_seed))
+        first_order_id += int(count)
+    return shards
+
+
+def generate_retail_data_sharded(start_date='2021-01-01', end_date='2024-12-31', num_orders=10_000_000,
+                                 chunk_size=500_000, n_jobs=None, fmt='parquet', seed=42,
+                                 output_dir=os.path.join('data', 'raw')):
+    """
+    Generates a large synthetic dataset across worker processes and streams it to disk.
+
+    Each shard covers a contiguous block of days and has its own seed, so the output
+    is deterministic for a given seed and chunk size regardless of n_jobs.
+    """
+    num_shards = max(1, -(-num_orders // chunk_size))
+    shards = plan_shards(start_date, end_date, num_orders, num_shards, seed=seed)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    print(f"Generating {num_orders:,} orders in {len(shards)} shards on {n_jobs} workers...")
+
+    store = ArtifactStore(output_dir, fmt=fmt)
+    # Drop copies in other formats, which would otherwise compete by modification time
+    store.remove('retail_sales_dataset')
+    with store.open_writer('retail_sales_dataset') as writer:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            # Keep a bounded window of shards in flight and write them in date order
+            pending = deque()
+            shard_iter = iter(shards)
+            for shard in shard_iter:
+                pending.append(executor.submit(_generate_shard, shard))
+                if len(pending) >= 2 * n_jobs:
+                    break
+            while pending:
+                writer.write(pending.popleft().result())
+                print(f"  wrote {writer.rows:,}/{num_orders:,} rows")
+                next_shard = next(shard_iter, None)
+                if next_shard is not None:
+                    pending.append(executor.submit(_generate_shard, next_shard))
+
+    print(f"Dataset generated successfully: {writer.path}")
+    return writer.path
+
+
+def generate_retail_data(start_date='2021-01-01', end_date='2024-12-31', num_orders=15000, fmt='parquet',
+                         output_dir=os.path.join('data', 'raw')):
     """
     Generates a synthetic retail sales dataset with realistic patterns.
     """
     print("Generating synthetic retail sales data...")
-    
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    random.seed(42)
-    
-    # Date range
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
-    date_range = (end - start).days
-    
-    # Definitions
-    categories = {
-        'Furniture': ['Bookcases', 'Chairs', 'Tables', 'Furnishings'],
-        'Office Supplies': ['Labels', 'Storage', 'Art', 'Binders', 'Appliances', 'Paper', 'Accessories', 'Envelopes', 'Fasteners', 'Supplies'],
-        'Technology': ['Phones', 'Accessories', 'Copiers', 'Machines'],
-        'Clothing': ['T-Shirts', 'Trousers', 'Jackets', 'Dresses'],
-        'Home & Garden': ['Garden Tools', 'Plants', 'Decor', 'Kitchenware']
-    }
-    
-    regions = {
-        'West': ['California', 'Washington', 'Oregon', 'Arizona'],
-        'East': ['New York', 'Pennsylvania', 'Ohio', 'Massachusetts'],
-        'Central': ['Texas', 'Illinois', 'Michigan', 'Indiana'],
-        'South': ['Florida', 'North Carolina', 'Virginia', 'Tennessee']
-    }
-    
-    segments = ['Consumer', 'Corporate', 'Home Office']
-    ship_modes = ['Standard Class', 'Second Class', 'First Class', 'Same Day']
-    
-    data = []
-    
-    # Seasonal weights (Month 1-12) - Higher sales in Q4 (Holiday season)
-    seasonal_weights = [0.8, 0.8, 0.9, 0.9, 1.0, 1.0, 1.1, 1.1, 1.2, 1.1, 1.3, 1.5]
-    
-    for order_id in range(1, num_orders + 1):
-        # Generate Order Date with seasonality
-        days_offset = np.random.randint(0, date_range)
-        order_date = start + timedelta(days=days_offset)
-        
-        # Adjust probability based on month (seasonality)
-        month_idx = order_date.month - 1
-        if np.random.random() > (seasonal_weights[month_idx] / 2.0): # Simple rejection sampling for seasonality
-             days_offset = np.random.randint(0, date_range)
-             order_date = start + timedelta(days=days_offset)
-        
-        # Generate Ship Date (0-5 days after Order Date)
-        ship_date = order_date + timedelta(days=np.random.randint(0, 6))
-        
-        # Category & Product
-        category = np.random.choice(list(categories.keys()))
-        subcategory = np.random.choice(categories[category])
-        product_name = f"{np.random.choice(['Acme', 'Global', 'Best', 'Value', 'Premium'])} {subcategory} {np.random.randint(100, 999)}"
-        
-        # Region & Location
-        region = np.random.choice(list(regions.keys()))
-        state = np.random.choice(regions[region])
-        city = f"{state} City {np.random.randint(1, 5)}"
-        
-        # Customer
-        segment = np.random.choice(segments, p=[0.5, 0.3, 0.2])
-        customer_id = f"C-{np.random.randint(1000, 5000)}"
-        customer_name = f"Customer {customer_id}"
-        
-        # Sales Details
-        quantity = np.random.randint(1, 10)
-        
-        # Base price depends on category
-        if category == 'Technology':
-            base_price = np.random.uniform(100, 2000)
-        elif category == 'Furniture':
-            base_price = np.random.uniform(50, 1000)
-        elif category == 'Office Supplies':
-            base_price = np.random.uniform(5, 100)
-        elif category == 'Clothing':
-            base_price = np.random.uniform(20, 200)
-        else: # Home & Garden
-            base_price = np.random.uniform(10, 300)
-            
-        unit_price = round(base_price, 2)
-        
-        # Discount
-        discount = 0.0
-        if np.random.random() < 0.3: # 30% chance of discount
-            discount = np.random.choice([0.1, 0.2, 0.3, 0.4, 0.5])
-            
-        # Holiday spike (Black Friday / Christmas)
-        if (order_date.month == 11 and order_date.day > 20) or (order_date.month == 12 and order_date.day < 25):
-             quantity += np.random.randint(1, 5)
-             discount = max(discount, 0.2) # Minimum 20% discount during holidays
-        
-        total_sales = round(unit_price * quantity * (1 - discount), 2)
-        
-        # Profit (Random margin between -10% to 40% depending on discount)
-        margin = np.random.uniform(0.2, 0.4) - discount
-        profit = round(total_sales * margin, 2)
-        
-        data.append([
-            order_id, order_date, ship_date, ship_modes[np.random.randint(0, 4)],
-            customer_id, customer_name, segment,
-            city, state, region,
-            category, subcategory, product_name,
-            unit_price, quantity, discount, total_sales, profit
-        ])
-        
-    columns = [
-        'Order ID', 'Order Date', 'Ship Date', 'Ship Mode',
-        'Customer ID', 'Customer Name', 'Segment',
-        'City', 'State', 'Region',
-        'Category', 'Sub-Category', 'Product Name',
-        'Unit Price', 'Quantity', 'Discount', 'Total Sales', 'Profit'
-    ]
-    
-    df = pd.DataFrame(data, columns=columns)
-    
-    # Sort by Order Date
-    df = df.sort_values('Order Date').reset_index(drop=True)
-    
-    # Add some outliers
-    print("Adding outliers...")
-    indices = np.random.choice(df.index, size=int(num_orders * 0.005), replace=False) # 0.5% outliers
-    df.loc[indices, 'Total Sales'] = df.loc[indices, 'Total Sales'] * np.random.uniform(3, 5)
-    df.loc[indices, 'Profit'] = df.loc[indices, 'Profit'] * np.random.uniform(2, 4)
-    
-    # Save to CSV
-    output_path = os.path.join('data', 'raw', 'retail_sales_dataset.csv')
-    df.to_csv(output_path, index=False)
+
+    days, probs = day_probabilities(start_date, end_date)
+    df = _generate_chunk(days, probs, num_orders, first_order_id=1, seed=42)
+
+    store = ArtifactStore(output_dir, fmt=fmt)
+    store.remove('retail_sales_dataset')
+    output_path = store.save(df, 'retail_sales_dataset')
     print(f"Dataset generated successfully: {output_path}")
     print(f"Shape: {df.shape}")
     print(f"Date Range: {df['Order Date'].min()} to {df['Order Date'].max()}")
-    
+
     return df
 
 if __name__ == "__main__":
-    generate_retail_data()
+    parser = argparse.ArgumentParser(description="Generate a synthetic retail sales dataset.")
+    parser.add_argument('--num-orders', type=int, default=15000)
+    parser.add_argument('--sharded', action='store_true', help="Stream a large dataset using worker processes")
+    parser.add_argument('--chunk-size', type=int, default=500_000)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    args = parser.parse_args()
+
+    if args.sharded:
+        generate_retail_data_sharded(num_orders=args.num_orders, chunk_size=args.chunk_size,
+                                     n_jobs=args.jobs, fmt=args.format)
+    else:
+        generate_retail_data(num_orders=args.num_orders, fmt=args.format)
@@ -7,24 +7,18 @@ import json
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.advanced_analytics import AdvancedAnalytics
+from src.artifact_store import ArtifactStore
 
-def run_advanced_analytics():
-    print("Starting Advanced Analytics...")
-    
-    # Load processed data
-    input_path = os.path.join('data', 'processed', 'retail_sales_cleaned.csv')
-    if not os.path.exists(input_path):
-        print(f"Error: {input_path} not found. Run run_pipeline.py first.")
-        return
-        
-    df = pd.read_csv(input_path)
-    df['Order Date'] = pd.to_datetime(df['Order Date'])
-    
+def compute_advanced_analytics(df, figures_dir=os.path.join('reports', 'figures')):
+    """Runs anomaly detection, price elasticity and segmentation on cleaned data.
+
+    Returns a dict with the 'anomalies', 'elasticity' and 'segments' frames and the
+    summary 'insights'.
+    """
     # Initialize analytics
     analytics = AdvancedAnalytics(df)
     
     # Create figures directory
-    figures_dir = os.path.join('reports', 'figures')
     os.makedirs(figures_dir, exist_ok=True)
     
     # 1. Anomaly Detection
@@ -32,23 +26,15 @@ def run_advanced_analytics():
     df_anomalies = analytics.detect_anomalies(contamination=0.01)
     analytics.plot_anomalies(save_path=os.path.join(figures_dir, 'anomalies_scatter.png'))
     
-    # Save anomalies to CSV
-    anomalies_path = os.path.join('data', 'processed', 'anomalies.csv')
-    df_anomalies[df_anomalies['Anomaly'] == 1].to_csv(anomalies_path, index=False)
-    
     # 2. Price Elasticity
     print("Calculating Price Elasticity...")
-    elasticity_df = analytics.calculate_price_elasticity()
-    elasticity_path = os.path.join('reports', 'price_elasticity.csv')
-    elasticity_df.to_csv(elasticity_path, index=False)
+    elasticity_df = analytics.calculate_price_elasticity(n_boot=200)
     print("Price Elasticity:")
     print(elasticity_df)
     
     # 3. Customer Segmentation
     print("Performing Customer Segmentation...")
     rfm_df = analytics.perform_customer_segmentation()
-    rfm_path = os.path.join('data', 'processed', 'customer_segments.csv')
-    rfm_df.to_csv(rfm_path, index=False)
     
     # Summary of segments
     segment_summary = rfm_df.groupby('Segment').agg({
@@ -58,16 +44,47 @@ def run_advanced_analytics():
         'Customer ID': 'count'
     }).to_dict()
     
-    # Save insights
     insights = {
         'anomalies_detected': int(df_anomalies['Anomaly'].sum()),
         'price_elasticity': elasticity_df.to_dict(orient='records'),
         'customer_segments': segment_summary
     }
+    if analytics.k_scores is not None:
+        insights['segment_k_scores'] = analytics.k_scores.reset_index().to_dict(orient='records')
     
-    insights_path = os.path.join('reports', 'advanced_insights.json')
+    return {
+        'anomalies': df_anomalies[df_anomalies['Anomaly'] == 1],
+        'elasticity': elasticity_df,
+        'segments': rfm_df,
+        'insights': insights
+    }
+
+def save_advanced_analytics(results, store, reports_dir='reports'):
+    """Persists the outputs of compute_advanced_analytics and returns the insights path."""
+    store.save(results['anomalies'], 'anomalies')
+    results['elasticity'].to_csv(os.path.join(reports_dir, 'price_elasticity.csv'), index=False)
+    store.save(results['segments'], 'customer_segments')
+    
+    insights_path = os.path.join(reports_dir, 'advanced_insights.json')
     with open(insights_path, 'w') as f:
-        json.dump(insights, f, indent=4)
+        json.dump(results['insights'], f, indent=4)
+    return insights_path
+
+def run_advanced_analytics(export_csv=False):
+    print("Starting Advanced Analytics...")
+    
+    # Load processed data
+    store = ArtifactStore(export_csv=export_csv)
+    if not store.exists('retail_sales_cleaned'):
+        print("Error: retail_sales_cleaned not found. Run run_pipeline.py first.")
+        return
+        
+    df = store.load('retail_sales_cleaned')
+    
+    results = compute_advanced_analytics(df)
+    
+    # Save outputs and insights
+    insights_path = save_advanced_analytics(results, store)
         
     print(f"Advanced analytics complete. Insights saved to {insights_path}")
 
@@ -0,0 +1,71 @@
+import sys
+import os
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.artifact_store import ArtifactStore
+from src.pipeline_runner import PipelineRunner, Stage
+from src.shared_dataset import SharedDataset, publish_dataset
+from scripts.run_pipeline import clean_data, save_cleaning_stats
+from scripts.run_features import build_features
+from scripts.run_forecasting import fit_forecasts, save_metrics, load_forecast_models
+from scripts.run_eda import compute_eda, save_eda_insights
+from scripts.run_advanced import compute_advanced_analytics, save_advanced_analytics
+
+def build_pipeline(forecast_days=90, **runner_kwargs):
+    """Returns the PipelineRunner for the full cleaning -> modeling -> analytics DAG."""
+    stages = [
+        Stage('cleaned', clean_data, inputs=['raw'], version=4),
+        Stage('features', build_features, inputs=['cleaned'], version=2),
+        # The stages below also write figures and models outside the cache (reports/figures,
+        # data/models), so they always run; the forecasters and the anomaly detector reuse
+        # their saved models themselves when the data is unchanged
+        Stage('forecast', fit_forecasts, inputs=['features'],
+              params={'forecast_days': forecast_days, 'models': load_forecast_models()}, version=2, cache=False),
+        # EDA and advanced analytics only depend on the cleaned data and run in parallel
+        Stage('eda', compute_eda, inputs=['cleaned'], version=2, cache=False),
+        Stage('advanced', compute_advanced_analytics, inputs=['cleaned'], version=4, cache=False),
+    ]
+    return PipelineRunner(stages, **runner_kwargs)
+
+def run_all(export_csv=False, use_cache=True, max_workers=None, progress=None):
+    """Runs every stage in memory and persists the artifacts the dashboard reads.
+
+    progress is forwarded to PipelineRunner.run to report per-stage status.
+    """
+    print("Starting full pipeline...")
+    
+    raw_store = ArtifactStore(os.path.join('data', 'raw'))
+    if not raw_store.exists('retail_sales_dataset'):
+        print("Error: retail_sales_dataset not found in data/raw. Run generate_data.py first.")
+        return
+        
+    runner = build_pipeline(use_cache=use_cache, max_workers=max_workers)
+    results = runner.run({'raw': raw_store.load('retail_sales_dataset')}, progress=progress)
+    
+    # Persist only what was recomputed: rewriting an unchanged artifact would change
+    # its data version and invalidate the aggregates, published dataset and figures
+    store = ArtifactStore(export_csv=export_csv)
+    executed = set(runner.executed)
+    if 'cleaned' in executed or not store.exists('retail_sales_cleaned'):
+        store.save(results['cleaned'], 'retail_sales_cleaned')
+        save_cleaning_stats(store, results['cleaned'].attrs['cleaning_stats'])
+        publish_dataset(store)
+    elif SharedDataset().current_version() is None:
+        publish_dataset(store)
+    if 'features' in executed or not store.exists('daily_sales_features'):
+        store.save(results['features'], 'daily_sales_features', index=True)
+    if 'forecast' in executed or not os.path.exists(os.path.join('reports', 'model_metrics.json')):
+        save_metrics(results['forecast'])
+    if 'eda' in executed or not os.path.exists(os.path.join('reports', 'eda_insights.json')):
+        save_eda_insights(results['eda'])
+    if 'advanced' in executed or not os.path.exists(os.path.join('reports', 'advanced_insights.json')):
+        save_advanced_analytics(results['advanced'], store)
+    
+    print(f"Pipeline complete. Ran: {runner.executed or 'none'}; cached: {runner.skipped or 'none'}")
+    return results
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,118 @@
+import sys
+import os
+import argparse
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_cleaner import DataCleaner
+from src.feature_engineer import FeatureEngineer
+from src.artifact_store import ArtifactStore
+from src.schema import DATE_COLUMNS, KeyRegistry
+from src.anomaly_detector import AnomalyDetector
+from src.shared_dataset import publish_dataset
+from src.aggregates import (AGGREGATE_INPUT_COLUMNS, build_aggregates, load_aggregates,
+                            merge_aggregates, refresh_aggregates, save_aggregates)
+from scripts.run_pipeline import load_cleaning_stats
+from scripts.run_features import build_features
+
+RAW_DATA_DIR = os.path.join('data', 'raw')
+
+def flag_anomalies(delta, store):
+    """Scores new orders with the stored anomaly models and appends the flagged ones.
+
+    The models are refitted on the full cleaned store only when they are missing,
+    past their refit schedule or when the new orders have drifted.
+    """
+    detector = AnomalyDetector()
+    if not detector.load() or detector.needs_refit(delta):
+        print("Refitting anomaly models on the cleaned store...")
+        detector.fit(store.load('retail_sales_cleaned', columns=[detector.group_col] + detector.features))
+        detector.save()
+
+    flagged = delta.join(detector.score(delta))
+    flagged = flagged[flagged['Anomaly'] == 1]
+    if not flagged.empty and store.exists('anomalies'):
+        store.append(flagged, 'anomalies')
+    print(f"Flagged {len(flagged)} of {len(delta)} new orders as anomalies.")
+    return flagged
+
+def append_orders(new_df, export_csv=False):
+    """Cleans new orders, appends them to the cleaned store and updates the feature tail.
+
+    The raw orders are appended to data/raw as well, so the next full run (whose cache
+    key is the raw data) re-cleans them instead of dropping them.
+    """
+    store = ArtifactStore(export_csv=export_csv)
+    if not store.exists('retail_sales_cleaned') or not store.exists('daily_sales_features'):
+        print("Error: cleaned data or features not found. Run the full pipeline first.")
+        return
+    stats = load_cleaning_stats(store)
+    if stats is None:
+        print("Error: cleaning statistics not found. Run the full pipeline first.")
+        return
+
+    # Clean the delta with the statistics of the last full cleaning run
+    cleaner = DataCleaner(new_df)
+    cleaner.fix_date_formats([col for col in DATE_COLUMNS if col in new_df.columns])
+    cleaner.handle_missing_values(stats['fill_values'])
+    cleaner.remove_duplicates()
+    for col, bounds in stats['bounds'].items():
+        cleaner.cap_outliers(col, bounds=bounds)
+    cleaner.create_time_features('Order Date')
+    registry = KeyRegistry()
+    cleaner.assign_surrogate_keys(registry)
+    delta = cleaner.get_cleaned_data()
+
+    # Skip orders that were already ingested
+    if 'Order ID' in delta.columns:
+        existing_ids = store.load('retail_sales_cleaned', columns=['Order ID'])['Order ID']
+        delta = delta[~delta['Order ID'].isin(existing_ids)]
+    if delta.empty:
+        print("No new orders to ingest.")
+        return delta
+
+    previous_version = store.data_version('retail_sales_cleaned')
+    raw_delta = new_df.loc[delta.index]
+    raw_delta = raw_delta.assign(**{col: pd.to_datetime(raw_delta[col]) for col in DATE_COLUMNS if col in raw_delta.columns})
+    ArtifactStore(RAW_DATA_DIR).append(raw_delta, 'retail_sales_dataset')
+    store.append(delta, 'retail_sales_cleaned')
+    registry.save()
+    print(f"Appended {len(delta)} orders to retail_sales_cleaned.")
+
+    # Fold the delta into the materialized aggregates (they are additive)
+    aggs, aggs_version = load_aggregates(store)
+    if aggs is not None and aggs_version == previous_version:
+        delta_aggs = build_aggregates(delta[AGGREGATE_INPUT_COLUMNS], seed=None)
+        save_aggregates(merge_aggregates(aggs, delta_aggs), store, store.data_version('retail_sales_cleaned'))
+    else:
+        refresh_aggregates(store)
+    publish_dataset(store)
+
+    flag_anomalies(delta, store)
+
+    # Recompute lag/rolling/EMA features for the affected tail only
+    features = store.load('daily_sales_features', index_col='Order Date')
+    engineer = FeatureEngineer(delta[['Order Date', 'Total Sales']])
+    try:
+        updated = engineer.update_modeling_data(features, target_col='Total Sales')
+    except ValueError as e:
+        print(f"{e} Rebuilding features from the cleaned store...")
+        updated = build_features(store.load('retail_sales_cleaned', columns=['Order Date', 'Total Sales']))
+
+    store.save(updated, 'daily_sales_features', index=True)
+    print(f"Updated daily_sales_features: {len(updated) - len(features)} new days.")
+
+    return delta
+
+def run_append(input_path, export_csv=False):
+    print(f"Appending new orders from {input_path}...")
+    new_df = pd.read_csv(input_path)
+    return append_orders(new_df, export_csv=export_csv)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new orders to the cleaned store and features.")
+    parser.add_argument('input_path', help="CSV file of new raw orders")
+    args = parser.parse_args()
+    run_append(args.input_path)
@@ -0,0 +1,53 @@
+import sys
+import os
+import argparse
+import json
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest import backtest, BACKTEST_WINDOWS
+from src.artifact_store import ArtifactStore
+from scripts.run_forecasting import load_forecast_models
+
+def save_backtest(fold_metrics, summary, settings, reports_dir='reports'):
+    """Writes per-fold and per-model metrics to backtest_metrics.json and returns the path."""
+    backtest_path = os.path.join(reports_dir, 'backtest_metrics.json')
+    report = {
+        **settings,
+        'summary': summary.to_dict(orient='index'),
+        'folds': fold_metrics.astype({col: str for col in ['Train Start', 'Origin', 'Test End']}).to_dict(orient='records'),
+    }
+    with open(backtest_path, 'w') as f:
+        json.dump(report, f, indent=4, default=float)
+    return backtest_path
+
+def run_backtest(horizon=30, n_folds=5, window='expanding', max_workers=None):
+    print("Starting Backtesting...")
+    
+    store = ArtifactStore()
+    if not store.exists('daily_sales_features'):
+        print("Error: daily_sales_features not found. Run run_features.py first.")
+        return
+        
+    df = store.load('daily_sales_features', columns=['Total Sales'], index_col='Order Date')
+    
+    fold_metrics, summary = backtest(df, load_forecast_models(), horizon=horizon, n_folds=n_folds,
+                                     window=window, max_workers=max_workers)
+    print(summary.to_string())
+    
+    # The dashboard only shows the backtest while it matches the current features
+    settings = {'window': window, 'horizon': horizon, 'n_folds': n_folds,
+                'data_version': store.data_version('daily_sales_features')}
+    backtest_path = save_backtest(fold_metrics, summary, settings)
+    print(f"\nBacktesting complete. Metrics saved to {backtest_path}")
+    return fold_metrics, summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecast models.")
+    parser.add_argument('--horizon', type=int, default=30, help="Days forecast per fold")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--window', choices=BACKTEST_WINDOWS, default='expanding')
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    run_backtest(args.horizon, args.folds, args.window, args.jobs)
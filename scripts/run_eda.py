@@ -7,25 +7,14 @@ import json
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.eda_visualizer import EDAVisualizer
+from src.artifact_store import ArtifactStore
 
-def run_eda():
-    print("Starting Exploratory Data Analysis...")
-    
-    # Load processed data
-    input_path = os.path.join('data', 'processed', 'retail_sales_cleaned.csv')
-    if not os.path.exists(input_path):
-        print(f"Error: {input_path} not found. Run run_pipeline.py first.")
-        return
-        
-    df = pd.read_csv(input_path)
-    # Convert dates back to datetime
-    df['Order Date'] = pd.to_datetime(df['Order Date'])
-    
+def compute_eda(df, figures_dir=os.path.join('reports', 'figures')):
+    """Generates the EDA plots for cleaned data and returns the summary stats."""
     # Initialize visualizer
     viz = EDAVisualizer(df)
     
     # Create figures directory
-    figures_dir = os.path.join('reports', 'figures')
     os.makedirs(figures_dir, exist_ok=True)
     
     # Generate and save plots
@@ -54,12 +43,31 @@ def run_eda():
     viz.plot_correlation_heatmap(save_path=os.path.join(figures_dir, 'correlation_heatmap.png'))
     
     # Generate Summary Stats
-    stats = viz.generate_summary_stats()
-    
-    # Save insights to JSON
-    insights_path = os.path.join('reports', 'eda_insights.json')
+    return viz.generate_summary_stats()
+
+def save_eda_insights(stats, reports_dir='reports'):
+    """Writes EDA summary stats to eda_insights.json and returns the path."""
+    insights_path = os.path.join(reports_dir, 'eda_insights.json')
     with open(insights_path, 'w') as f:
         json.dump(stats, f, indent=4)
+    return insights_path
+
+def run_eda():
+    print("Starting Exploratory Data Analysis...")
+    
+    # Load processed data
+    store = ArtifactStore()
+    if not store.exists('retail_sales_cleaned'):
+        print("Error: retail_sales_cleaned not found. Run run_pipeline.py first.")
+        return
+        
+    df = store.load('retail_sales_cleaned')
+    
+    figures_dir = os.path.join('reports', 'figures')
+    stats = compute_eda(df, figures_dir=figures_dir)
+    
+    # Save insights to JSON
+    insights_path = save_eda_insights(stats)
         
     print(f"EDA complete. Plots saved to {figures_dir}")
     print(f"Insights saved to {insights_path}")
@@ -6,29 +6,34 @@ import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.feature_engineer import FeatureEngineer
+from src.artifact_store import ArtifactStore
 
-def run_feature_engineering():
+# Columns of the cleaned data needed to build the daily series
+FEATURE_INPUT_COLUMNS = ['Order Date', 'Total Sales']
+
+def build_features(df):
+    """Builds the daily modeling frame from cleaned transactions."""
+    engineer = FeatureEngineer(df[FEATURE_INPUT_COLUMNS])
+    return engineer.prepare_modeling_data(target_col='Total Sales')
+
+def run_feature_engineering(export_csv=False):
     print("Starting Feature Engineering...")
     
     # Load processed data
-    input_path = os.path.join('data', 'processed', 'retail_sales_cleaned.csv')
-    if not os.path.exists(input_path):
-        print(f"Error: {input_path} not found. Run run_pipeline.py first.")
+    store = ArtifactStore(export_csv=export_csv)
+    if not store.exists('retail_sales_cleaned'):
+        print("Error: retail_sales_cleaned not found. Run run_pipeline.py first.")
         return
         
-    df = pd.read_csv(input_path)
-    df['Order Date'] = pd.to_datetime(df['Order Date'])
-    
-    # Initialize engineer
-    engineer = FeatureEngineer(df)
+    # Only the date and target are needed to build the daily series
+    df = store.load('retail_sales_cleaned', columns=FEATURE_INPUT_COLUMNS)
     
     # Prepare data for modeling (Daily Sales)
     print("Preparing daily sales data with features...")
-    df_features = engineer.prepare_modeling_data(target_col='Total Sales')
+    df_features = build_features(df)
     
     # Save feature-rich data
-    output_path = os.path.join('data', 'processed', 'daily_sales_features.csv')
-    df_features.to_csv(output_path)
+    output_path = store.save(df_features, 'daily_sales_features', index=True)
     print(f"Saved modeling data to: {output_path}")
     print(f"Shape: {df_features.shape}")
     print("Features created:", list(df_features.columns))
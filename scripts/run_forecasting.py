@@ -8,61 +8,91 @@ import matplotlib.pyplot as plt
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.forecasting_models import Forecaster
+from src.model_store import ModelStore
+from src.artifact_store import ArtifactStore
 
-def run_forecasting():
-    print("Starting Forecasting...")
-    
-    # Load feature data (Daily Sales)
-    input_path = os.path.join('data', 'processed', 'daily_sales_features.csv')
-    if not os.path.exists(input_path):
-        print(f"Error: {input_path} not found. Run run_features.py first.")
-        return
-        
-    df = pd.read_csv(input_path)
-    df['Order Date'] = pd.to_datetime(df['Order Date'])
-    df = df.set_index('Order Date')
+SARIMA_ORDER_FILE = 'sarima_order.json'
+
+# Models fitted by default; fitted concurrently by Forecaster.fit_models
+FORECAST_MODELS = [
+    {'name': 'SARIMA', 'kind': 'sarima', 'timeout': 600},
+    {'name': 'Prophet', 'kind': 'prophet', 'timeout': 600, 'return_model': True},
+    # Feature-based regression: a cheap baseline that fits in milliseconds
+    {'name': 'Ridge', 'kind': 'ml', 'params': {'estimator': 'ridge', 'strategy': 'direct'}, 'timeout': 600},
+]
+
+def load_forecast_models(reports_dir='reports'):
+    """FORECAST_MODELS with the SARIMA order chosen by run_order_search.py, if one was saved."""
+    order_path = os.path.join(reports_dir, SARIMA_ORDER_FILE)
+    if not os.path.exists(order_path):
+        return FORECAST_MODELS
+    with open(order_path, 'r') as f:
+        selected = json.load(f)
+    params = {'order': tuple(selected['order']), 'seasonal_order': tuple(selected['seasonal_order'])}
+    print(f"Using selected SARIMA{params['order']}x{params['seasonal_order']}")
+    return [dict(spec, params=params) if spec['kind'] == 'sarima' else spec for spec in FORECAST_MODELS]
+
+def fit_forecasts(df, forecast_days=90, figures_dir=os.path.join('reports', 'figures'),
+                  models=FORECAST_MODELS, max_workers=None, model_dir=os.path.join('data', 'models')):
+    """Fits the forecast models concurrently, saves plots and returns the metrics of those that finished.
     
+    Fitted models are kept in a ModelStore under model_dir (None disables it) so unchanged
+    data reuses them and appended data warm-starts from them.
+    """
     # Initialize forecaster
-    forecaster = Forecaster(df)
+    forecaster = Forecaster(df, model_store=ModelStore(model_dir) if model_dir else None)
     
     # Create figures directory
-    figures_dir = os.path.join('reports', 'figures')
     os.makedirs(figures_dir, exist_ok=True)
     
-    # 1. SARIMA Model
-    print("\n--- Running SARIMA ---")
-    arima_model, arima_pred, arima_conf, arima_metrics = forecaster.run_arima(forecast_days=90)
-    print("SARIMA Metrics:", arima_metrics)
+    print("\n--- Fitting " + ", ".join(spec['name'] for spec in models) + " ---")
+    results = forecaster.fit_models(models, forecast_days=forecast_days, max_workers=max_workers)
+    train, test = forecaster.train_test_split(test_days=forecast_days)
     
-    # Plot SARIMA
-    train, test = forecaster.train_test_split(test_days=90)
-    forecaster.plot_forecast(train, test, arima_pred, 'SARIMA Forecast vs Actual', 
-                             save_path=os.path.join(figures_dir, 'sarima_forecast.png'))
+    metrics = {}
+    for name, result in results.items():
+        if result['status'] != 'ok':
+            print(f"{name} skipped ({result['status']})")
+            continue
+        metrics[name] = result['metrics']
+        print(f"{name} Metrics:", result['metrics'])
+        
+        # Prophet has its own plot method
+        if result.get('forecast') is not None and result.get('model') is not None:
+            fig1 = result['model'].plot(result['forecast'])
+            fig1.savefig(os.path.join(figures_dir, f'{name.lower()}_forecast_full.png'))
+            plt.close(fig1)
+        
+        # Custom plot for comparison
+        file_name = f'{name.lower()}_forecast_comparison.png' if result.get('forecast') is not None else f'{name.lower()}_forecast.png'
+        forecaster.plot_forecast(train, test, result['prediction'], f'{name} Forecast vs Actual',
+                                 save_path=os.path.join(figures_dir, file_name))
     
-    # 2. Prophet Model
-    print("\n--- Running Prophet ---")
-    prophet_model, prophet_forecast, prophet_metrics = forecaster.run_prophet(forecast_days=90)
-    print("Prophet Metrics:", prophet_metrics)
+    return metrics
+
+def save_metrics(metrics, reports_dir='reports'):
+    """Writes model metrics to model_metrics.json and returns the path."""
+    metrics_path = os.path.join(reports_dir, 'model_metrics.json')
+    with open(metrics_path, 'w') as f:
+        json.dump(metrics, f, indent=4)
+    return metrics_path
+
+def run_forecasting():
+    print("Starting Forecasting...")
     
-    # Plot Prophet
-    # Prophet has its own plot method
-    fig1 = prophet_model.plot(prophet_forecast)
-    fig1.savefig(os.path.join(figures_dir, 'prophet_forecast_full.png'))
+    # Load feature data (Daily Sales)
+    store = ArtifactStore()
+    if not store.exists('daily_sales_features'):
+        print("Error: daily_sales_features not found. Run run_features.py first.")
+        return
+        
+    df = store.load('daily_sales_features', columns=['Total Sales'], index_col='Order Date')
     
-    # Custom plot for comparison
-    prophet_pred = prophet_forecast.tail(90)['yhat'].values
-    forecaster.plot_forecast(train, test, prophet_pred, 'Prophet Forecast vs Actual',
-                             save_path=os.path.join(figures_dir, 'prophet_forecast_comparison.png'))
+    figures_dir = os.path.join('reports', 'figures')
+    metrics = fit_forecasts(df, forecast_days=90, figures_dir=figures_dir, models=load_forecast_models())
     
     # Save metrics
-    metrics = {
-        'SARIMA': arima_metrics,
-        'Prophet': prophet_metrics
-    }
-    
-    metrics_path = os.path.join('reports', 'model_metrics.json')
-    with open(metrics_path, 'w') as f:
-        json.dump(metrics, f, indent=4)
+    metrics_path = save_metrics(metrics)
         
     print(f"\nForecasting complete. Plots saved to {figures_dir}")
     print(f"Metrics saved to {metrics_path}")
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+import json
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.hierarchical_forecast import HierarchicalForecaster, HIERARCHY_LEVELS, RECONCILIATION_METHODS
+from src.artifact_store import ArtifactStore
+
+def run_hierarchical_forecasting(model='sarima', method='wls', forecast_days=90, max_workers=None,
+                                 reports_dir='reports'):
+    print("Starting Hierarchical Forecasting...")
+    
+    store = ArtifactStore()
+    if not store.exists('retail_sales_cleaned'):
+        print("Error: retail_sales_cleaned not found. Run run_pipeline.py first.")
+        return
+        
+    df = store.load('retail_sales_cleaned', columns=['Order Date', 'Total Sales'] + HIERARCHY_LEVELS)
+    
+    forecaster = HierarchicalForecaster(df)
+    forecasts, metrics = forecaster.fit(kind=model, forecast_days=forecast_days, method=method,
+                                        max_workers=max_workers)
+    
+    # Save forecasts and per-level accuracy
+    store.save(forecasts, 'hierarchical_forecast')
+    metrics_path = os.path.join(reports_dir, 'hierarchical_metrics.json')
+    summary = {
+        'model': model,
+        'reconciliation': method,
+        'levels': ['Total'] + HIERARCHY_LEVELS,
+        'by_level': forecaster.level_metrics(metrics),
+        'nodes': metrics.to_dict(orient='records'),
+    }
+    with open(metrics_path, 'w') as f:
+        json.dump(summary, f, indent=4, default=float)
+        
+    print(f"\nHierarchical forecasting complete: {len(metrics)} nodes reconciled with '{method}'.")
+    print(f"Metrics saved to {metrics_path}")
+    return forecasts, metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast every Category x Region x State node and reconcile.")
+    parser.add_argument('--model', choices=['sarima', 'prophet', 'ml'], default='sarima')
+    parser.add_argument('--method', choices=RECONCILIATION_METHODS, default='wls')
+    parser.add_argument('--forecast-days', type=int, default=90)
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    run_hierarchical_forecasting(args.model, args.method, args.forecast_days, args.jobs)
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+import json
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.forecasting_models import Forecaster
+from src.model_store import ModelStore
+from src.order_search import best_sarima_order, SEARCH_CRITERIA
+from src.artifact_store import ArtifactStore
+from scripts.run_forecasting import SARIMA_ORDER_FILE
+
+def run_order_search(criterion='aic', forecast_days=90, max_workers=None, reports_dir='reports'):
+    print("Starting SARIMA order search...")
+    
+    store = ArtifactStore()
+    if not store.exists('daily_sales_features'):
+        print("Error: daily_sales_features not found. Run run_features.py first.")
+        return
+        
+    df = store.load('daily_sales_features', columns=['Total Sales'], index_col='Order Date')
+    
+    forecaster = Forecaster(df, model_store=ModelStore())
+    ranking = forecaster.select_arima_order(criterion=criterion, forecast_days=forecast_days,
+                                            max_workers=max_workers)
+    
+    # Save full ranking and the selected order for run_forecasting.py
+    os.makedirs(reports_dir, exist_ok=True)
+    ranking.to_csv(os.path.join(reports_dir, 'sarima_order_search.csv'), index=False)
+    print(ranking.head(10).to_string(index=False))
+    
+    best = best_sarima_order(ranking)
+    if best is None:
+        print("No candidate converged; keeping the default SARIMA order.")
+        return ranking
+        
+    order_path = os.path.join(reports_dir, SARIMA_ORDER_FILE)
+    with open(order_path, 'w') as f:
+        json.dump({'order': best[0], 'seasonal_order': best[1], 'criterion': criterion}, f, indent=4)
+    print(f"\nSelected SARIMA{best[0]}x{best[1]} by {criterion}. Saved to {order_path}")
+    return ranking
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search SARIMA orders in parallel and save the best one.")
+    parser.add_argument('--criterion', choices=SEARCH_CRITERIA, default='aic')
+    parser.add_argument('--forecast-days', type=int, default=90)
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    run_order_search(args.criterion, args.forecast_days, args.jobs)
@@ -1,25 +1,25 @@
 import sys
 import os
+import json
 import pandas as pd
 import numpy as np
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.data_cleaner import DataCleaner
+from src.data_cleaner import DataCleaner, ChunkedDataCleaner
+from src.artifact_store import ArtifactStore
+from src.schema import KeyRegistry, apply_schema, memory_report
+from src.aggregates import refresh_aggregates
+from src.shared_dataset import publish_dataset
 
-def run_cleaning_pipeline():
-    print("Starting data cleaning pipeline...")
-    
-    # Load raw data
-    input_path = os.path.join('data', 'raw', 'retail_sales_dataset.csv')
-    if not os.path.exists(input_path):
-        print(f"Error: {input_path} not found. Run generate_data.py first.")
-        return
-        
-    df = pd.read_csv(input_path)
-    print(f"Loaded raw data: {df.shape}")
+CLEANING_STATS_FILE = 'cleaning_stats.json'
+
+def clean_data(df, key_dir=os.path.join('data', 'processed', 'keys')):
+    """Runs the cleaning steps on a raw DataFrame and returns the cleaned copy.
     
+    Surrogate keys are assigned from (and new ones recorded in) the registry in key_dir.
+    """
     # Initialize cleaner
     cleaner = DataCleaner(df)
     
@@ -42,15 +42,73 @@ def run_cleaning_pipeline():
     # Create time features
     cleaner.create_time_features('Order Date')
     
-    # Get cleaned data
-    df_cleaned = cleaner.get_cleaned_data()
+    # Integer surrogate keys for customers and products
+    registry = KeyRegistry(key_dir)
+    cleaner.assign_surrogate_keys(registry)
+    registry.save()
+    
+    # Get cleaned data with compact dtypes; the statistics travel with it for save_cleaning_stats
+    df = apply_schema(cleaner.get_cleaned_data())
+    df.attrs['cleaning_stats'] = {'fill_values': cleaner.fill_values, 'bounds': cleaner.bounds}
+    return df
+
+def save_cleaning_stats(store, stats):
+    """Writes the fill values and outlier bounds a full cleaning run used next to its output."""
+    stats_path = os.path.join(store.base_dir, CLEANING_STATS_FILE)
+    with open(stats_path, 'w') as f:
+        json.dump({'fill_values': stats['fill_values'],
+                   'bounds': {col: list(bounds) for col, bounds in stats['bounds'].items()}},
+                  f, indent=4, default=str)
+    return stats_path
+
+def load_cleaning_stats(store):
+    """Returns the stats saved by save_cleaning_stats, or None if no full run saved any."""
+    stats_path = os.path.join(store.base_dir, CLEANING_STATS_FILE)
+    if not os.path.exists(stats_path):
+        return None
+    with open(stats_path, 'r') as f:
+        return json.load(f)
+
+def run_cleaning_pipeline(export_csv=False, chunksize=None):
+    print("Starting data cleaning pipeline...")
+    
+    # Load raw data
+    raw_store = ArtifactStore(os.path.join('data', 'raw'))
+    if not raw_store.exists('retail_sales_dataset'):
+        print("Error: retail_sales_dataset not found in data/raw. Run generate_data.py first.")
+        return
+        
+    store = ArtifactStore(export_csv=export_csv)
+    if chunksize:
+        # Out-of-core mode: memory is bounded by one chunk plus one dedup hash partition
+        print(f"Cleaning in chunks of {chunksize} rows...")
+        cleaner = ChunkedDataCleaner(raw_store, 'retail_sales_dataset', chunksize=chunksize)
+        cleaner.collect_statistics()
+        output_path = cleaner.clean(store, 'retail_sales_cleaned')
+        save_cleaning_stats(store, {'fill_values': cleaner.fill_values, 'bounds': cleaner.bounds})
+        print(f"Saved cleaned data to: {output_path}")
+        refresh_aggregates(store, chunksize=chunksize)
+        publish_dataset(store)
+        return output_path
+        
+    df = raw_store.load('retail_sales_dataset')
+    print(f"Loaded raw data: {df.shape}")
+    
+    df_cleaned = clean_data(df)
     
     # Save processed data
-    output_path = os.path.join('data', 'processed', 'retail_sales_cleaned.csv')
-    df_cleaned.to_csv(output_path, index=False)
+    output_path = store.save(df_cleaned, 'retail_sales_cleaned')
+    save_cleaning_stats(store, df_cleaned.attrs['cleaning_stats'])
     print(f"Saved cleaned data to: {output_path}")
     print(f"Final shape: {df_cleaned.shape}")
     
+    report = memory_report(df_cleaned)
+    print(f"Memory: {report.loc['Total', 'Default MB']:.1f} MB with default dtypes, "
+          f"{report.loc['Total', 'Compact MB']:.1f} MB with the schema ({report.loc['Total', 'Ratio']:.1f}x smaller)")
+    
+    # Materialize dashboard aggregates and publish the new data version for the dashboard
+    publish_dataset(store)
+    
     return df_cleaned
 
 if __name__ == "__main__":
@@ -1,97 +1,212 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.cluster import KMeans
+import os
+import multiprocessing
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from src.anomaly_detector import AnomalyDetector
+
+RFM_COLUMNS = ['Recency', 'Frequency', 'Monetary']
+
+# Segment names by value rank (lowest first) for small k; larger k falls back to numbered tiers
+VALUE_TIERS = {
+    2: ['Low Value', 'High Value'],
+    3: ['Low Value', 'Mid Value', 'High Value'],
+    4: ['Low Value', 'Lower-Mid Value', 'Upper-Mid Value', 'High Value'],
+    5: ['Low Value', 'Lower-Mid Value', 'Mid Value', 'Upper-Mid Value', 'High Value'],
+}
+
+
+# Sample shared with every bootstrap worker, set once per process by the pool initializer
+_shared_sample = None
+
+
+def _group_sums(codes, x, y, n_groups, weights=None):
+    # Sufficient statistics of a simple regression, one row per group: n, Σx, Σy, Σxx, Σxy, Σyy
+    w = np.ones(len(x)) if weights is None else weights
+    return np.stack([np.bincount(codes, weights=w * v, minlength=n_groups)
+                     for v in (np.ones(len(x)), x, y, x * x, x * y, y * y)], axis=1)
+
+
+def _slopes(sums, min_obs):
+    n, sx, sy, sxx, sxy, _ = sums.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx_c = sxx - sx * sx / n
+        slopes = (sxy - sx * sy / n) / sxx_c
+    return np.where((n >= min_obs) & (sxx_c > 1e-12), slopes, np.nan)
+
+
+def _init_bootstrap(sample):
+    global _shared_sample
+    _shared_sample = sample
+
+
+def _bootstrap_slopes(args):
+    n_reps, seed, min_obs = args
+    codes, x, y, n_groups = _shared_sample
+    rng = np.random.default_rng(seed)
+    # Poisson(1) row weights approximate resampling with replacement within every group at once
+    return np.stack([_slopes(_group_sums(codes, x, y, n_groups, rng.poisson(1.0, len(x))), min_obs)
+                     for _ in range(n_reps)])
+
+
+def grouped_elasticity(df, group_cols=('Category',), n_boot=0, ci=0.95, min_obs=11, max_workers=None,
+                       random_state=42):
+    """Log-log price elasticity (slope of ln Quantity on ln Unit Price) for every group.
+
+    All groups are fitted in one vectorized pass over their sufficient statistics, so
+    any granularity (e.g. Sub-Category x Region x Segment) costs about one scan of
+    the data. Groups with fewer than min_obs positive price/quantity rows are dropped.
+    With n_boot > 0, percentile confidence intervals come from Poisson bootstrap
+    replicates computed in parallel.
+    """
+    group_cols = list(group_cols)
+    codes, groups = pd.MultiIndex.from_frame(df[group_cols]).factorize()
+    # Rows with a missing group key get code -1
+    valid = (df['Unit Price'] > 0).to_numpy() & (df['Quantity'] > 0).to_numpy() & (codes >= 0)
+    codes, n_groups = codes[valid], len(groups)
+    x = np.log(df['Unit Price'].to_numpy(dtype=float)[valid])
+    y = np.log(df['Quantity'].to_numpy(dtype=float)[valid])
+
+    sums = _group_sums(codes, x, y, n_groups)
+    slopes = _slopes(sums, min_obs)
+
+    n, sx, sy, sxx, sxy, syy = sums.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx_c, syy_c = sxx - sx * sx / n, syy - sy * sy / n
+        residual_ss = np.maximum(syy_c - slopes * (sxy - sx * sy / n), 0)
+        std_error = np.sqrt(residual_ss / (n - 2) / sxx_c)
+
+    result = groups.to_frame(index=False, name=group_cols)
+    result['Price Elasticity'] = slopes
+    result['Std Error'] = std_error
+    result['Observations'] = n.astype(int)
+
+    if n_boot > 0:
+        max_workers = max_workers or min(n_boot, os.cpu_count())
+        reps = [len(chunk) for chunk in np.array_split(np.arange(n_boot), max_workers)]
+        seeds = np.random.SeedSequence(random_state).spawn(len(reps))
+        with multiprocessing.get_context().Pool(processes=max_workers, initializer=_init_bootstrap,
+                                                initargs=((codes, x, y, n_groups),)) as pool:
+            boot = np.vstack(pool.map(_bootstrap_slopes, [(r, seed, min_obs) for r, seed in zip(reps, seeds) if r]))
+        alpha = (1 - ci) / 2
+        fitted = np.isfinite(boot).any(axis=0)
+        bounds = np.full((2, n_groups), np.nan)
+        bounds[:, fitted] = np.nanquantile(boot[:, fitted], [alpha, 1 - alpha], axis=0)
+        result['CI Lower'], result['CI Upper'] = bounds
+
+    result = result[np.isfinite(result['Price Elasticity'])].reset_index(drop=True)
+    result['Interpretation'] = np.where(result['Price Elasticity'].abs() > 1, 'Elastic', 'Inelastic')
+    return result
+
+
+def build_rfm(df, customer_col='Customer ID'):
+    """Recency (days since last order), Frequency (orders) and Monetary (sales) per customer."""
+    current_date = df['Order Date'].max() + pd.Timedelta(days=1)
+    rfm = df.groupby(customer_col, observed=True, sort=False).agg(
+        Recency=('Order Date', 'max'), Frequency=('Order ID', 'count'), Monetary=('Total Sales', 'sum'))
+    rfm['Recency'] = (current_date - rfm['Recency']).dt.days
+    return rfm.reset_index()
+
+
+def standardize(X):
+    """Z-scores each column; constant columns become zero."""
+    std = X.std(axis=0, ddof=1)
+    return (X - X.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def _kmeans(n_clusters, minibatch=False):
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=4096, n_init=3)
+    return KMeans(n_clusters=n_clusters, random_state=42)
+
+
+def _score_k(args):
+    X, k = args
+    model = _kmeans(k, minibatch=True).fit(X)
+    return {'k': k, 'Inertia': float(model.inertia_), 'Silhouette': float(silhouette_score(X, model.labels_))}
+
+
+def select_n_clusters(X, k_range=range(2, 9), sample_size=10000, max_workers=None, random_state=42):
+    """Scores each candidate k on a sample of X in parallel.
+
+    Returns a DataFrame indexed by k with the sample's inertia and silhouette score;
+    the best k is the one with the highest silhouette.
+    """
+    k_range = [k for k in k_range if 1 < k < len(X)]
+    if not k_range:
+        raise ValueError(f"No candidate k fits {len(X)} customers")
+    if len(X) > sample_size:
+        X = X[np.random.default_rng(random_state).choice(len(X), sample_size, replace=False)]
+
+    max_workers = max_workers or min(len(k_range), os.cpu_count())
+    with multiprocessing.get_context().Pool(processes=max_workers) as pool:
+        scores = pool.map(_score_k, [(X, k) for k in k_range], chunksize=1)
+    return pd.DataFrame(scores).set_index('k')
+
+
+def segment_labels(rfm, cluster_col='Cluster'):
+    """Names clusters by their mean Monetary value, lowest first, for any number of clusters."""
+    order = rfm.groupby(cluster_col)['Monetary'].mean().sort_values().index
+    names = VALUE_TIERS.get(len(order), [f'Value Tier {i}' for i in range(1, len(order) + 1)])
+    return dict(zip(order, names))
+
+
 class AdvancedAnalytics:
     def __init__(self, df):
         self.df = df.copy()
+        self.k_scores = None
+        self.detector = None
         
-    def detect_anomalies(self, contamination=0.01):
-        """Detects anomalies in sales using Isolation Forest."""
-        # Prepare data (Sales and Profit)
-        X = self.df[['Total Sales', 'Profit']].fillna(0)
-        
-        # Train model
-        iso_forest = IsolationForest(contamination=contamination, random_state=42)
-        self.df['Anomaly'] = iso_forest.fit_predict(X)
-        self.df['Anomaly'] = self.df['Anomaly'].map({1: 0, -1: 1}) # 1 for anomaly, 0 for normal
+    def detect_anomalies(self, contamination=0.01, detector=None, max_workers=None):
+        """Flags anomalous sales with per-Category Isolation Forests.
+
+        The fitted detector is persisted and reused; it is only refitted when missing,
+        older than its refit schedule, or when the data has drifted from its training set.
+        """
+        detector = detector or AnomalyDetector(contamination=contamination)
+        if not detector.load() or detector.needs_refit(self.df):
+            detector.fit(self.df, max_workers=max_workers)
+            detector.save()
+        self.detector = detector
+
+        flags = detector.score(self.df)
+        self.df['Anomaly Score'] = flags['Anomaly Score']
+        self.df['Anomaly'] = flags['Anomaly'] # 1 for anomaly, 0 for normal
         
         num_anomalies = self.df['Anomaly'].sum()
         print(f"Detected {num_anomalies} anomalies.")
         
         return self.df
         
-    def calculate_price_elasticity(self):
-        """Calculates price elasticity of demand."""
-        # Elasticity = % Change in Quantity / % Change in Price
-        # We'll do this by Category
-        elasticity_data = []
-        
-        for category in self.df['Category'].unique():
-            cat_df = self.df[self.df['Category'] == category]
-            
-            # Log-log regression to find elasticity
-            # ln(Quantity) = a + b * ln(Price)
-            # b is the elasticity
-            
-            # Filter out zero or negative prices/quantities
-            cat_df = cat_df[(cat_df['Unit Price'] > 0) & (cat_df['Quantity'] > 0)]
-            
-            if len(cat_df) > 10:
-                x = np.log(cat_df['Unit Price'])
-                y = np.log(cat_df['Quantity'])
-                
-                slope, intercept = np.polyfit(x, y, 1)
-                elasticity_data.append({
-                    'Category': category,
-                    'Price Elasticity': slope,
-                    'Interpretation': 'Elastic' if abs(slope) > 1 else 'Inelastic'
-                })
-                
-        return pd.DataFrame(elasticity_data)
-        
-    def perform_customer_segmentation(self, n_clusters=3):
-        """Segments customers using RFM analysis and K-Means."""
-        # RFM Analysis
-        # Recency: Days since last order
-        # Frequency: Total number of orders
-        # Monetary: Total sales value
-        
-        current_date = self.df['Order Date'].max() + pd.Timedelta(days=1)
-        
-        rfm = self.df.groupby('Customer ID').agg({
-            'Order Date': lambda x: (current_date - x.max()).days,
-            'Order ID': 'count',
-            'Total Sales': 'sum'
-        }).reset_index()
-        
-        rfm.columns = ['Customer ID', 'Recency', 'Frequency', 'Monetary']
-        
-        # Normalize
-        X = rfm[['Recency', 'Frequency', 'Monetary']]
-        X_norm = (X - X.mean()) / X.std()
-        
-        # K-Means
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        rfm['Cluster'] = kmeans.fit_predict(X_norm)
-        
-        # Label clusters (simple logic based on Monetary)
-        cluster_avg = rfm.groupby('Cluster')['Monetary'].mean().sort_values()
-        cluster_map = {
-            cluster_avg.index[0]: 'Low Value',
-            cluster_avg.index[1]: 'Mid Value',
-            cluster_avg.index[2]: 'High Value'
-        }
-        if n_clusters > 3: # Fallback if more clusters
-             cluster_map = {i: f'Cluster {i}' for i in range(n_clusters)}
-             
-        rfm['Segment'] = rfm['Cluster'].map(cluster_map)
+    def calculate_price_elasticity(self, group_cols=('Category',), n_boot=0, ci=0.95, max_workers=None):
+        """Calculates price elasticity of demand per group (see grouped_elasticity)."""
+        return grouped_elasticity(self.df, group_cols, n_boot=n_boot, ci=ci, max_workers=max_workers)
         
+    def perform_customer_segmentation(self, n_clusters=None, k_range=range(2, 9), sample_size=10000,
+                                      minibatch_threshold=50000, max_workers=None):
+        """Segments customers using RFM analysis and K-Means.
+
+        With n_clusters=None the number of segments is chosen by select_n_clusters.
+        Above minibatch_threshold customers the final model is a MiniBatchKMeans.
+        """
+        rfm = build_rfm(self.df)
+        X = standardize(rfm[RFM_COLUMNS].to_numpy(dtype=float))
+
+        if n_clusters is None:
+            self.k_scores = select_n_clusters(X, k_range, sample_size, max_workers=max_workers)
+            n_clusters = int(self.k_scores['Silhouette'].idxmax())
+            print(f"Selected {n_clusters} customer segments.")
+
+        kmeans = _kmeans(n_clusters, minibatch=len(X) > minibatch_threshold)
+        rfm['Cluster'] = kmeans.fit_predict(X)
+        rfm['Segment'] = rfm['Cluster'].map(segment_labels(rfm))
+
         return rfm
-        
+
     def plot_anomalies(self, save_path=None):
         """Plots anomalies."""
         plt.figure(figsize=(10, 6))
@@ -0,0 +1,120 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Transaction columns the aggregates are built from
+AGGREGATE_INPUT_COLUMNS = ['Order Date', 'Total Sales', 'Profit', 'Quantity', 'Discount',
+                           'Category', 'Region', 'State', 'Product Name']
+
+# Table name -> grouping key
+AGGREGATE_KEYS = {
+    'monthly': 'Order Date',
+    'region': 'Region',
+    'state': 'State',
+    'category': 'Category',
+    'product': 'Product Name',
+}
+
+# Rows kept for the transaction-level scatter plot
+SAMPLE_COLUMNS = ['Discount', 'Profit', 'Category', 'Quantity', 'Product Name']
+MANIFEST_NAME = 'aggregates.json'
+
+
+def _totals(df, key):
+    grouper = pd.Grouper(key=key, freq='ME') if key == 'Order Date' else key
+    return df.groupby(grouper, observed=True).agg(**{
+        'Total Sales': ('Total Sales', 'sum'),
+        'Profit': ('Profit', 'sum'),
+        'Orders': ('Total Sales', 'size'),
+    }).reset_index()
+
+
+def _kpis(category_totals):
+    total_sales = float(category_totals['Total Sales'].sum())
+    total_profit = float(category_totals['Profit'].sum())
+    return {
+        'Total Sales': total_sales,
+        'Total Profit': total_profit,
+        'Total Orders': int(category_totals['Orders'].sum()),
+        'Profit Margin': total_profit / total_sales * 100 if total_sales else 0.0,
+    }
+
+
+def build_aggregates(df, sample_size=5000, seed=42):
+    """Builds the dashboard's month/region/state/category/product totals and KPIs.
+
+    All tables are additive, so aggregates of disjoint batches can be combined with
+    merge_aggregates(). The scatter sample keeps the rows with the smallest random
+    keys (bottom-k sampling), which also merges into a uniform sample.
+    """
+    aggs = {name: _totals(df, key) for name, key in AGGREGATE_KEYS.items()}
+
+    sample = df[SAMPLE_COLUMNS].copy()
+    sample['_key'] = np.random.default_rng(seed).random(len(sample))
+    aggs['sample'] = sample.nsmallest(sample_size, '_key').reset_index(drop=True)
+
+    aggs['kpis'] = _kpis(aggs['category'])
+    return aggs
+
+
+def merge_aggregates(left, right, sample_size=5000):
+    """Combines aggregates built from two disjoint sets of transactions."""
+    merged = {}
+    for name, key in AGGREGATE_KEYS.items():
+        combined = pd.concat([left[name], right[name]], ignore_index=True)
+        merged[name] = combined.groupby(key, observed=True)[['Total Sales', 'Profit', 'Orders']].sum().reset_index()
+
+    sample = pd.concat([left['sample'], right['sample']], ignore_index=True)
+    merged['sample'] = sample.nsmallest(sample_size, '_key').reset_index(drop=True)
+
+    merged['kpis'] = _kpis(merged['category'])
+    return merged
+
+
+def build_aggregates_chunked(store, name='retail_sales_cleaned', chunksize=500_000, sample_size=5000):
+    """Builds aggregates from an artifact chunk by chunk with bounded memory."""
+    aggs = None
+    for i, chunk in enumerate(store.iter_chunks(name, chunksize=chunksize, columns=AGGREGATE_INPUT_COLUMNS)):
+        # Distinct seeds per chunk keep the sample keys independent
+        chunk_aggs = build_aggregates(chunk, sample_size=sample_size, seed=i)
+        aggs = chunk_aggs if aggs is None else merge_aggregates(aggs, chunk_aggs, sample_size=sample_size)
+    return aggs
+
+
+def save_aggregates(aggs, store, data_version):
+    """Writes aggregate tables as artifacts and KPIs plus data version to a manifest."""
+    for table in list(AGGREGATE_KEYS) + ['sample']:
+        store.save(aggs[table], f'agg_{table}')
+    manifest = {'data_version': data_version, 'kpis': aggs['kpis']}
+    with open(os.path.join(store.base_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+
+def load_aggregates(store):
+    """Returns (aggregates, data_version) from disk, or (None, None) if not materialized."""
+    manifest_path = os.path.join(store.base_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None, None
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    aggs = {'kpis': manifest['kpis']}
+    for table in list(AGGREGATE_KEYS) + ['sample']:
+        if not store.exists(f'agg_{table}'):
+            return None, None
+        aggs[table] = store.load(f'agg_{table}')
+    return aggs, manifest['data_version']
+
+
+def refresh_aggregates(store, name='retail_sales_cleaned', chunksize=500_000):
+    """Loads materialized aggregates, rebuilding them if the cleaned data has changed."""
+    version = store.data_version(name)
+    aggs, stored_version = load_aggregates(store)
+    if aggs is not None and stored_version == version:
+        return aggs, version
+
+    print("Materializing dashboard aggregates...")
+    aggs = build_aggregates_chunked(store, name, chunksize=chunksize)
+    save_aggregates(aggs, store, version)
+    return aggs, version
@@ -0,0 +1,144 @@
+import os
+import time
+import pickle
+import multiprocessing
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+ANOMALY_FEATURES = ['Total Sales', 'Profit']
+
+# Model used for transactions whose group has no model of its own (or too few rows to fit one)
+GLOBAL_MODEL = '__all__'
+
+# Population stability index above which a feature is considered to have drifted
+DRIFT_THRESHOLD = 0.25
+
+
+def _fit_group(args):
+    name, X, contamination = args
+    model = IsolationForest(contamination=contamination, random_state=42).fit(X)
+    # Decile edges of each feature on the training data, the reference for drift checks
+    edges = np.quantile(X, np.linspace(0, 1, 11)[1:-1], axis=0).T
+    reference = np.stack([_bin_shares(X[:, j], edges[j]) for j in range(X.shape[1])])
+    return name, {'model': model, 'edges': edges, 'reference': reference, 'n_obs': len(X)}
+
+
+def _bin_shares(values, edges):
+    counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+    return counts / max(len(values), 1)
+
+
+def population_stability(expected, actual, eps=1e-4):
+    """PSI between two bin-share vectors; above ~0.25 is usually read as a material shift."""
+    expected, actual = np.clip(expected, eps, None), np.clip(actual, eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class AnomalyDetector:
+    """Isolation Forests per group (Category by default), persisted and reused for scoring.
+
+    fit() trains one model per group plus a global fallback in parallel; score()
+    flags any batch of transactions with the stored models, without refitting.
+    needs_refit() reports when the models are older than refit_days or when a
+    batch's feature distribution has drifted from the training data.
+    """
+
+    def __init__(self, path=os.path.join('data', 'models', 'anomaly', 'detector.pkl'), contamination=0.01,
+                 group_col='Category', features=ANOMALY_FEATURES, refit_days=7, min_group_size=200):
+        self.path = path
+        self.contamination = contamination
+        self.group_col = group_col
+        self.features = list(features)
+        self.refit_days = refit_days
+        self.min_group_size = min_group_size
+        self.models = {}
+        self.fitted_at = None
+
+    def _matrix(self, df):
+        return df[self.features].fillna(0).to_numpy(dtype=float)
+
+    def fit(self, df, max_workers=None):
+        """Fits the global model and one model per group with enough rows, in parallel."""
+        tasks = [(GLOBAL_MODEL, self._matrix(df), self.contamination)]
+        if self.group_col in df.columns:
+            for name, group in df.groupby(self.group_col, observed=True):
+                if len(group) >= self.min_group_size:
+                    tasks.append((str(name), self._matrix(group), self.contamination))
+
+        max_workers = max_workers or min(len(tasks), os.cpu_count())
+        print(f"Fitting {len(tasks)} anomaly models across {max_workers} workers...")
+        with multiprocessing.get_context().Pool(processes=max_workers) as pool:
+            self.models = dict(pool.map(_fit_group, tasks, chunksize=1))
+        self.fitted_at = time.time()
+        return self
+
+    def _groups(self, df):
+        if self.group_col not in df.columns:
+            return np.full(len(df), GLOBAL_MODEL, dtype=object)
+        groups = df[self.group_col].astype(str).to_numpy(dtype=object)
+        return np.where(np.isin(groups, list(self.models)), groups, GLOBAL_MODEL)
+
+    def score(self, df):
+        """Returns a frame aligned with df: 'Anomaly Score' (negative is anomalous) and 'Anomaly' (0/1)."""
+        if not self.models:
+            raise ValueError("Detector is not fitted; call fit() or load() first")
+        X = self._matrix(df)
+        groups = self._groups(df)
+        scores = np.empty(len(df))
+        for name in pd.unique(groups):
+            mask = groups == name
+            scores[mask] = self.models[name]['model'].decision_function(X[mask])
+        return pd.DataFrame({'Anomaly Score': scores, 'Anomaly': (scores < 0).astype('int8')}, index=df.index)
+
+    def drift(self, df, min_rows=200):
+        """Largest feature PSI per group between df and the group's training data.
+
+        Groups with fewer than min_rows rows in df are skipped (their PSI is too noisy).
+        """
+        X = self._matrix(df)
+        groups = self._groups(df)
+        result = {}
+        for name in pd.unique(groups):
+            rows = X[groups == name]
+            if len(rows) < min_rows:
+                continue
+            state = self.models[name]
+            result[name] = max(population_stability(state['reference'][j], _bin_shares(rows[:, j], state['edges'][j]))
+                               for j in range(X.shape[1]))
+        return result
+
+    def needs_refit(self, df=None, threshold=DRIFT_THRESHOLD, min_rows=200):
+        """True when the models are missing or stale, or when any group of df has drifted."""
+        if not self.models or self.fitted_at is None:
+            return True
+        if time.time() - self.fitted_at > self.refit_days * 86400:
+            print(f"Anomaly models are older than {self.refit_days} days.")
+            return True
+        if df is not None:
+            drifted = {name: psi for name, psi in self.drift(df, min_rows).items() if psi > threshold}
+            if drifted:
+                print(f"Drift detected in {sorted(drifted)} (PSI > {threshold}).")
+                return True
+        return False
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {'models': self.models, 'fitted_at': self.fitted_at, 'contamination': self.contamination,
+                 'group_col': self.group_col, 'features': self.features}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Loads the stored models if they were fitted with the same settings; returns whether it did."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as f:
+            state = pickle.load(f)
+        if (state['contamination'], state['group_col'], state['features']) != (self.contamination, self.group_col,
+                                                                               self.features):
+            return False
+        self.models, self.fitted_at = state['models'], state['fitted_at']
+        return True
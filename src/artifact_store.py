@@ -0,0 +1,327 @@
+import os
+import shutil
+import pandas as pd
+from src.schema import DATE_COLUMNS, apply_schema, dictionary_columns
+
+
+def _write_parquet(df, path, index):
+    df.to_parquet(path, index=index, compression='zstd')
+
+
+def _read_parquet(path, columns, index_col):
+    # A saved index is restored by pandas; index_col only needs reading when it is a column
+    if columns is not None and index_col is not None and index_col not in columns \
+            and index_col not in _parquet_index_columns(path):
+        columns = [index_col] + list(columns)
+    # Known text columns come back dictionary-encoded (categorical) without decoding strings
+    names = columns if columns is not None else _parquet_columns(path)
+    df = pd.read_parquet(path, columns=columns, read_dictionary=dictionary_columns(names))
+    if index_col is not None and index_col in df.columns:
+        df = df.set_index(index_col)
+    return df
+
+
+def _parquet_columns(path):
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).schema_arrow.names
+
+
+def _parquet_index_columns(path):
+    import pyarrow.parquet as pq
+    metadata = pq.ParquetFile(path).schema_arrow.pandas_metadata or {}
+    return [col for col in metadata.get('index_columns', []) if isinstance(col, str)]
+
+
+def _write_feather(df, path, index):
+    # Feather cannot store a non-default index, so keep it as a column
+    if index:
+        df = df.reset_index()
+    else:
+        df = df.reset_index(drop=True)
+    df.to_feather(path, compression='zstd')
+
+
+def _read_feather(path, columns, index_col):
+    if columns is not None and index_col is not None and index_col not in columns:
+        columns = [index_col] + list(columns)
+    df = pd.read_feather(path, columns=columns)
+    if index_col is not None and index_col in df.columns:
+        df = df.set_index(index_col)
+    return apply_schema(df)
+
+
+def _write_csv(df, path, index):
+    df.to_csv(path, index=index)
+
+
+def _read_csv(path, columns, index_col):
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = None
+    if columns is not None:
+        usecols = list(columns)
+        if index_col is not None and index_col not in usecols:
+            usecols = [index_col] + usecols
+    wanted = usecols if usecols is not None else header
+    date_cols = [col for col in DATE_COLUMNS if col in wanted]
+
+    df = pd.read_csv(path, usecols=usecols, parse_dates=date_cols, index_col=index_col)
+    if index_col in DATE_COLUMNS:
+        df.index = pd.to_datetime(df.index)
+    return apply_schema(df)
+
+
+FORMATS = {
+    'parquet': ('.parquet', _write_parquet, _read_parquet),
+    'feather': ('.arrow', _write_feather, _read_feather),
+    'csv': ('.csv', _write_csv, _read_csv),
+}
+
+
+def _iter_parquet(path, chunksize, columns):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path, read_dictionary=dictionary_columns(columns or _parquet_columns(path)))
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def _iter_feather(path, chunksize, columns):
+    import pyarrow.ipc as ipc
+    reader = ipc.open_file(path)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns is not None:
+            batch = batch.select(columns)
+        for start in range(0, batch.num_rows, chunksize):
+            yield batch.slice(start, chunksize).to_pandas()
+
+
+def _iter_csv(path, chunksize, columns):
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = columns if columns is not None else header
+    date_cols = [col for col in DATE_COLUMNS if col in wanted]
+    for chunk in pd.read_csv(path, usecols=columns, parse_dates=date_cols, chunksize=chunksize):
+        yield apply_schema(chunk)
+
+
+CHUNK_READERS = {
+    'parquet': _iter_parquet,
+    'feather': _iter_feather,
+    'csv': _iter_csv,
+}
+
+
+def _decode_dictionaries(table, keep=()):
+    # Each chunk has its own categories, so text is streamed plain (Parquet still
+    # dictionary-encodes it on disk) and known columns are re-read as dictionaries.
+    # Columns in keep have the same categories in every chunk and stay encoded.
+    import pyarrow as pa
+    fields = [pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) and f.name not in keep else f
+              for f in table.schema]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+class ChunkWriter:
+    """Appends DataFrame chunks to a single artifact file.
+
+    All chunks must share the schema of the first one. Use as a context manager
+    or call close() to finalize the file. With compact=False chunks are written with
+    their own dtypes instead of being narrowed by apply_schema. Categorical columns
+    listed in dictionaries must have the same categories in every chunk; they are
+    written dictionary-encoded and read back as categoricals.
+    """
+
+    def __init__(self, path, fmt, compact=True, dictionaries=()):
+        self.path = path
+        self.fmt = fmt
+        self.compact = compact
+        self.dictionaries = set(dictionaries)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk):
+        if self.fmt == 'csv':
+            chunk.to_csv(self.path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        else:
+            import pyarrow as pa
+            if self.compact:
+                chunk = apply_schema(chunk)
+            table = _decode_dictionaries(pa.Table.from_pandas(chunk, preserve_index=False), self.dictionaries)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+                else:
+                    import pyarrow.ipc as ipc
+                    self._writer = ipc.new_file(self.path, self._schema,
+                                                options=ipc.IpcWriteOptions(compression='zstd'))
+            self._writer.write_table(table.cast(self._schema))
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._writer is not None and self.fmt != 'csv':
+            self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _format_of(path):
+    for fmt, (ext, _, _) in FORMATS.items():
+        if path.endswith(ext):
+            return fmt
+    return None
+
+
+def _has_index(df):
+    # Only named indexes are data; a default or filtered row index is not stored
+    return any(name is not None for name in df.index.names)
+
+
+def _concat_parts(frames):
+    """Concatenates appended parts, restoring categoricals that concat widened to object."""
+    df = pd.concat(frames, ignore_index=not _has_index(frames[0]))
+    for col, dtype in frames[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+class ArtifactStore:
+    """Reads and writes pipeline artifacts in a typed, columnar format.
+
+    Artifacts are addressed by name (e.g. 'retail_sales_cleaned') and stored as
+    compressed Parquet by default. Reading picks the newest copy in any supported
+    format, so existing CSV artifacts and CSV drop-ins keep working.
+
+    Rows can be appended without rewriting the artifact: each append() lands in a
+    small part file under '<name>.parts/' that load() and iter_chunks() read after
+    the base file. save() replaces the base and drops the parts; compact() merges them.
+    """
+
+    def __init__(self, base_dir=os.path.join('data', 'processed'), fmt='parquet', export_csv=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported artifact format: {fmt}. Choose from {list(FORMATS)}")
+        self.base_dir = base_dir
+        self.fmt = fmt
+        self.export_csv = export_csv
+
+    def path(self, name, fmt=None):
+        """Returns the on-disk path of an artifact in the given format."""
+        ext = FORMATS[fmt or self.fmt][0]
+        return os.path.join(self.base_dir, f"{name}{ext}")
+
+    def find(self, name):
+        """Returns (path, format) of the most recently written copy of an artifact."""
+        found = []
+        for fmt in FORMATS:
+            path = self.path(name, fmt)
+            if os.path.exists(path):
+                # Newest file wins; the configured format breaks ties
+                found.append((os.path.getmtime(path), fmt == self.fmt, path, fmt))
+        if not found:
+            return None, None
+        _, _, path, fmt = max(found)
+        return path, fmt
+
+    def exists(self, name):
+        return self.find(name)[0] is not None
+
+    def data_version(self, name):
+        """Returns a token that changes whenever the artifact or its parts are rewritten."""
+        path, _ = self.find(name)
+        if path is None:
+            return None
+        stamps = []
+        for p in [path] + self.parts(name):
+            stat = os.stat(p)
+            stamps.append(f"{os.path.basename(p)}:{stat.st_mtime_ns}:{stat.st_size}")
+        return '|'.join(stamps)
+
+    def parts_dir(self, name):
+        return os.path.join(self.base_dir, f"{name}.parts")
+
+    def parts(self, name):
+        """Returns the paths of rows appended to an artifact, oldest first."""
+        parts_dir = self.parts_dir(name)
+        if not os.path.isdir(parts_dir):
+            return []
+        return [os.path.join(parts_dir, f) for f in sorted(os.listdir(parts_dir)) if _format_of(f)]
+
+    def _drop_parts(self, name):
+        shutil.rmtree(self.parts_dir(name), ignore_errors=True)
+
+    def remove(self, name):
+        """Deletes every format of an artifact and its appended parts."""
+        self._drop_parts(name)
+        for fmt in FORMATS:
+            if os.path.exists(self.path(name, fmt)):
+                os.remove(self.path(name, fmt))
+
+    def save(self, df, name, index=False):
+        """Writes an artifact, plus a CSV copy when export_csv is enabled."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._drop_parts(name)
+        if self.fmt != 'csv':
+            df = apply_schema(df)
+
+        # Export first so the primary copy is the newest one on disk
+        if self.export_csv and self.fmt != 'csv':
+            _write_csv(df, self.path(name, 'csv'), index)
+
+        path = self.path(name)
+        FORMATS[self.fmt][1](df, path, index)
+        return path
+
+    def load(self, name, columns=None, index_col=None):
+        """Loads an artifact, reading only the requested columns."""
+        path, fmt = self.find(name)
+        if path is None:
+            raise FileNotFoundError(f"Artifact '{name}' not found in {self.base_dir}")
+        df = FORMATS[fmt][2](path, columns, index_col)
+
+        parts = self.parts(name)
+        if parts:
+            frames = [df] + [FORMATS[_format_of(part)][2](part, columns, index_col) for part in parts]
+            df = _concat_parts(frames)
+        return df
+
+    def iter_chunks(self, name, chunksize=500_000, columns=None):
+        """Yields an artifact (including appended parts) as DataFrames of at most chunksize rows."""
+        path, fmt = self.find(name)
+        if path is None:
+            raise FileNotFoundError(f"Artifact '{name}' not found in {self.base_dir}")
+        yield from CHUNK_READERS[fmt](path, chunksize, columns)
+        for part in self.parts(name):
+            yield from CHUNK_READERS[_format_of(part)](part, chunksize, columns)
+
+    def append(self, df, name):
+        """Appends rows as a new part file and returns its path."""
+        if not self.exists(name):
+            return self.save(df, name, index=_has_index(df))
+        parts_dir = self.parts_dir(name)
+        os.makedirs(parts_dir, exist_ok=True)
+        part_name = f"part-{len(self.parts(name)):05d}"
+        path = os.path.join(parts_dir, f"{part_name}{FORMATS[self.fmt][0]}")
+        if self.fmt != 'csv':
+            df = apply_schema(df)
+        FORMATS[self.fmt][1](df, path, _has_index(df))
+        return path
+
+    def compact(self, name):
+        """Merges appended parts back into a single base file."""
+        if self.parts(name):
+            df = self.load(name)
+            self.save(df, name, index=_has_index(df))
+        return self.path(name)
+
+    def open_writer(self, name, compact=True, dictionaries=()):
+        """Returns a ChunkWriter that streams an artifact to disk chunk by chunk."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._drop_parts(name)
+        return ChunkWriter(self.path(name), self.fmt, compact, dictionaries)
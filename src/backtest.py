@@ -0,0 +1,96 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+from src.feature_engineer import FeatureEngineer
+from src.forecasting_models import _fit_spec
+
+BACKTEST_WINDOWS = ('expanding', 'sliding')
+
+# Series and 'ml' feature matrix shared with every backtest worker, set once per
+# process by the pool initializer
+_shared_series = None
+_shared_features = None
+
+
+def rolling_origin_folds(n_obs, horizon=30, n_folds=5, step=None, window='expanding', min_train=365):
+    """Returns (train_start, train_end, test_end) positions for rolling-origin evaluation.
+
+    Forecast origins are step days apart (default: horizon) and end at the last
+    observation. Expanding folds train on everything before the origin; sliding folds
+    keep the training window at min_train days.
+    """
+    if window not in BACKTEST_WINDOWS:
+        raise ValueError(f"Unknown window '{window}'; use one of {BACKTEST_WINDOWS}")
+    step = step or horizon
+    folds = []
+    for i in range(n_folds):
+        train_end = n_obs - horizon - (n_folds - 1 - i) * step
+        if train_end < min_train:
+            continue
+        train_start = 0 if window == 'expanding' else train_end - min_train
+        folds.append((train_start, train_end, train_end + horizon))
+    if not folds:
+        raise ValueError(f"Series of {n_obs} days is too short for {n_folds} folds of {horizon} days "
+                         f"with {min_train} training days")
+    return folds
+
+
+def _init_worker(series, features):
+    global _shared_series, _shared_features
+    _shared_series, _shared_features = series, features
+
+
+def _run_fold(args):
+    name, kind, params, fold_id, (train_start, train_end, test_end) = args
+    train = _shared_series.iloc[train_start:train_end]
+    test = _shared_series.iloc[train_end:test_end]
+    row = {'Model': name, 'Fold': fold_id, 'Train Start': train.index[0], 'Origin': test.index[0],
+           'Test End': test.index[-1], 'Train Days': len(train)}
+    params = dict(params, model_name=name)
+    if kind == 'ml':
+        # Features are causal (lags, trailing windows, calendar), so the rows of the shared
+        # matrix within the training dates match those built from the training slice; sliding
+        # folds also keep their first rows, whose windows reach before the training start
+        params['features'] = _shared_features
+    try:
+        result = _fit_spec(kind, train, test, len(test), params, False)
+        row.update({metric: float(result['metrics'][metric]) for metric in ('RMSE', 'MAE', 'MAPE')})
+    except Exception as e:
+        print(f"{name} fold {fold_id} failed: {e}")
+        row.update({'RMSE': np.nan, 'MAE': np.nan, 'MAPE': np.nan})
+    return row
+
+
+def backtest(df, specs, horizon=30, n_folds=5, step=None, window='expanding', min_train=365, max_workers=None):
+    """Fits every model spec on every fold in parallel and scores each fold's holdout.
+
+    specs use the Forecaster.fit_models format ('name', 'kind', optional 'params').
+    The daily frame, and for 'ml' specs its feature matrix (built once), are sent to
+    each worker once; folds are index ranges into them.
+    Returns (folds, summary): per-fold metrics and their mean/std per model.
+    """
+    series = df[['Total Sales']]
+    if not isinstance(series.index, pd.DatetimeIndex):
+        series = series.set_axis(pd.to_datetime(series.index), axis=0)
+
+    features = None
+    if any(spec['kind'] == 'ml' for spec in specs):
+        features = FeatureEngineer(series['Total Sales'].rename_axis('Order Date').reset_index()).prepare_modeling_data()
+
+    folds = rolling_origin_folds(len(series), horizon, n_folds, step, window, min_train)
+    tasks = [(spec['name'], spec['kind'], spec.get('params', {}), fold_id, fold)
+             for spec in specs for fold_id, fold in enumerate(folds, start=1)]
+
+    max_workers = max_workers or min(len(tasks), os.cpu_count())
+    print(f"Backtesting {len(specs)} models on {len(folds)} {window} folds across {max_workers} workers...")
+    with multiprocessing.get_context().Pool(processes=max_workers, initializer=_init_worker,
+                                            initargs=(series, features)) as pool:
+        rows = pool.map(_run_fold, tasks, chunksize=1)
+
+    fold_metrics = pd.DataFrame(rows)
+    summary = fold_metrics.groupby('Model', sort=False).agg(
+        RMSE=('RMSE', 'mean'), MAE=('MAE', 'mean'), MAPE=('MAPE', 'mean'),
+        **{'RMSE Std': ('RMSE', 'std'), 'Folds': ('RMSE', 'count')})
+    return fold_metrics, summary
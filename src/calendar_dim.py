@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Retail fiscal year starts in February (so the holiday season closes the year) and is
+# named after the calendar year in which it ends
+FISCAL_YEAR_START_MONTH = 2
+HOLIDAY_COUNTRY = 'US'
+
+CALENDAR_COLUMNS = ['Year', 'Quarter', 'Month', 'Week', 'Day', 'DayOfWeek', 'IsWeekend', 'MonthName',
+                    'DayName', 'IsHoliday', 'HolidayName', 'FiscalYear', 'FiscalQuarter', 'FiscalPeriod']
+
+# Date code given to NaT
+MISSING_CODE = np.iinfo(np.int64).min
+
+# Process-wide calendar, extended when a date outside its range is requested
+_calendar = None
+
+
+def date_codes(dates):
+    """Days since 1970-01-01 as int64 (the calendar's join key); NaT maps to a negative sentinel."""
+    values = pd.DatetimeIndex(dates).values.astype('datetime64[D]')
+    codes = values.astype('int64')
+    return np.where(np.isnat(values), MISSING_CODE, codes)
+
+
+def build_calendar(start, end, fiscal_start_month=FISCAL_YEAR_START_MONTH, country=HOLIDAY_COUNTRY):
+    """Builds one row per day from start to end, indexed by date code, with compact dtypes."""
+    import holidays
+
+    dates = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D')
+    country_holidays = holidays.country_holidays(country, years=range(dates.year.min(), dates.year.max() + 1))
+    holiday_names = pd.Series(dict(country_holidays), dtype='object')
+    holiday_names.index = pd.to_datetime(holiday_names.index)
+    holiday_names = holiday_names.reindex(dates)
+
+    fiscal_month = (dates.month - fiscal_start_month) % 12 + 1
+    calendar = pd.DataFrame({
+        'Date': dates,
+        'Year': dates.year.astype('int16'),
+        'Quarter': dates.quarter.astype('int8'),
+        'Month': dates.month.astype('int8'),
+        'Week': dates.isocalendar().week.to_numpy().astype('int8'),
+        'Day': dates.day.astype('int8'),
+        'DayOfWeek': dates.dayofweek.astype('int8'),
+        'IsWeekend': (dates.dayofweek >= 5).astype('int8'),
+        'MonthName': pd.Categorical(dates.month_name(), categories=pd.date_range('2000-01-01', periods=12, freq='MS').month_name()),
+        'DayName': pd.Categorical(dates.day_name(), categories=pd.date_range('2000-01-03', periods=7, freq='D').day_name()),
+        'IsHoliday': holiday_names.notna().to_numpy().astype('int8'),
+        'HolidayName': pd.Categorical(holiday_names.to_numpy()),
+        'FiscalYear': (dates.year + (dates.month >= fiscal_start_month) - (fiscal_start_month == 1)).astype('int16'),
+        'FiscalQuarter': ((fiscal_month - 1) // 3 + 1).astype('int8'),
+        'FiscalPeriod': fiscal_month.astype('int8'),
+    }, index=pd.Index(date_codes(dates), name='DateKey'))
+    return calendar
+
+
+def get_calendar(start, end):
+    """Returns the shared calendar, rebuilding it only if [start, end] is not covered."""
+    global _calendar
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if _calendar is None or start < _calendar['Date'].iloc[0] or end > _calendar['Date'].iloc[-1]:
+        if _calendar is not None:
+            start, end = min(start, _calendar['Date'].iloc[0]), max(end, _calendar['Date'].iloc[-1])
+        _calendar = build_calendar(start, end)
+    return _calendar
+
+
+def calendar_features(dates, columns=CALENDAR_COLUMNS):
+    """Calendar attributes for each date, as a frame aligned with dates.
+
+    Rows are looked up by position (date code minus the calendar's first code), so the
+    join costs one array take regardless of how many rows share a date.
+    """
+    index = dates.index if isinstance(dates, pd.Series) else pd.RangeIndex(len(dates))
+    codes = date_codes(dates)
+    valid = codes != MISSING_CODE
+    if not valid.any():
+        return pd.DataFrame(index=index, columns=list(columns))
+
+    calendar = get_calendar(pd.Timestamp(codes[valid].min(), unit='D'), pd.Timestamp(codes[valid].max(), unit='D'))
+    if valid.all():
+        features = calendar[list(columns)].take(codes - calendar.index[0])
+    else:
+        # Missing dates get missing attributes
+        features = calendar[list(columns)].reindex(codes)
+    features.index = index
+    return features
+
+
+def prophet_holidays(start, end):
+    """Holiday frame (holiday, ds) in the form Prophet(holidays=...) expects."""
+    calendar = get_calendar(start, end)
+    days = calendar[(calendar['Date'] >= pd.Timestamp(start)) & (calendar['Date'] <= pd.Timestamp(end))
+                    & (calendar['IsHoliday'] == 1)]
+    return pd.DataFrame({'holiday': days['HolidayName'].astype(str).values, 'ds': days['Date'].values})
@@ -1,10 +1,30 @@
+import os
+import tempfile
 import pandas as pd
 import numpy as np
 from scipy import stats
+from src.calendar_dim import calendar_features
+from src.schema import COLUMN_TYPES, KeyRegistry, apply_schema
+
+# Calendar attributes added to each transaction by create_time_features
+TIME_FEATURE_COLUMNS = ['Year', 'Quarter', 'Month', 'Week', 'Day', 'DayOfWeek', 'IsWeekend', 'MonthName', 'DayName']
+
+def _categorical_columns(df):
+    return df.select_dtypes(include=['object', 'string', 'category']).columns
+
+
+def iqr_bounds(q1, q3):
+    """Returns the (lower, upper) capping bounds for the given quartiles."""
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
 
 class DataCleaner:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, copy=True):
+        self.df = df.copy() if copy else df
+        # Statistics the fixes used, so later appends can be cleaned the same way
+        self.fill_values = {}
+        self.bounds = {}
         
     def fix_date_formats(self, date_cols):
         """Converts columns to datetime objects."""
@@ -12,17 +32,37 @@ class DataCleaner:
             self.df[col] = pd.to_datetime(self.df[col])
         return self.df
         
-    def handle_missing_values(self):
-        """Handles missing values in the dataset."""
+    def handle_missing_values(self, fill_values=None):
+        """Handles missing values in the dataset.
+
+        fill_values optionally maps column -> precomputed fill value (e.g. global
+        medians/modes in chunked mode); other columns use this frame's statistics.
+        The value used for every column is recorded in self.fill_values.
+        """
+        fill_values = fill_values or {}
+        
         # For numeric columns, fill with median
         numeric_cols = self.df.select_dtypes(include=[np.number]).columns
         for col in numeric_cols:
-            self.df[col] = self.df[col].fillna(self.df[col].median())
+            if col in fill_values:
+                self.fill_values[col] = fill_values[col]
+            elif self.df[col].notna().any():
+                self.fill_values[col] = float(self.df[col].median())
+            if self.df[col].isna().any() and col in self.fill_values:
+                self.df[col] = self.df[col].fillna(self.fill_values[col])
             
         # For categorical columns, fill with mode
-        categorical_cols = self.df.select_dtypes(include=['object']).columns
+        categorical_cols = _categorical_columns(self.df)
         for col in categorical_cols:
-            self.df[col] = self.df[col].fillna(self.df[col].mode()[0])
+            if col in fill_values:
+                self.fill_values[col] = fill_values[col]
+            elif self.df[col].notna().any():
+                self.fill_values[col] = self.df[col].mode()[0]
+            if self.df[col].isna().any() and col in self.fill_values:
+                value = self.fill_values[col]
+                if isinstance(self.df[col].dtype, pd.CategoricalDtype) and value not in self.df[col].cat.categories:
+                    self.df[col] = self.df[col].cat.add_categories([value])
+                self.df[col] = self.df[col].fillna(value)
             
         return self.df
     
@@ -48,32 +88,248 @@ class DataCleaner:
         upper_bound = Q3 + 1.5 * IQR
         return (self.df[col] < lower_bound) | (self.df[col] > upper_bound)
     
-    def cap_outliers(self, col, method='iqr'):
-        """Caps outliers instead of removing them."""
-        if method == 'iqr':
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+    def cap_outliers(self, col, method='iqr', bounds=None):
+        """Caps outliers instead of removing them.
+
+        bounds optionally gives precomputed (lower, upper) limits, e.g. from a
+        first pass over the full dataset in chunked mode.
+        """
+        if bounds is not None:
+            lower_bound, upper_bound = bounds
+        elif method == 'iqr':
+            lower_bound, upper_bound = iqr_bounds(self.df[col].quantile(0.25), self.df[col].quantile(0.75))
+        else:
+            return self.df
+        self.bounds[col] = (float(lower_bound), float(upper_bound))
             
-            self.df[col] = np.where(self.df[col] < lower_bound, lower_bound, self.df[col])
-            self.df[col] = np.where(self.df[col] > upper_bound, upper_bound, self.df[col])
+        self.df[col] = np.where(self.df[col] < lower_bound, lower_bound, self.df[col])
+        self.df[col] = np.where(self.df[col] > upper_bound, upper_bound, self.df[col])
             
         return self.df
         
     def create_time_features(self, date_col='Order Date'):
-        """Creates time-based features from a date column."""
-        self.df['Year'] = self.df[date_col].dt.year
-        self.df['Quarter'] = self.df[date_col].dt.quarter
-        self.df['Month'] = self.df[date_col].dt.month
-        self.df['Week'] = self.df[date_col].dt.isocalendar().week
-        self.df['Day'] = self.df[date_col].dt.day
-        self.df['DayOfWeek'] = self.df[date_col].dt.dayofweek
-        self.df['IsWeekend'] = self.df['DayOfWeek'].apply(lambda x: 1 if x >= 5 else 0)
-        self.df['MonthName'] = self.df[date_col].dt.month_name()
-        self.df['DayName'] = self.df[date_col].dt.day_name()
+        """Creates time-based features from a date column by joining the shared calendar."""
+        features = calendar_features(self.df[date_col], TIME_FEATURE_COLUMNS)
+        for col in TIME_FEATURE_COLUMNS:
+            self.df[col] = features[col]
+        return self.df
+        
+    def assign_surrogate_keys(self, registry):
+        """Adds integer surrogate keys (e.g. Customer Key) from a schema.KeyRegistry."""
+        self.df = registry.assign(self.df)
         return self.df
         
     def get_cleaned_data(self):
         return self.df
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch (KLL-style compactor hierarchy).
+
+    Keeps at most about 2 * k values per level; values at level i carry weight 2**i.
+    Rank error is roughly 1/k of the stream length, independent of its size.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Merges another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for i, level in enumerate(other.levels):
+            self.levels[i] = np.concatenate([self.levels[i], level])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            buf = self.levels[level]
+            if len(buf) > 2 * self.k:
+                # Sort, keep every other value (random offset) and promote them
+                buf = np.sort(buf)
+                if len(buf) % 2:
+                    keep, buf = buf[-1:], buf[:-1]
+                else:
+                    keep = np.empty(0)
+                promoted = buf[self._rng.integers(0, 2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (q may be a scalar or a list)."""
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return np.nan
+        if len(self.levels) == 1:
+            # Nothing compacted yet, so the answer is exact
+            return np.quantile(values, q)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(values)
+        values, cum = values[order], np.cumsum(weights[order])
+        # Midpoint ranks so the result matches linear interpolation on small inputs
+        ranks = (cum - weights[order] / 2) / cum[-1]
+        return np.interp(q, ranks, values)
+
+
+class ChunkedDataCleaner:
+    """Cleans a dataset too large for memory in streaming passes.
+
+    Pass 1 finds duplicate rows: row hashes are spilled to n_partitions files by
+    hash and each partition is deduplicated on its own. It then gathers global
+    statistics (medians and IQR bounds via QuantileSketch, modes via merged value
+    counts) and fixes the output dtype of every text column from its global
+    cardinality, as apply_schema would on the whole dataset. Pass 2 applies the same fixes as DataCleaner chunk by chunk and writes
+    the output incrementally.
+
+    Peak memory is one chunk plus one partition (16 bytes per input row / n_partitions)
+    plus the positions of the duplicate rows.
+    """
+
+    def __init__(self, store, name, chunksize=500_000, date_cols=('Order Date', 'Ship Date'),
+                 outlier_cols=('Total Sales', 'Profit'), sketch_k=2048, n_partitions=64,
+                 max_category_ratio=0.5):
+        self.store = store
+        self.name = name
+        self.chunksize = chunksize
+        self.date_cols = list(date_cols)
+        self.outlier_cols = list(outlier_cols)
+        self.sketch_k = sketch_k
+        self.n_partitions = n_partitions
+        self.max_category_ratio = max_category_ratio
+        self.fill_values = {}
+        self.bounds = {}
+        self.dtypes = {}
+        self.duplicates = None
+
+    def _chunks(self):
+        # Yields (chunk, keep mask) once duplicates are known
+        offset = 0
+        for chunk in self.store.iter_chunks(self.name, chunksize=self.chunksize):
+            keep = np.ones(len(chunk), dtype=bool)
+            if self.duplicates is not None:
+                lo, hi = np.searchsorted(self.duplicates, [offset, offset + len(chunk)])
+                keep[self.duplicates[lo:hi] - offset] = False
+            offset += len(chunk)
+            yield chunk, keep
+
+    def find_duplicates(self):
+        """Returns the sorted positions of rows that repeat an earlier row."""
+        record = np.dtype([('hash', '<u8'), ('position', '<i8')])
+        duplicates = []
+        with tempfile.TemporaryDirectory(prefix='dedup-') as spill_dir:
+            paths = [os.path.join(spill_dir, f"part-{i:04d}.bin") for i in range(self.n_partitions)]
+            files = [open(path, 'wb') for path in paths]
+            try:
+                offset = 0
+                for chunk in self.store.iter_chunks(self.name, chunksize=self.chunksize):
+                    records = np.empty(len(chunk), dtype=record)
+                    records['hash'] = pd.util.hash_pandas_object(chunk, index=False).values
+                    records['position'] = np.arange(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    partition = records['hash'] % self.n_partitions
+                    order = np.argsort(partition, kind='stable')
+                    bounds = np.searchsorted(partition[order], np.arange(self.n_partitions + 1))
+                    for i, f in enumerate(files):
+                        records[order[bounds[i]:bounds[i + 1]]].tofile(f)
+            finally:
+                for f in files:
+                    f.close()
+
+            # Rows within a partition are in input order, so unique()'s first index is the original
+            for path in paths:
+                records = np.fromfile(path, dtype=record)
+                repeated = np.ones(len(records), dtype=bool)
+                repeated[np.unique(records['hash'], return_index=True)[1]] = False
+                duplicates.append(records['position'][repeated])
+        return np.sort(np.concatenate(duplicates))
+
+    def collect_statistics(self):
+        """Pass 1: finds duplicates and gathers fill values and outlier bounds."""
+        sketches = {}
+        counts = {}
+        text_dtypes = {}
+        rows = 0
+        self.duplicates = self.find_duplicates()
+
+        for chunk, keep in self._chunks():
+            chunk = chunk[keep]
+            rows += len(chunk)
+            for col in chunk.select_dtypes(include=[np.number]).columns:
+                if col not in sketches:
+                    sketches[col] = QuantileSketch(k=self.sketch_k)
+                sketches[col].update(chunk[col].values)
+            for col in _categorical_columns(chunk):
+                vc = chunk[col].value_counts()
+                if isinstance(vc.index, pd.CategoricalIndex):
+                    vc.index = vc.index.astype(vc.index.categories.dtype)
+                counts[col] = vc if col not in counts else counts[col].add(vc, fill_value=0)
+                dtype = chunk[col].dtype
+                text_dtypes.setdefault(col, dtype.categories.dtype if isinstance(dtype, pd.CategoricalDtype) else dtype)
+
+        self.fill_values = {col: float(sketch.quantile(0.5)) for col, sketch in sketches.items()}
+        for col, vc in counts.items():
+            vc = vc[vc > 0].sort_index()
+            if vc.empty:
+                continue
+            # Ties resolve to the smallest value, as Series.mode() does
+            self.fill_values[col] = vc.idxmax()
+            # Chunks see only part of the values, so the category decision is made here
+            # once; declared numeric columns holding numbers are left to apply_schema
+            declared = COLUMN_TYPES.get(col)
+            if declared not in (None, 'category') and pd.to_numeric(vc.index, errors='coerce').notna().all():
+                continue
+            if declared == 'category' or len(vc) / rows <= self.max_category_ratio:
+                self.dtypes[col] = pd.CategoricalDtype(vc.index)
+            else:
+                self.dtypes[col] = text_dtypes[col]
+        for col in self.outlier_cols:
+            if col in sketches:
+                q1, q3 = sketches[col].quantile([0.25, 0.75])
+                self.bounds[col] = iqr_bounds(q1, q3)
+
+        print(f"Removed {len(self.duplicates)} duplicate rows.")
+        return self
+
+    def clean(self, output_store, output_name, date_col='Order Date',
+              key_dir=os.path.join('data', 'processed', 'keys')):
+        """Pass 2: applies the fixes chunk by chunk and streams the cleaned output.
+
+        Surrogate keys come from (and new ones are recorded in) the registry in key_dir.
+        """
+        if self.duplicates is None:
+            self.collect_statistics()
+
+        registry = KeyRegistry(key_dir)
+        categorical = [col for col, dtype in self.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+        with output_store.open_writer(output_name, dictionaries=categorical) as writer:
+            for chunk, keep in self._chunks():
+                cleaner = DataCleaner(chunk[keep].reset_index(drop=True), copy=False)
+                cleaner.fix_date_formats(self.date_cols)
+                cleaner.handle_missing_values(self.fill_values)
+                for col, bounds in self.bounds.items():
+                    cleaner.cap_outliers(col, bounds=bounds)
+                cleaner.create_time_features(date_col)
+                cleaner.assign_surrogate_keys(registry)
+                df = apply_schema(cleaner.get_cleaned_data())
+                writer.write(df.astype({col: dtype for col, dtype in self.dtypes.items() if col in df.columns}))
+        registry.save()
+
+        print(f"Cleaned {writer.rows} rows in chunks of {self.chunksize}.")
+        return writer.path
@@ -6,6 +6,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from src.scatter_plots import scatter_figure
+
 class EDAVisualizer:
     def __init__(self, df):
         self.df = df.copy()
@@ -65,9 +67,8 @@ class EDAVisualizer:
             plt.show()
             
     def plot_profit_vs_discount(self, save_path=None):
-        """Plots profit vs discount relationship."""
-        fig = px.scatter(self.df, x='Discount', y='Profit', color='Category', 
-                         trendline="ols", title='Profit vs Discount Impact')
+        """Plots profit vs discount relationship (binned into a density map for large data)."""
+        fig = scatter_figure(self.df, 'Discount', 'Profit', color='Category', title='Profit vs Discount Impact')
         if save_path:
             fig.write_image(save_path)
         return fig
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from src.calendar_dim import calendar_features
 
 class FeatureEngineer:
     def __init__(self, df):
@@ -17,6 +18,13 @@ class FeatureEngineer:
             
         return daily_sales
         
+    def create_hierarchy_series(self, levels=['Category', 'Region', 'State'], target_col='Total Sales'):
+        """Daily target per bottom-level node (one column per levels combination), zero-filled."""
+        daily = self.df.groupby(['Order Date'] + list(levels), observed=True)[target_col].sum()
+        daily = daily.unstack(list(levels), fill_value=0).sort_index(axis=1)
+        dates = pd.date_range(daily.index.min(), daily.index.max(), freq='D', name='Order Date')
+        return daily.reindex(dates, fill_value=0)
+        
     def create_rolling_features(self, df, target_col='Total Sales', windows=[7, 30, 90]):
         """Creates rolling mean and std features."""
         for window in windows:
@@ -32,14 +40,11 @@ class FeatureEngineer:
         
     def add_holiday_flags(self, df):
         """Adds holiday flags."""
-        import holidays
-        us_holidays = holidays.US()
-        
         # Ensure index is datetime
         if not isinstance(df.index, pd.DatetimeIndex):
             df.index = pd.to_datetime(df.index)
             
-        df['IsHoliday'] = df.index.map(lambda x: 1 if x in us_holidays else 0)
+        df['IsHoliday'] = calendar_features(df.index, ['IsHoliday'])['IsHoliday'].values
         return df
         
     def prepare_modeling_data(self, target_col='Total Sales'):
@@ -53,16 +58,57 @@ class FeatureEngineer:
         # Add EMA features
         daily_df = self.create_ema_features(daily_df, target_col)
         
-        # Add holiday flags
-        daily_df = self.add_holiday_flags(daily_df)
-        
-        # Add time features again since we aggregated
-        daily_df['DayOfWeek'] = daily_df.index.dayofweek
-        daily_df['Month'] = daily_df.index.month
-        daily_df['Quarter'] = daily_df.index.quarter
-        daily_df['Year'] = daily_df.index.year
+        # Add holiday flags and time features again since we aggregated
+        daily_df = self.add_calendar_features(daily_df)
         
         # Drop NaN values created by lags
         daily_df = daily_df.dropna()
         
         return daily_df
+    
+    def add_calendar_features(self, df):
+        """Adds holiday flags and date parts to a daily frame."""
+        df = self.add_holiday_flags(df)
+        calendar = calendar_features(df.index, ['DayOfWeek', 'Month', 'Quarter', 'Year'])
+        for col in calendar.columns:
+            df[col] = calendar[col].values
+        return df
+    
+    def update_modeling_data(self, features_df, target_col='Total Sales', lags=[1, 3, 7, 14, 30],
+                             windows=[7, 30, 90], alphas=[0.1, 0.3, 0.5]):
+        """Folds new transactions (self.df) into an existing modeling frame.
+        
+        Only days from the first new order date onward are recomputed: lag and rolling
+        windows read the preceding rows of features_df, and each EMA resumes from its
+        last stored value. Returns the updated frame.
+        """
+        new_daily = self.df.groupby('Order Date')[target_col].sum()
+        start = new_daily.index.min()
+        if len(features_df) and start < features_df.index.min():
+            raise ValueError("New orders predate the modeling data; rebuild it with prepare_modeling_data().")
+        
+        history = features_df[features_df.index < start]
+        daily = features_df.loc[features_df.index >= start, target_col].add(new_daily, fill_value=0).sort_index()
+        
+        # Rows of history needed to fill the longest lag/rolling window
+        context = history[target_col].iloc[-max(max(lags), max(windows)):]
+        series = pd.concat([context, daily])
+        
+        tail = series.to_frame(name=target_col)
+        for lag in lags:
+            tail[f'lag_{lag}'] = series.shift(lag)
+        tail = self.create_rolling_features(tail, target_col, windows)
+        
+        for alpha in alphas:
+            col = f'ema_{alpha}'
+            if len(history):
+                # Seed the recursion with the last stored EMA so it continues unchanged
+                seeded = pd.concat([history[col].iloc[-1:], daily])
+                tail.loc[daily.index, col] = seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:].values
+            else:
+                tail[col] = series.ewm(alpha=alpha, adjust=False).mean()
+        
+        tail = self.add_calendar_features(tail.loc[daily.index].copy())
+        tail = tail.dropna()
+        
+        return pd.concat([history, tail[features_df.columns]])
@@ -0,0 +1,119 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from src.pipeline_runner import content_hash
+
+
+class FigureCache:
+    """Serialized Plotly figures keyed by data version, figure id and filter parameters.
+
+    Entries are the figure JSON. The in-process tier is an LRU bounded by max_bytes;
+    with disk_dir set, every entry is also written to disk (bounded by disk_max_bytes,
+    oldest files evicted first) so it survives restarts and is shared across
+    server processes. A new data version simply produces new keys; stale entries
+    age out of both tiers.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, disk_dir=None, disk_max_bytes=512 * 2**20):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(version, figure_id, filters=None):
+        return content_hash([version, figure_id, filters or {}])[:32]
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key, payload):
+        # Caller holds the lock
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        self._entries[key] = payload
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._stats['evictions'] += 1
+
+    def get(self, version, figure_id, filters=None):
+        """Returns the cached figure JSON string, or None."""
+        key = self.key(version, figure_id, filters)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return payload
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'r') as f:
+                    payload = f.read()
+            except OSError:
+                payload = None
+            if payload is not None:
+                with self._lock:
+                    self._remember(key, payload)
+                    self._stats['disk_hits'] += 1
+                return payload
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, version, figure_id, payload, filters=None):
+        key = self.key(version, figure_id, filters)
+        with self._lock:
+            self._remember(key, payload)
+        if self.disk_dir:
+            tmp_path = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._disk_path(key))
+            self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get_or_build(self, version, figure_id, build, filters=None):
+        """Returns the figure as a dict, calling build() (which returns a Figure) only on a miss."""
+        payload = self.get(version, figure_id, filters)
+        if payload is None:
+            payload = build().to_json()
+            self.put(version, figure_id, payload, filters)
+        return json.loads(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
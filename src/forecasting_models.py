@@ -4,13 +4,267 @@ import matplotlib.pyplot as plt
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from prophet import Prophet
-from sklearn.metrics import mean_squared_error, mean_absolute_error, mean_absolute_percentage_error
+from prophet.serialize import model_to_json, model_from_json
+from sklearn.linear_model import Ridge
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+import time
+import multiprocessing
 import warnings
+from src.model_store import EXACT, WARM
+from src.order_search import search_sarima_orders
+from src.feature_engineer import FeatureEngineer
+from src.metrics import forecast_metrics
+from src.calendar_dim import prophet_holidays
 warnings.filterwarnings('ignore')
 
+def evaluate_forecast(y_true, y_pred, model_name):
+    """Computes RMSE, MAE and MAPE for one forecast."""
+    scores = forecast_metrics(y_true, y_pred).iloc[0]
+    
+    return {
+        'Model': model_name,
+        'RMSE': float(scores['RMSE']),
+        'MAE': float(scores['MAE']),
+        'MAPE': float(scores['MAPE'])
+    }
+
+def fit_sarima(train, test, forecast_days, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7), model_name='SARIMA',
+               model_store=None):
+    """Fits SARIMA on a precomputed split. Returns (results, y_pred, conf_int, metrics).
+    
+    With a model_store, stored parameters are reused for unchanged data and used as
+    start_params when the series has only been extended.
+    """
+    model = SARIMAX(train['Total Sales'], 
+                    order=order, 
+                    seasonal_order=seasonal_order,
+                    enforce_stationarity=False,
+                    enforce_invertibility=False)
+    
+    hyperparams = {'order': list(order), 'seasonal_order': list(seasonal_order)}
+    state, match = (None, None)
+    if model_store is not None:
+        state, match = model_store.lookup('sarima', hyperparams, train['Total Sales'])
+    
+    if match == EXACT:
+        print(f"Loaded stored SARIMA{order}x{seasonal_order} parameters.")
+        results = model.smooth(state['params'])
+    else:
+        print(f"Training SARIMA{order}x{seasonal_order}{' (warm start)' if match == WARM else ''}...")
+        results = model.fit(start_params=state['params'] if match == WARM else None, disp=False)
+        if model_store is not None:
+            model_store.save('sarima', hyperparams, train['Total Sales'], {'params': results.params.values})
+    
+    # Forecast
+    forecast = results.get_forecast(steps=forecast_days)
+    y_pred = forecast.predicted_mean
+    conf_int = forecast.conf_int()
+    
+    # Evaluate
+    metrics = evaluate_forecast(test['Total Sales'], y_pred, model_name)
+    
+    return results, y_pred, conf_int, metrics
+
+def _prophet_init(model):
+    # Fitted parameters of a previous model in the form Prophet.fit(init=...) expects
+    init = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    init.update({name: model.params[name][0] for name in ['delta', 'beta']})
+    return init
+
+def fit_prophet(train, test, forecast_days, model_name='Prophet', model_store=None):
+    """Fits Prophet on a precomputed split. Returns (model, forecast, metrics).
+    
+    With a model_store, the stored model is reused for unchanged data and its
+    parameters initialise the fit when the series has only been extended.
+    """
+    # Prepare data for Prophet
+    prophet_df = train.reset_index()[['Order Date', 'Total Sales']]
+    prophet_df.columns = ['ds', 'y']
+    
+    state, match = (None, None)
+    if model_store is not None:
+        state, match = model_store.lookup('prophet', {'holidays': 'calendar'}, train['Total Sales'])
+    
+    if match == EXACT:
+        print("Loaded stored Prophet model.")
+        model = model_from_json(state['model'])
+    else:
+        print(f"Training Prophet model{' (warm start)' if match == WARM else ''}...")
+        holiday_days = prophet_holidays(train.index.min(), train.index.max() + pd.Timedelta(days=forecast_days))
+        model = Prophet(holidays=holiday_days, yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
+        fit_kwargs = {'init': _prophet_init(model_from_json(state['model']))} if match == WARM else {}
+        model.fit(prophet_df, **fit_kwargs)
+        if model_store is not None:
+            model_store.save('prophet', {'holidays': 'calendar'}, train['Total Sales'], {'model': model_to_json(model)})
+    
+    # Forecast
+    future = model.make_future_dataframe(periods=forecast_days)
+    forecast = model.predict(future)
+    
+    # Extract predictions for test period
+    y_pred = forecast.tail(forecast_days)['yhat'].values
+    
+    # Evaluate
+    metrics = evaluate_forecast(test['Total Sales'], y_pred, model_name)
+    
+    return model, forecast, metrics
+
+class FeatureForecaster:
+    """Multi-horizon regression on FeatureEngineer's lag, rolling, EMA and calendar features.
+    
+    The direct strategy predicts the sales j+1 days after each row for every j at once:
+    ridge fits one multi-output model, gbt one model with the step j as an extra
+    feature (trees have no multi-output form).
+    The recursive strategy fits a one-step model and feeds its predictions back through
+    the same feature definitions.
+    """
+    ESTIMATORS = ('ridge', 'gbt')
+    STRATEGIES = ('direct', 'recursive')
+    
+    def __init__(self, estimator='ridge', strategy='direct'):
+        if estimator not in self.ESTIMATORS or strategy not in self.STRATEGIES:
+            raise ValueError(f"Use an estimator in {self.ESTIMATORS} and a strategy in {self.STRATEGIES}")
+        self.estimator = estimator
+        self.strategy = strategy
+        self.resid_var_ = None
+        
+    def _make_model(self):
+        if self.estimator == 'ridge':
+            return make_pipeline(StandardScaler(), Ridge(alpha=1.0))
+        return HistGradientBoostingRegressor(max_iter=200, learning_rate=0.05)
+        
+    def _stack_steps(self, X):
+        # One row per (feature row, step) pair for estimators without multi-output support,
+        # with the step and the target day's weekday as extra features
+        steps = np.tile(np.arange(1, self.horizon + 1), len(X))
+        X = np.repeat(X, self.horizon, axis=0)
+        target_dow = (X[:, self.features_.columns.get_loc('DayOfWeek')] + steps) % 7
+        return np.column_stack([X, steps, target_dow])
+        
+    def _predict_steps(self, X):
+        if self.estimator == 'ridge' or self.strategy == 'recursive':
+            predicted = self.model_.predict(X)
+            return predicted if predicted.ndim > 1 else predicted[:, None]
+        return self.model_.predict(self._stack_steps(X)).reshape(len(X), self.horizon)
+        
+    def fit(self, series, horizon, features=None):
+        """Fits on a daily 'Total Sales' series (DatetimeIndex).
+
+        features can pass a modeling frame already built by FeatureEngineer over a
+        longer series; only its rows within the series' dates are used.
+        """
+        if features is None:
+            daily = series.rename('Total Sales').rename_axis('Order Date').reset_index()
+            features = FeatureEngineer(daily).prepare_modeling_data()
+        else:
+            features = features.loc[series.index[0]:series.index[-1]]
+        self.features_ = features
+        self.history_ = series.to_numpy(dtype=float)
+        self.last_date_ = series.index[-1]
+        self.horizon = horizon
+        
+        # Targets: the n_outputs days following each feature row
+        n_outputs = horizon if self.strategy == 'direct' else 1
+        positions = series.index.get_indexer(self.features_.index)
+        windows = np.lib.stride_tricks.sliding_window_view(self.history_, n_outputs)
+        usable = positions + n_outputs < len(self.history_)
+        X = self.features_.to_numpy(dtype=float)[usable]
+        Y = windows[positions[usable] + 1]
+        
+        self.model_ = self._make_model()
+        if n_outputs == 1:
+            self.model_.fit(X, Y[:, 0])
+        elif self.estimator == 'ridge':
+            self.model_.fit(X, Y)
+        else:
+            self.model_.fit(self._stack_steps(X), Y.ravel())
+        self.resid_var_ = float(np.var(Y[:, 0] - self._predict_steps(X)[:, 0]))
+        return self
+        
+    def predict(self):
+        """Forecasts the horizon following the training series."""
+        if self.strategy == 'direct':
+            return self._predict_steps(self.features_.to_numpy(dtype=float)[-1:])[0]
+        return self._predict_recursive()
+        
+    def _predict_recursive(self):
+        columns = self.features_.columns
+        dates = pd.date_range(self.last_date_ + pd.Timedelta(days=1), periods=self.horizon, freq='D')
+        calendar = FeatureEngineer(pd.DataFrame()).add_calendar_features(pd.DataFrame(index=dates))
+        
+        history = list(self.history_)
+        ema = {col: self.features_[col].iloc[-1] for col in columns if col.startswith('ema_')}
+        row = self.features_.iloc[-1].to_dict()
+        predictions = []
+        for date in dates:
+            y = float(self.model_.predict(np.array([[row[col] for col in columns]], dtype=float))[0])
+            predictions.append(y)
+            history.append(y)
+            
+            # Roll the feature row forward to the predicted day
+            row = {'Total Sales': y, **calendar.loc[date].to_dict()}
+            for col in columns:
+                if col.startswith('lag_'):
+                    row[col] = history[-1 - int(col[4:])]
+                elif col.startswith('rolling_mean_'):
+                    row[col] = np.mean(history[-int(col[13:]):])
+                elif col.startswith('rolling_std_'):
+                    row[col] = np.std(history[-int(col[12:]):], ddof=1)
+                elif col.startswith('ema_'):
+                    alpha = float(col[4:])
+                    ema[col] = alpha * y + (1 - alpha) * ema[col]
+                    row[col] = ema[col]
+        return np.array(predictions)
+
+def fit_feature_model(train, test, forecast_days, estimator='ridge', strategy='direct', model_name='Ridge',
+                      features=None):
+    """Fits a FeatureForecaster on a precomputed split. Returns (model, y_pred, metrics)."""
+    print(f"Training {estimator} feature model ({strategy})...")
+    model = FeatureForecaster(estimator, strategy).fit(train['Total Sales'], forecast_days, features)
+    y_pred = model.predict()
+    
+    # Evaluate
+    metrics = evaluate_forecast(test['Total Sales'], y_pred, model_name)
+    
+    return model, y_pred, metrics
+
+def _fit_sarima_spec(train, test, forecast_days, params, return_model):
+    results, y_pred, conf_int, metrics = fit_sarima(train, test, forecast_days, **params)
+    resid = results.resid.iloc[results.loglikelihood_burn:]
+    return {'metrics': metrics, 'prediction': np.asarray(y_pred), 'conf_int': conf_int,
+            'resid_var': float(np.var(resid)), 'model': results if return_model else None}
+
+def _fit_prophet_spec(train, test, forecast_days, params, return_model):
+    model, forecast, metrics = fit_prophet(train, test, forecast_days, **params)
+    resid = train['Total Sales'].values - forecast['yhat'].values[:len(train)]
+    return {'metrics': metrics, 'prediction': forecast.tail(forecast_days)['yhat'].values,
+            'forecast': forecast, 'resid_var': float(np.var(resid)),
+            'model': model if return_model else None}
+
+def _fit_feature_spec(train, test, forecast_days, params, return_model):
+    model, y_pred, metrics = fit_feature_model(train, test, forecast_days, **params)
+    return {'metrics': metrics, 'prediction': y_pred, 'resid_var': model.resid_var_,
+            'model': model if return_model else None}
+
+# Model kind -> worker function used by Forecaster.fit_models
+MODEL_FITTERS = {
+    'sarima': _fit_sarima_spec,
+    'prophet': _fit_prophet_spec,
+    'ml': _fit_feature_spec,
+}
+
+# Kinds whose fits are slow enough to keep in a ModelStore
+STORED_KINDS = ('sarima', 'prophet')
+
+def _fit_spec(kind, train, test, forecast_days, params, return_model):
+    return MODEL_FITTERS[kind](train, test, forecast_days, params, return_model)
+
 class Forecaster:
-    def __init__(self, df):
+    def __init__(self, df, model_store=None):
         self.df = df.copy()
+        self.model_store = model_store
         # Ensure index is datetime
         if not isinstance(self.df.index, pd.DatetimeIndex):
             self.df.index = pd.to_datetime(self.df.index)
@@ -23,64 +277,71 @@ class Forecaster:
         
     def evaluate_model(self, y_true, y_pred, model_name):
         """Evaluates model performance."""
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        mae = mean_absolute_error(y_true, y_pred)
-        mape = mean_absolute_percentage_error(y_true, y_pred)
-        
-        return {
-            'Model': model_name,
-            'RMSE': rmse,
-            'MAE': mae,
-            'MAPE': mape
-        }
+        return evaluate_forecast(y_true, y_pred, model_name)
         
     def run_arima(self, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7), forecast_days=90):
         """Runs SARIMA model."""
         train, test = self.train_test_split(test_days=forecast_days)
-        
-        print(f"Training SARIMA{order}x{seasonal_order}...")
-        model = SARIMAX(train['Total Sales'], 
-                        order=order, 
-                        seasonal_order=seasonal_order,
-                        enforce_stationarity=False,
-                        enforce_invertibility=False)
-        
-        results = model.fit(disp=False)
-        
-        # Forecast
-        forecast = results.get_forecast(steps=forecast_days)
-        y_pred = forecast.predicted_mean
-        conf_int = forecast.conf_int()
-        
-        # Evaluate
-        metrics = self.evaluate_model(test['Total Sales'], y_pred, 'SARIMA')
-        
-        return results, y_pred, conf_int, metrics
+        return fit_sarima(train, test, forecast_days, order=order, seasonal_order=seasonal_order,
+                          model_store=self.model_store)
         
     def run_prophet(self, forecast_days=90):
         """Runs Facebook Prophet model."""
         train, test = self.train_test_split(test_days=forecast_days)
+        return fit_prophet(train, test, forecast_days, model_store=self.model_store)
         
-        # Prepare data for Prophet
-        prophet_df = train.reset_index()[['Order Date', 'Total Sales']]
-        prophet_df.columns = ['ds', 'y']
+    def run_feature_model(self, estimator='ridge', strategy='direct', forecast_days=90):
+        """Runs the feature-based regression forecaster."""
+        train, test = self.train_test_split(test_days=forecast_days)
+        return fit_feature_model(train, test, forecast_days, estimator=estimator, strategy=strategy)
         
-        print("Training Prophet model...")
-        model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-        model.add_country_holidays(country_name='US')
-        model.fit(prophet_df)
+    def select_arima_order(self, grid=None, criterion='aic', forecast_days=90, max_workers=None):
+        """Searches SARIMA orders in parallel on the holdout split; returns the ranking DataFrame."""
+        train, test = self.train_test_split(test_days=forecast_days)
+        return search_sarima_orders(train, test, grid=grid, criterion=criterion, max_workers=max_workers,
+                                    model_store=self.model_store)
         
-        # Forecast
-        future = model.make_future_dataframe(periods=forecast_days)
-        forecast = model.predict(future)
+    def fit_models(self, specs, forecast_days=90, max_workers=None):
+        """Fits several models concurrently on one shared train/test split.
         
-        # Extract predictions for test period
-        y_pred = forecast.tail(forecast_days)['yhat'].values
+        Each spec is a dict with 'name', 'kind' (a key of MODEL_FITTERS) and optional
+        'params', 'timeout' (seconds, counted from submission) and 'return_model'.
+        Returns {name: result} where result has 'status' ('ok', 'timeout' or 'error')
+        and, when ok, 'metrics', 'prediction' and (if requested) 'model'.
+        Workers still running after the last deadline are terminated.
+        """
+        train, test = self.train_test_split(test_days=forecast_days)
+        max_workers = max_workers or min(len(specs), multiprocessing.cpu_count())
         
-        # Evaluate
-        metrics = self.evaluate_model(test['Total Sales'], y_pred, 'Prophet')
+        results = {}
+        pool = multiprocessing.get_context().Pool(processes=max_workers)
+        try:
+            submitted = time.monotonic()
+            pending = {}
+            for spec in specs:
+                params = dict(spec.get('params', {}))
+                params.setdefault('model_name', spec['name'])
+                if spec['kind'] in STORED_KINDS:
+                    params.setdefault('model_store', self.model_store)
+                pending[spec['name']] = (spec, pool.apply_async(
+                    _fit_spec, (spec['kind'], train, test, forecast_days, params, spec.get('return_model', False))))
+            
+            for name, (spec, async_result) in pending.items():
+                timeout = spec.get('timeout')
+                remaining = None if timeout is None else max(0.0, submitted + timeout - time.monotonic())
+                try:
+                    results[name] = dict(async_result.get(timeout=remaining), status='ok')
+                except multiprocessing.TimeoutError:
+                    print(f"{name} timed out after {timeout}s")
+                    results[name] = {'status': 'timeout'}
+                except Exception as e:
+                    print(f"{name} failed: {e}")
+                    results[name] = {'status': 'error', 'error': str(e)}
+        finally:
+            pool.terminate()
+            pool.join()
         
-        return model, forecast, metrics
+        return results
         
     def plot_forecast(self, train, test, y_pred, title, save_path=None):
         """Plots the forecast against actuals."""
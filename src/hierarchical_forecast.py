@@ -0,0 +1,134 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+from src.feature_engineer import FeatureEngineer
+from src.forecasting_models import _fit_spec
+from src.metrics import forecast_metrics, aggregate_metrics, METRIC_COLUMNS
+
+# Hierarchy from the top split down to the bottom series
+HIERARCHY_LEVELS = ['Category', 'Region', 'State']
+RECONCILIATION_METHODS = ('bottom_up', 'ols', 'wls')
+
+
+def build_hierarchy(bottom, levels=HIERARCHY_LEVELS):
+    """Returns (nodes, S) for a frame whose columns are the bottom-level keys.
+
+    nodes is a DataFrame with one row per node (Total first, bottom series last) and
+    S is the summing matrix mapping bottom series to every node.
+    """
+    keys = bottom.columns.to_frame(index=False)
+    keys.columns = list(levels)
+
+    rows, blocks = [], []
+    for depth in range(len(levels) + 1):
+        group_cols = list(levels[:depth])
+        groups = keys.groupby(group_cols, sort=True, observed=True).groups if group_cols else {(): keys.index}
+        for key, members in groups.items():
+            key = key if isinstance(key, tuple) else (key,)
+            rows.append({'Node': '|'.join(map(str, key)) or 'Total', 'Level': depth,
+                         **{col: (key[i] if i < depth else None) for i, col in enumerate(levels)}})
+            block = np.zeros(len(keys))
+            block[list(members)] = 1.0
+            blocks.append(block)
+
+    return pd.DataFrame(rows), np.vstack(blocks)
+
+
+def reconcile(base, S, method='wls', variances=None):
+    """Reconciles base forecasts (nodes x horizon) so every parent equals the sum of its children.
+
+    bottom_up keeps the bottom forecasts; ols and wls use the trace-minimising
+    projection S (S' W^-1 S)^-1 S' W^-1 with W = I or diag(in-sample residual variances)
+    (the diagonal MinT estimator).
+    """
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"Unknown reconciliation method '{method}'; use one of {RECONCILIATION_METHODS}")
+    n_bottom = S.shape[1]
+    if method == 'bottom_up':
+        return S @ base[-n_bottom:]
+
+    if method == 'wls' and variances is not None:
+        variances = np.asarray(variances, dtype=float)
+        # Constant (e.g. all-zero) series have no residual variance; floor it to keep W invertible
+        floor = max(np.nanmean(variances), 1.0) * 1e-6
+        weights = 1.0 / np.maximum(np.nan_to_num(variances, nan=floor), floor)
+    else:
+        weights = np.ones(S.shape[0])
+
+    StW = S.T * weights
+    G = np.linalg.solve(StW @ S, StW)
+    return S @ (G @ base)
+
+
+def _fit_node(args):
+    node, kind, train, test, forecast_days, params = args
+    try:
+        result = _fit_spec(kind, train, test, forecast_days, dict(params, model_name=node), False)
+        return node, result['prediction'], result.get('resid_var')
+    except Exception as e:
+        print(f"Node {node} failed ({e}); using its recent mean")
+        return node, None, None
+
+
+class HierarchicalForecaster:
+    """Forecasts every node of the Category x Region x State tree and reconciles them."""
+
+    def __init__(self, df, levels=HIERARCHY_LEVELS, target_col='Total Sales'):
+        self.levels = list(levels)
+        self.bottom = FeatureEngineer(df).create_hierarchy_series(self.levels, target_col)
+        self.nodes, self.S = build_hierarchy(self.bottom, self.levels)
+        # Every node's daily series, in the row order of S
+        self.series = pd.DataFrame(self.bottom.values @ self.S.T, index=self.bottom.index,
+                                   columns=self.nodes['Node'])
+
+    def fit(self, kind='sarima', params=None, forecast_days=90, method='wls', max_workers=None):
+        """Fits base models for all nodes in parallel, reconciles them and evaluates on the holdout.
+
+        Returns (forecasts, metrics): forecasts is a long frame of Node, Order Date, Base Forecast,
+        Forecast (reconciled) and Actual; metrics has one row per node.
+        """
+        train = self.series.iloc[:-forecast_days]
+        test = self.series.iloc[-forecast_days:]
+        tasks = [(node, kind, train[[node]].set_axis(['Total Sales'], axis=1),
+                  test[[node]].set_axis(['Total Sales'], axis=1), forecast_days, params or {})
+                 for node in self.series.columns]
+
+        max_workers = max_workers or os.cpu_count()
+        print(f"Fitting {len(tasks)} {kind} models across {max_workers} workers...")
+        with multiprocessing.get_context().Pool(processes=max_workers) as pool:
+            fitted = dict((node, (pred, var)) for node, pred, var in
+                          pool.imap_unordered(_fit_node, tasks, chunksize=max(1, len(tasks) // (4 * max_workers))))
+
+        base = np.empty((len(tasks), forecast_days))
+        variances = np.empty(len(tasks))
+        for i, node in enumerate(self.series.columns):
+            pred, var = fitted[node]
+            if pred is None:
+                pred = np.full(forecast_days, train[node].iloc[-forecast_days:].mean())
+                var = train[node].var()
+            base[i] = pred
+            variances[i] = var
+
+        reconciled = reconcile(base, self.S, method=method, variances=variances)
+
+        forecasts = pd.DataFrame({
+            'Node': np.repeat(self.series.columns.values, forecast_days),
+            'Order Date': np.tile(test.index.values, len(tasks)),
+            'Base Forecast': base.ravel(),
+            'Forecast': reconciled.ravel(),
+            'Actual': test.values.T.ravel(),
+        })
+        forecasts = self.nodes.merge(forecasts, on='Node')
+
+        metrics = forecast_metrics(test.values.T, reconciled, y_train=train.values.T, season=7)
+        metrics.insert(0, 'Node', self.series.columns.values)
+        metrics.insert(1, 'Level', self.nodes['Level'].values)
+        metrics['Actual Total'] = test.values.sum(axis=0)
+        return forecasts, metrics
+    
+    def level_metrics(self, metrics):
+        """Sales-weighted mean of each node metric per hierarchy level."""
+        return {int(level): aggregate_metrics(group[METRIC_COLUMNS], weights=group['Actual Total'])
+                for level, group in metrics.groupby('Level')}
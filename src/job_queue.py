@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import socket
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+ACTIVE_STATES = (QUEUED, RUNNING)
+TERMINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Running jobs refresh their heartbeat this often (seconds); a job on another host
+# whose heartbeat is older than HEARTBEAT_TIMEOUT is considered abandoned
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TIMEOUT = 120
+
+
+def process_owner():
+    """Identifies the current process as 'host:pid'."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation has been requested."""
+
+
+class JobStore:
+    """Persistent job table in a local SQLite file, shared by the server and workers.
+
+    Each active job records its owner ('host:pid' of the process that queued or runs
+    it) and a heartbeat, so a restarting server only fails jobs whose owner is gone.
+    """
+
+    def __init__(self, db_path=os.path.join('data', 'jobs.db')):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    params TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    message TEXT,
+                    cancel_requested INTEGER DEFAULT 0,
+                    created_at REAL,
+                    updated_at REAL,
+                    owner TEXT,
+                    heartbeat REAL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (key, status)")
+            # Tables created before owners and heartbeats were tracked
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in (('owner', 'TEXT'), ('heartbeat', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, kind, key, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, key, params, status, stage, progress, created_at, updated_at, "
+                "owner, heartbeat) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job_id, kind, key, json.dumps(params, default=str), QUEUED, 'queued', now, now,
+                 process_owner(), now))
+        return job_id
+
+    def find_active(self, key):
+        """Returns the id of a queued or running job with the same key, if any."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) AND cancel_requested = 0 "
+                "ORDER BY created_at DESC LIMIT 1", (key, *ACTIVE_STATES)).fetchone()
+        return row['id'] if row else None
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit=20):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def heartbeat(self, job_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+
+    def mark_interrupted(self, timeout=HEARTBEAT_TIMEOUT):
+        """Fails active jobs whose owner process has died.
+
+        Owners on this host are checked directly; for other hosts (or rows without an
+        owner) a heartbeat older than timeout seconds means the job was abandoned.
+        Returns the ids of the failed jobs.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, owner, heartbeat, updated_at FROM jobs WHERE status IN (?, ?)",
+                                ACTIVE_STATES).fetchall()
+            interrupted = []
+            for row in rows:
+                alive = _owner_alive(row['owner'])
+                if alive is None:
+                    alive = now - (row['heartbeat'] or row['updated_at'] or 0) < timeout
+                if not alive:
+                    interrupted.append(row['id'])
+            conn.executemany("UPDATE jobs SET status = ?, message = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                             [(FAILED, 'Interrupted: the process running it stopped', now, job_id, *ACTIVE_STATES)
+                              for job_id in interrupted])
+        return interrupted
+
+
+class JobContext:
+    """Handle passed to a running job for progress reporting and cancellation checks."""
+
+    def __init__(self, db_path, job_id):
+        self.store = JobStore(db_path)
+        self.job_id = job_id
+
+    def is_cancelled(self):
+        job = self.store.get(self.job_id)
+        return bool(job and job['cancel_requested'])
+
+    def report(self, stage, progress, message=None):
+        """Records progress (0-1) for a stage; raises JobCancelled if cancellation was requested."""
+        if self.is_cancelled():
+            raise JobCancelled()
+        fields = {'stage': stage, 'progress': float(progress)}
+        if message is not None:
+            fields['message'] = message
+        self.store.update(self.job_id, **fields)
+
+
+def _execute_job(db_path, job_id, func, params):
+    ctx = JobContext(db_path, job_id)
+    if ctx.is_cancelled():
+        ctx.store.update(job_id, status=CANCELLED, message='Cancelled before start')
+        return
+    ctx.store.update(job_id, status=RUNNING, stage='starting', owner=process_owner(), heartbeat=time.time())
+
+    # Keep the heartbeat fresh while func runs, even between report() calls
+    stopped = threading.Event()
+
+    def beat():
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            ctx.store.heartbeat(job_id)
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        message = func(ctx, **params)
+        ctx.store.update(job_id, status=SUCCEEDED, stage='done', progress=1.0, message=message or 'Completed')
+    except JobCancelled:
+        ctx.store.update(job_id, status=CANCELLED, message='Cancelled')
+    except Exception as e:
+        ctx.store.update(job_id, status=FAILED, message=str(e))
+    finally:
+        stopped.set()
+
+
+def job_key(kind, params):
+    """Identical submissions (same kind and params) share a key and are de-duplicated."""
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JobExecutor:
+    """Runs jobs on a local process pool, tracking them in a JobStore.
+
+    func(ctx, **params) must be importable (picklable) and may call ctx.report()
+    between steps; its return value becomes the job's final message.
+    """
+
+    def __init__(self, db_path=os.path.join('data', 'jobs.db'), max_workers=2):
+        self.store = JobStore(db_path)
+        self.store.mark_interrupted()
+        self.max_workers = max_workers
+        self._pool = None
+        self._futures = {}
+
+    @property
+    def pool(self):
+        # Created lazily so importing the dashboard does not fork workers
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, kind, func, **params):
+        """Queues a job and returns its id, or the id of an identical active job."""
+        self._futures = {jid: f for jid, f in self._futures.items() if not f.done()}
+        key = job_key(kind, params)
+        existing = self.store.find_active(key)
+        if existing is not None:
+            return existing
+        job_id = self.store.create(kind, key, params)
+        self._futures[job_id] = self.pool.submit(_execute_job, self.store.db_path, job_id, func, params)
+        return job_id
+
+    def cancel(self, job_id):
+        """Requests cancellation; queued jobs stop immediately, running ones at the next report()."""
+        job = self.store.get(job_id)
+        if job is None or job['status'] in TERMINAL_STATES:
+            return False
+        self.store.update(job_id, cancel_requested=1)
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self.store.update(job_id, status=CANCELLED, message='Cancelled before start')
+        return True
+
+    def status(self, job_id):
+        return self.store.get(job_id)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ['RMSE', 'MAE', 'MAPE', 'sMAPE', 'MASE']
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=float)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def _nanmean_rows(values):
+    # Row means over finite entries; rows with none are NaN (without RuntimeWarnings)
+    finite = np.isfinite(values)
+    counts = finite.sum(axis=1)
+    totals = np.where(finite, values, 0.0).sum(axis=1)
+    return np.divide(totals, counts, out=np.full(len(values), np.nan), where=counts > 0)
+
+
+def forecast_metrics(y_true, y_pred, y_train=None, season=1, index=None):
+    """Scores many forecasts at once; y_true and y_pred are (series x horizon) arrays.
+
+    Returns a DataFrame with one row per series:
+    - MAPE skips zero actuals and is NaN for a series whose actuals are all zero
+    - sMAPE is 2|e| / (|y| + |yhat|), skipping points where both are zero
+    - MASE scales MAE by the in-sample seasonal-naive MAE of y_train (series x history,
+      NaN-padded if lengths differ); it is NaN when y_train is not given
+    """
+    y_true, y_pred = _as_2d(y_true), _as_2d(y_pred)
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"y_true {y_true.shape} and y_pred {y_pred.shape} must have the same shape")
+
+    errors = y_pred - y_true
+    abs_errors = np.abs(errors)
+    mae = abs_errors.mean(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(y_true != 0, abs_errors / np.abs(y_true), np.nan)
+        denom = np.abs(y_true) + np.abs(y_pred)
+        sape = np.where(denom != 0, 2 * abs_errors / denom, np.nan)
+
+    if y_train is not None:
+        y_train = _as_2d(y_train)
+        naive_mae = _nanmean_rows(np.abs(y_train[:, season:] - y_train[:, :-season]))
+        mase = np.divide(mae, naive_mae, out=np.full(len(mae), np.nan), where=naive_mae > 0)
+    else:
+        mase = np.full(len(mae), np.nan)
+
+    return pd.DataFrame({
+        'RMSE': np.sqrt((errors ** 2).mean(axis=1)),
+        'MAE': mae,
+        'MAPE': _nanmean_rows(ape),
+        'sMAPE': _nanmean_rows(sape),
+        'MASE': mase,
+    }, index=index)
+
+
+def aggregate_metrics(metrics, weights=None):
+    """Weighted mean of each metric column across series, skipping NaN entries.
+
+    weights default to equal weighting; pass e.g. each series' total actual sales
+    for volume-weighted accuracy.
+    """
+    weights = np.ones(len(metrics)) if weights is None else np.asarray(weights, dtype=float)
+    result = {}
+    for col in metrics.columns:
+        values = metrics[col].to_numpy(dtype=float)
+        valid = np.isfinite(values) & (weights > 0)
+        result[col] = float(np.average(values[valid], weights=weights[valid])) if valid.any() else np.nan
+    return result
@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import pickle
+
+from src.pipeline_runner import content_hash
+
+EXACT = 'exact'
+WARM = 'warm'
+
+
+class ModelStore:
+    """Versioned store of fitted model state, keyed by model kind, hyperparameters and training data.
+
+    Each (kind, hyperparameters) pair has its own directory holding one file per
+    training series version plus an index. lookup() returns an exact match when the
+    training data is unchanged, or a warm match when a stored version was trained
+    on a prefix of it (i.e. the series has only gained new days).
+    """
+
+    def __init__(self, base_dir=os.path.join('data', 'models'), keep=3):
+        self.base_dir = base_dir
+        self.keep = keep
+
+    def _model_dir(self, kind, hyperparams):
+        return os.path.join(self.base_dir, kind, content_hash([kind, hyperparams])[:16])
+
+    def _read_index(self, model_dir):
+        index_path = os.path.join(model_dir, 'index.json')
+        if not os.path.exists(index_path):
+            return []
+        with open(index_path, 'r') as f:
+            return json.load(f)
+
+    def _load(self, model_dir, entry):
+        with open(os.path.join(model_dir, entry['file']), 'rb') as f:
+            return pickle.load(f)
+
+    def lookup(self, kind, hyperparams, series):
+        """Returns (state, match) with match in (EXACT, WARM), or (None, None)."""
+        model_dir = self._model_dir(kind, hyperparams)
+        entries = self._read_index(model_dir)
+        data_hash = content_hash(series)
+
+        for entry in entries:
+            if entry['data_hash'] == data_hash:
+                return self._load(model_dir, entry), EXACT
+
+        # Newest version trained on a prefix of this series
+        for entry in sorted(entries, key=lambda e: e['n_obs'], reverse=True):
+            if entry['n_obs'] < len(series) and content_hash(series.iloc[:entry['n_obs']]) == entry['data_hash']:
+                return self._load(model_dir, entry), WARM
+
+        return None, None
+
+    def save(self, kind, hyperparams, series, state):
+        """Stores model state for this training series, keeping the newest versions only."""
+        model_dir = self._model_dir(kind, hyperparams)
+        os.makedirs(model_dir, exist_ok=True)
+        data_hash = content_hash(series)
+        file_name = f"{data_hash[:16]}.pkl"
+
+        tmp_path = os.path.join(model_dir, f"{file_name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(model_dir, file_name))
+
+        entries = [e for e in self._read_index(model_dir) if e['data_hash'] != data_hash]
+        entries.insert(0, {'data_hash': data_hash, 'n_obs': len(series), 'file': file_name,
+                           'created_at': time.time()})
+        for stale in entries[self.keep:]:
+            stale_path = os.path.join(model_dir, stale['file'])
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        entries = entries[:self.keep]
+
+        index_path = os.path.join(model_dir, 'index.json')
+        with open(f"{index_path}.tmp", 'w') as f:
+            json.dump(entries, f, indent=4)
+        os.replace(f"{index_path}.tmp", index_path)
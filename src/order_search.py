@@ -0,0 +1,127 @@
+import os
+import itertools
+import multiprocessing
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from src.model_store import EXACT, WARM
+from src.metrics import forecast_metrics
+
+SEARCH_CRITERIA = ('aic', 'rmse')
+
+
+def sarima_order_grid(p=range(3), d=(1,), q=range(3), P=range(2), D=(1,), Q=range(2), s=7):
+    """Returns every (order, seasonal_order) pair of the given ranges."""
+    return [((a, b, c), (A, B, C, s)) for a, b, c, A, B, C in itertools.product(p, d, q, P, D, Q)]
+
+
+def _evaluate_candidate(args):
+    train, test, order, seasonal_order, maxiter, model_store = args
+    row = {'Order': tuple(order), 'Seasonal Order': tuple(seasonal_order)}
+    # Screening fits are cached separately from full fits (which share fit_sarima's key)
+    kind = 'sarima' if maxiter is None else 'sarima_screen'
+    hyperparams = {'order': list(order), 'seasonal_order': list(seasonal_order)}
+    if maxiter is not None:
+        hyperparams['maxiter'] = maxiter
+
+    try:
+        model = SARIMAX(train['Total Sales'], order=order, seasonal_order=seasonal_order,
+                        enforce_stationarity=False, enforce_invertibility=False)
+        state, match = (None, None)
+        if model_store is not None:
+            state, match = model_store.lookup(kind, hyperparams, train['Total Sales'])
+
+        if match == EXACT:
+            results = model.smooth(state['params'])
+            converged = state.get('converged', True)
+        else:
+            fit_kwargs = {'maxiter': maxiter} if maxiter is not None else {}
+            results = model.fit(start_params=state['params'] if match == WARM else None, disp=False, **fit_kwargs)
+            converged = bool(results.mle_retvals.get('converged', True)) if results.mle_retvals else True
+            if model_store is not None:
+                model_store.save(kind, hyperparams, train['Total Sales'],
+                                 {'params': results.params.values, 'converged': converged})
+
+        y_pred = results.forecast(len(test))
+        row.update({'AIC': float(results.aic),
+                    'RMSE': float(forecast_metrics(test['Total Sales'], y_pred)['RMSE'].iloc[0]),
+                    'Converged': converged, 'Cached': match == EXACT})
+        row['Status'] = 'ok' if np.isfinite(row['AIC']) and np.isfinite(row['RMSE']) else 'failed'
+    except Exception as e:
+        row.update({'Status': 'failed', 'Error': str(e)})
+    return row
+
+
+def _map_candidates(pool, train, test, candidates, maxiter, model_store):
+    tasks = [(train, test, order, seasonal_order, maxiter, model_store) for order, seasonal_order in candidates]
+    rows = pd.DataFrame(pool.map(_evaluate_candidate, tasks, chunksize=1))
+    rows['Differencing'] = [(order[1], seasonal_order[1]) for order, seasonal_order in candidates]
+    return rows
+
+
+def _order_groups(ranked):
+    """Orders (d, D) groups of an AIC ranking by the holdout RMSE of each group's best candidate."""
+    leaders = ranked.groupby('Differencing', sort=False).head(1)
+    leaders = leaders.sort_values(['Converged', 'RMSE'], ascending=[False, True])
+    group_rank = {group: i for i, group in enumerate(leaders['Differencing'])}
+    order = np.lexsort((ranked['AIC'].to_numpy(), ~ranked['Converged'].astype(bool).to_numpy(),
+                        ranked['Differencing'].map(group_rank).to_numpy()))
+    return ranked.iloc[order]
+
+
+def search_sarima_orders(train, test, grid=None, criterion='aic', max_workers=None, model_store=None,
+                         screen_maxiter=15, aic_margin=10.0, rmse_margin=0.25):
+    """Ranks SARIMA orders on a train/test split using a process pool.
+
+    Every candidate first gets a short screening fit (screen_maxiter iterations).
+    Candidates that fail, and candidates whose screening score is clearly dominated
+    (AIC more than aic_margin above the best, or RMSE more than rmse_margin worse), are
+    pruned. The survivors are fitted to convergence and ranked by criterion; those
+    that still do not converge rank last.
+
+    AIC is not comparable across differencing orders, so with criterion='aic' pruning
+    and ranking happen within each (d, D) group, and the groups are ordered by the
+    holdout RMSE of their best candidate.
+
+    Returns a DataFrame with one row per candidate; 'Stage' is 'final', 'pruned' or 'failed'.
+    """
+    if criterion not in SEARCH_CRITERIA:
+        raise ValueError(f"Unknown criterion '{criterion}'; use one of {SEARCH_CRITERIA}")
+    grid = grid or sarima_order_grid()
+    max_workers = max_workers or min(len(grid), os.cpu_count())
+    score_col = criterion.upper()
+
+    print(f"Searching {len(grid)} SARIMA orders across {max_workers} workers...")
+    with multiprocessing.get_context().Pool(processes=max_workers) as pool:
+        screen = _map_candidates(pool, train, test, grid, screen_maxiter, model_store)
+        ok = screen['Status'] == 'ok'
+        if criterion == 'aic':
+            best = screen[score_col].where(ok).groupby(screen['Differencing']).transform('min')
+            threshold = best + aic_margin
+        else:
+            threshold = screen.loc[ok, score_col].min() * (1 + rmse_margin)
+        survivors = ok & (screen[score_col] <= threshold)
+        print(f"Screening kept {int(survivors.sum())} of {len(grid)} candidates.")
+
+        keep = [grid[i] for i in np.flatnonzero(survivors.values)]
+        final = _map_candidates(pool, train, test, keep, None, model_store) if keep else pd.DataFrame()
+
+    pruned = screen[~survivors].sort_values(score_col)
+    pruned = pruned.assign(Stage=np.where(pruned['Status'] == 'ok', 'pruned', 'failed'))
+    if len(final):
+        final['Stage'] = np.where(final['Status'] == 'ok', 'final', 'failed')
+        ranked = final[final['Stage'] == 'final'].sort_values(['Converged', score_col], ascending=[False, True])
+        if criterion == 'aic':
+            ranked = _order_groups(ranked)
+        final = pd.concat([ranked, final[final['Stage'] == 'failed']])
+
+    return pd.concat([final, pruned], ignore_index=True)
+
+
+def best_sarima_order(ranking):
+    """Returns (order, seasonal_order) of the top converged candidate of a search, or None."""
+    top = ranking[(ranking['Stage'] == 'final') & ranking['Converged'].astype(bool)]
+    if top.empty:
+        return None
+    return tuple(top.iloc[0]['Order']), tuple(top.iloc[0]['Seasonal Order'])
@@ -0,0 +1,230 @@
+import os
+import hashlib
+import pickle
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def content_hash(obj):
+    """Returns a stable hex digest of DataFrames, arrays and plain Python containers."""
+    h = hashlib.sha256()
+    _update_hash(h, obj)
+    return h.hexdigest()
+
+
+def _update_hash(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(b'df')
+        h.update(repr(list(obj.columns)).encode())
+        h.update(repr([str(dtype) for dtype in obj.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b'series')
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b'array')
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b'dict')
+        for key in sorted(obj, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            _update_hash(h, item)
+    elif obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+        h.update(repr(obj).encode())
+    else:
+        h.update(pickle.dumps(obj))
+
+
+class Stage:
+    """A pipeline step: func(*inputs, **params) -> output.
+
+    inputs are names of other stages (or of sources passed to PipelineRunner.run).
+    Bump version when the stage's code changes to invalidate cached outputs.
+
+    The cache key covers the function, version, params and the contents of the
+    inputs only. Files a stage reads on its own (e.g. a model saved on disk) are
+    not part of it; pass anything that must invalidate the cache through params.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, version=1, cache=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.version = version
+        self.cache = cache
+
+    def cache_key(self, input_hashes):
+        func_id = f"{self.func.__module__}.{getattr(self.func, '__qualname__', repr(self.func))}"
+        return content_hash([self.name, func_id, self.version, self.params,
+                             [input_hashes[name] for name in self.inputs]])
+
+
+def _run_stage(func, args, params):
+    return func(*args, **params)
+
+
+class PipelineRunner:
+    """Runs a DAG of stages, passing outputs in memory and caching them by content hash.
+
+    Stages whose inputs are ready run concurrently. A process pool is used by
+    default because several stages draw with matplotlib, which is not thread-safe.
+    The cache keeps the max_cached_per_stage most recently used outputs of each stage.
+    """
+
+    def __init__(self, stages, cache_dir=os.path.join('data', 'cache'), max_workers=None,
+                 executor='process', use_cache=True, max_cached_per_stage=2):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.max_cached_per_stage = max_cached_per_stage
+        self.max_workers = max_workers
+        self.executor = executor
+        self.use_cache = use_cache
+        self.skipped = []
+        self.executed = []
+        self._validate()
+
+    def _validate(self):
+        # Detect cycles with a depth-first walk over the stage graph
+        state = {}
+
+        def visit(name):
+            if state.get(name) == 'active':
+                raise ValueError(f"Pipeline has a cycle through stage '{name}'")
+            if state.get(name) == 'done' or name not in self.stages:
+                return
+            state[name] = 'active'
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            state[name] = 'done'
+
+        for name in self.stages:
+            visit(name)
+
+    def _cache_path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage.name}-{key[:16]}.pkl")
+
+    def _load_cached(self, stage, key):
+        path = self._cache_path(stage, key)
+        if not (self.use_cache and stage.cache and os.path.exists(path)):
+            return None
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+        # Mark as recently used for _prune_cache
+        os.utime(path)
+        return cached
+
+    def _store_cached(self, stage, key, output, output_hash):
+        if not (self.use_cache and stage.cache):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(stage, key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((output, output_hash), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._prune_cache(stage)
+
+    def _prune_cache(self, stage):
+        """Removes all but the most recently used cached outputs of stage."""
+        prefix = f"{stage.name}-"
+        entries = [entry for entry in os.scandir(self.cache_dir)
+                   if entry.name.startswith(prefix) and entry.name.endswith('.pkl')
+                   and '-' not in entry.name[len(prefix):]]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[self.max_cached_per_stage:]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def run(self, sources=None, targets=None, progress=None):
+        """Executes the DAG and returns a dict of every stage (and source) output.
+
+        targets optionally restricts the run to the given stages and their ancestors.
+        progress, if given, is called as progress(stage, event, completed, total) with
+        event in ('running', 'cached', 'done'); an exception raised from it aborts the run.
+        """
+        results = dict(sources or {})
+        hashes = {name: content_hash(value) for name, value in results.items()}
+
+        pending = self._required_stages(targets)
+        missing = {dep for name in pending for dep in self.stages[name].inputs
+                   if dep not in self.stages and dep not in results}
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {sorted(missing)}")
+
+        self.skipped, self.executed = [], []
+        total = len(pending)
+
+        def notify(name, event):
+            if progress is not None:
+                progress(name, event, len(self.skipped) + len(self.executed), total)
+
+        pool_cls = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+        with pool_cls(max_workers=self.max_workers) as pool:
+            try:
+                self._run_pending(pool, pending, results, hashes, notify)
+            except BaseException:
+                # Do not wait for queued stages when aborting
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        return results
+
+    def _run_pending(self, pool, pending, results, hashes, notify):
+        running = {}
+        while pending or running:
+            # Resolve every stage whose inputs are available
+            ready = [n for n in pending if all(dep in results for dep in self.stages[n].inputs)]
+            if not ready and not running:
+                raise RuntimeError(f"Pipeline stalled with unresolved stages: {sorted(pending)}")
+            for name in ready:
+                stage = self.stages[name]
+                pending.remove(name)
+                key = stage.cache_key(hashes)
+                cached = self._load_cached(stage, key)
+                if cached is not None:
+                    results[name], hashes[name] = cached
+                    self.skipped.append(name)
+                    print(f"[pipeline] {name}: unchanged, using cached output")
+                    notify(name, 'cached')
+                    continue
+                print(f"[pipeline] {name}: running")
+                notify(name, 'running')
+                args = [results[dep] for dep in stage.inputs]
+                running[pool.submit(_run_stage, stage.func, args, stage.params)] = (name, key)
+
+            if not running:
+                # Cache hits may have unlocked more stages
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                output = future.result()
+                results[name] = output
+                hashes[name] = content_hash(output)
+                self._store_cached(self.stages[name], key, output, hashes[name])
+                self.executed.append(name)
+                print(f"[pipeline] {name}: done")
+                notify(name, 'done')
+
+    def _required_stages(self, targets):
+        if targets is None:
+            return set(self.stages)
+        required = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in self.stages and name not in required:
+                required.add(name)
+                stack.extend(self.stages[name].inputs)
+        return required
@@ -0,0 +1,215 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from src.aggregates import _kpis
+
+# Columns with one bitmap per value (filterable)
+FILTER_DIMENSIONS = ['Region', 'Category', 'Segment']
+# Dictionary-encoded columns that filtered aggregations can group by
+GROUP_DIMENSIONS = ['Region', 'State', 'Category', 'Segment', 'Product Name']
+MEASURES = ['Total Sales', 'Profit']
+
+# Dashboard table name -> grouping column (mirrors src.aggregates.AGGREGATE_KEYS)
+AGGREGATE_TABLES = {
+    'monthly': 'Month',
+    'region': 'Region',
+    'state': 'State',
+    'category': 'Category',
+    'product': 'Product Name',
+}
+
+
+def _pack(mask):
+    """Packs a boolean array into uint64 words (bit i of the bitmap is row i)."""
+    packed = np.packbits(mask, bitorder='little')
+    packed = np.pad(packed, (0, -len(packed) % 8))
+    return packed.view(np.uint64)
+
+
+class QueryEngine:
+    """In-memory columnar copy of the cleaned transactions for fast filtered aggregations.
+
+    Rows are sorted by date, so a date range is a contiguous row range found by binary
+    search. Each value of a filter dimension has a precomputed bitmap; a query ORs the
+    bitmaps of the selected values within a dimension, ANDs across dimensions (only
+    over the words of the date range) and reduces the matching rows with bincount
+    over dictionary codes. Rows without a date are left out.
+
+    All state is plain NumPy arrays plus small dictionaries, so save() can write it
+    as .npy files that load() maps read-only and shares between processes.
+    """
+
+    def __init__(self, df, date_col='Order Date', extra_columns=()):
+        df = df[df[date_col].notna()].sort_values(date_col, kind='stable').reset_index(drop=True)
+        self.n_rows = len(df)
+        self.dates = df[date_col].to_numpy(dtype='datetime64[ns]')
+        # Months since the first month, the key of the monthly table
+        months = self.dates.astype('datetime64[M]').astype(np.int64)
+        self.month_base = int(months.min()) if self.n_rows else 0
+        self.month_codes = (months - self.month_base).astype(np.int32)
+
+        self.codes, self.values = {}, {}
+        for col in GROUP_DIMENSIONS:
+            if col in df.columns:
+                codes, values = pd.factorize(df[col], sort=True, use_na_sentinel=False)
+                self.codes[col], self.values[col] = codes.astype(np.int32), pd.Index(values)
+
+        # One row of uint64 words per value
+        self.bitmaps = {}
+        for col in FILTER_DIMENSIONS:
+            if col in self.codes:
+                self.bitmaps[col] = np.stack([_pack(self.codes[col] == i) for i in range(len(self.values[col]))])
+
+        self.measures = {col: df[col].to_numpy(dtype=float) for col in MEASURES}
+        # Extra columns for frame(); text columns are dictionary-encoded like the dimensions
+        self.columns = {}
+        for col in extra_columns:
+            if col not in df.columns or col in self.codes or col in self.measures:
+                continue
+            if pd.api.types.is_numeric_dtype(df[col]):
+                self.columns[col] = df[col].to_numpy()
+            else:
+                codes, values = pd.factorize(df[col], sort=True, use_na_sentinel=False)
+                self.codes[col], self.values[col] = codes.astype(np.int32), pd.Index(values)
+        self.extra_columns = [col for col in extra_columns if col in df.columns]
+
+    def _arrays(self):
+        arrays = {'dates': self.dates, 'month_codes': self.month_codes}
+        for group, prefix in ((self.codes, 'codes'), (self.bitmaps, 'bitmaps'), (self.measures, 'measures'),
+                              (self.columns, 'columns')):
+            for i, array in enumerate(group.values()):
+                arrays[f'{prefix}_{i}'] = array
+        return arrays
+
+    def save(self, path):
+        """Writes the engine as one .npy file per array plus meta.json."""
+        os.makedirs(path, exist_ok=True)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(array))
+        meta = {
+            'n_rows': self.n_rows, 'month_base': self.month_base, 'extra_columns': self.extra_columns,
+            'codes': list(self.codes), 'bitmaps': list(self.bitmaps), 'measures': list(self.measures),
+            'columns': list(self.columns), 'values': {col: values.tolist() for col, values in self.values.items()},
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Opens an engine written by save(); arrays are memory-mapped unless mmap_mode is None."""
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        engine = cls.__new__(cls)
+        engine.n_rows, engine.month_base = meta['n_rows'], meta['month_base']
+        engine.extra_columns = meta['extra_columns']
+        engine.dates, engine.month_codes = array('dates'), array('month_codes')
+        for prefix in ('codes', 'bitmaps', 'measures', 'columns'):
+            setattr(engine, prefix, {col: array(f'{prefix}_{i}') for i, col in enumerate(meta[prefix])})
+        engine.values = {col: pd.Index(values) for col, values in meta['values'].items()}
+        return engine
+
+    def options(self, col):
+        """Distinct values of a dictionary-encoded column (empty if the data lacks it)."""
+        return list(self.values[col]) if col in self.values else []
+
+    def date_bounds(self):
+        if not self.n_rows:
+            return None, None
+        return pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[-1])
+
+    def select(self, filters=None):
+        """Rows matching filters, as a slice (date range only) or an array of row positions.
+
+        filters maps 'start'/'end' to dates (inclusive) and filter dimensions to lists
+        of accepted values; missing or empty entries do not filter.
+        """
+        filters = filters or {}
+        lo, hi = 0, self.n_rows
+        if filters.get('start') is not None:
+            lo = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(filters['start'])), side='left'))
+        if filters.get('end') is not None:
+            end = pd.Timestamp(filters['end']).normalize() + pd.Timedelta(days=1)
+            hi = int(np.searchsorted(self.dates, np.datetime64(end), side='left'))
+        hi = max(lo, hi)
+
+        selected = [(col, filters[col]) for col in self.bitmaps if filters.get(col)]
+        if not selected:
+            return slice(lo, hi)
+
+        # Only the words overlapping [lo, hi) take part in the intersection
+        w_lo, w_hi = lo // 64, (hi + 63) // 64
+        bits = None
+        for col, values in selected:
+            index = self.values[col].get_indexer(list(values))
+            index = index[index >= 0]
+            if len(index):
+                words = np.bitwise_or.reduce(self.bitmaps[col][index, w_lo:w_hi], axis=0)
+            else:
+                words = np.zeros(w_hi - w_lo, dtype=np.uint64)
+            bits = words if bits is None else bits & words
+
+        mask = np.unpackbits(bits.view(np.uint8), bitorder='little').view(bool)
+        offset = w_lo * 64
+        mask = mask[lo - offset:hi - offset]
+        return np.flatnonzero(mask) + lo
+
+    def count(self, filters=None):
+        rows = self.select(filters)
+        return rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+
+    def group_totals(self, rows, col, measures=None):
+        """Total Sales, Profit and order count per value of col over the selected rows.
+
+        measures can pass the measure columns already gathered for rows (shared across tables).
+        """
+        measures = measures or {col_name: self.measures[col_name][rows] for col_name in MEASURES}
+        if col == 'Month':
+            codes = self.month_codes[rows]
+            n_groups = int(self.month_codes[-1]) + 1 if self.n_rows else 0
+        else:
+            codes, n_groups = self.codes[col][rows], len(self.values[col])
+
+        orders = np.bincount(codes, minlength=n_groups)
+        totals = {col_name: np.bincount(codes, weights=measures[col_name], minlength=n_groups)
+                  for col_name in MEASURES}
+        present = np.flatnonzero(orders)
+        if col == 'Month':
+            # Month-end timestamps, like the monthly aggregate table
+            keys = (present + self.month_base + 1).astype('datetime64[M]').astype('datetime64[ns]') - np.timedelta64(1, 'D')
+            key_col = 'Order Date'
+        else:
+            keys, key_col = self.values[col][present], col
+        table = pd.DataFrame({key_col: keys})
+        for col_name in MEASURES:
+            table[col_name] = totals[col_name][present]
+        table['Orders'] = orders[present]
+        return table
+
+    def aggregate(self, filters=None):
+        """Dashboard aggregates (same tables and KPIs as src.aggregates) for the filtered rows."""
+        rows = self.select(filters)
+        measures = {col: self.measures[col][rows] for col in MEASURES}
+        aggs = {name: self.group_totals(rows, col, measures) for name, col in AGGREGATE_TABLES.items()}
+        aggs['kpis'] = _kpis(aggs['category'])
+        return aggs
+
+    def _column(self, col, rows):
+        if col in self.measures:
+            return self.measures[col][rows]
+        if col in self.columns:
+            return self.columns[col][rows]
+        values = self.values[col]
+        if values.hasnans:
+            return values.take(self.codes[col][rows])
+        return pd.Categorical.from_codes(self.codes[col][rows], categories=values)
+
+    def frame(self, filters=None, columns=None):
+        """The extra columns of the filtered rows as a DataFrame."""
+        rows = self.select(filters)
+        return pd.DataFrame({col: self._column(col, rows) for col in (columns or self.extra_columns)})
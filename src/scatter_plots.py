@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Above this many points in view, markers are drawn with WebGL (scattergl)
+WEBGL_THRESHOLD = 10_000
+# Above this many points in view, they are aggregated into 2-D bins on the server
+BIN_THRESHOLD = 200_000
+
+SUM_COLUMNS = ['n', 'sx', 'sy', 'sxx', 'sxy']
+
+
+def regression_sums(df, x, y, by=None):
+    """Sufficient statistics of a least-squares line (n, Σx, Σy, Σxx, Σxy) per group of `by`.
+
+    The sums are additive, so they can be accumulated over chunks or appended batches.
+    """
+    xv = df[x].to_numpy(dtype=float)
+    yv = df[y].to_numpy(dtype=float)
+    terms = pd.DataFrame({'n': 1.0, 'sx': xv, 'sy': yv, 'sxx': xv * xv, 'sxy': xv * yv}, index=df.index)
+    if by is None:
+        return terms.sum().to_frame('All').T
+    return terms.groupby(df[by], observed=True).sum()
+
+
+def trendlines(sums):
+    """Slope and intercept of the OLS line of every row of regression_sums(); NaN if undefined."""
+    n, sx, sy, sxx, sxy = (sums[col].to_numpy(dtype=float) for col in SUM_COLUMNS)
+    denom = n * sxx - sx * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+        intercept = (sy - slope * sx) / n
+    return pd.DataFrame({'slope': slope, 'intercept': intercept, 'n': n}, index=sums.index)
+
+
+def bin_points(x, y, x_range, y_range, bins=(80, 80)):
+    """Counts of points on a bins grid over the given ranges; returns (counts, x_centers, y_centers)."""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+    return counts, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+
+def _extent(values, value_range):
+    if value_range is not None:
+        return [float(value_range[0]), float(value_range[1])]
+    return [float(values.min()), float(values.max())] if len(values) else [0.0, 1.0]
+
+
+def scatter_figure(df, x, y, color=None, x_range=None, y_range=None, hover_name=None, trendline=True,
+                   title=None, bins=(80, 80), color_sequence=None, webgl_threshold=WEBGL_THRESHOLD,
+                   bin_threshold=BIN_THRESHOLD):
+    """Scatter plot that stays light in the browser at millions of rows.
+
+    Only rows inside x_range/y_range (the current zoom window; None is the full
+    extent) are considered. Up to webgl_threshold of them are drawn as SVG markers,
+    up to bin_threshold as WebGL markers, and beyond that the window is drawn as a
+    density heatmap binned on the server. Re-rendering with a zoomed window gives
+    finer bins and eventually individual points. Trendlines are per-group OLS fits
+    computed from sufficient statistics of the rows in the window.
+    """
+    xv, yv = df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float)
+    mask = np.isfinite(xv) & np.isfinite(yv)
+    if x_range is not None:
+        mask &= (xv >= x_range[0]) & (xv <= x_range[1])
+    if y_range is not None:
+        mask &= (yv >= y_range[0]) & (yv <= y_range[1])
+    view = df[mask]
+
+    color_sequence = color_sequence or px.colors.qualitative.Plotly
+    names = list(view[color].dropna().unique()) if color else ['All']
+    if color and isinstance(view[color].dtype, pd.CategoricalDtype):
+        names = [name for name in view[color].cat.categories if name in set(names)]
+    colors = {name: color_sequence[i % len(color_sequence)] for i, name in enumerate(names)}
+
+    fig = go.Figure()
+    if len(view) > bin_threshold:
+        x_extent, y_extent = _extent(view[x], x_range), _extent(view[y], y_range)
+        counts, x_centers, y_centers = bin_points(view[x].to_numpy(dtype=float), view[y].to_numpy(dtype=float),
+                                                  x_extent, y_extent, bins)
+        fig.add_trace(go.Heatmap(x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan).T,
+                                 colorscale='Viridis', colorbar=dict(title='Points'), name='Density'))
+    else:
+        trace_cls = go.Scattergl if len(view) > webgl_threshold else go.Scatter
+        groups = view.groupby(color, observed=True) if color else [('All', view)]
+        for name, group in groups:
+            fig.add_trace(trace_cls(x=group[x], y=group[y], mode='markers', name=str(name),
+                                    marker=dict(color=colors.get(name), opacity=0.7),
+                                    hovertext=group[hover_name] if hover_name else None))
+
+    if trendline and len(view):
+        x0, x1 = _extent(view[x], x_range)
+        lines = trendlines(regression_sums(view, x, y, color))
+        for name, line in lines.dropna().iterrows():
+            fig.add_trace(go.Scatter(x=[x0, x1], y=[line['intercept'] + line['slope'] * x0,
+                                                    line['intercept'] + line['slope'] * x1],
+                                     mode='lines', name=f"{name} trend", line=dict(color=colors.get(name), width=2)))
+
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
@@ -0,0 +1,164 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Columns that are stored as datetimes and must be re-parsed when a CSV is read back
+DATE_COLUMNS = ['Order Date', 'Ship Date']
+
+# Compact dtype of every known retail column; 'category' columns are dictionary-encoded
+# in memory and on disk. Money and rate columns stay float64 so large sums and the
+# KPIs and elasticities derived from them match unconverted data.
+COLUMN_TYPES = {
+    'Order ID': 'int32',
+    'Ship Mode': 'category',
+    'Customer ID': 'int32',
+    'Customer Name': 'category',
+    'Segment': 'category',
+    'City': 'category',
+    'State': 'category',
+    'Region': 'category',
+    'Category': 'category',
+    'Sub-Category': 'category',
+    'Product Name': 'category',
+    'Unit Price': 'float64',
+    'Quantity': 'int16',
+    'Discount': 'float64',
+    'Total Sales': 'float64',
+    'Profit': 'float64',
+    'Customer Key': 'int32',
+    'Product Key': 'int32',
+    'MonthName': 'category',
+    'DayName': 'category',
+}
+
+# Natural key -> integer surrogate key column
+KEY_COLUMNS = {
+    'Customer ID': 'Customer Key',
+    'Product Name': 'Product Key',
+}
+
+
+def dictionary_columns(columns):
+    """Known categorical columns among the given ones (read back as dictionaries)."""
+    return [col for col in columns if COLUMN_TYPES.get(col) == 'category']
+
+
+def _cast(series, dtype):
+    if dtype == 'category':
+        return series.astype('category')
+    if series.isna().any():
+        # Integers with gaps cannot be narrowed without a nullable type
+        return series if dtype.startswith('int') else series.astype(dtype)
+    if dtype.startswith('int') and not pd.api.types.is_integer_dtype(series):
+        numeric = pd.to_numeric(series)
+        if not np.all(numeric == np.round(numeric)):
+            return series
+        series = numeric
+    info = np.iinfo(dtype) if dtype.startswith('int') else None
+    if info is not None and len(series) and (series.min() < info.min or series.max() > info.max):
+        return series
+    return series.astype(dtype)
+
+
+def apply_schema(df, max_category_ratio=0.5):
+    """Casts known columns to their compact dtypes and other low-cardinality text to categoricals.
+
+    Columns whose values do not fit the declared type (e.g. text customer IDs from an
+    uploaded file) are treated like undeclared columns. Columns that already have
+    their dtype are left alone, and df itself is returned when nothing changes.
+    """
+    changed = {}
+    for col in df.columns:
+        series = original = df[col]
+        dtype = COLUMN_TYPES.get(col)
+        if dtype is not None and str(series.dtype) != dtype:
+            try:
+                series = _cast(series, dtype)
+            except (ValueError, TypeError):
+                pass
+        # Unparsed date strings stay as text so pd.to_datetime still yields datetimes
+        if col not in DATE_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype) \
+                and (pd.api.types.is_string_dtype(series) or series.dtype == object):
+            if len(df) and series.nunique() / len(df) <= max_category_ratio:
+                series = series.astype('category')
+        if series is not original:
+            changed[col] = series
+
+    if not changed:
+        return df
+    df = df.copy(deep=False)
+    for col, series in changed.items():
+        df[col] = series
+    return df
+
+
+def memory_report(df):
+    """Per-column memory (MB) with pandas' default dtypes versus the compact schema."""
+    baseline = df.copy()
+    for col in baseline.columns:
+        dtype = baseline[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            baseline[col] = baseline[col].astype(object)
+        elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            baseline[col] = baseline[col].astype('int64')
+        elif pd.api.types.is_float_dtype(dtype):
+            baseline[col] = baseline[col].astype('float64')
+    compact = apply_schema(df)
+
+    report = pd.DataFrame({
+        'Default MB': baseline.memory_usage(deep=True, index=False) / 1e6,
+        'Compact MB': compact.memory_usage(deep=True, index=False) / 1e6,
+    })
+    report.loc['Total'] = report.sum()
+    report['Ratio'] = report['Default MB'] / report['Compact MB']
+    return report
+
+
+class KeyRegistry:
+    """Persistent natural-key -> integer surrogate key mappings (one dimension file per key).
+
+    Keys are dense and stable: values seen before keep their key, new values get
+    the next free integer. Call save() after assigning to persist new keys.
+    """
+
+    def __init__(self, base_dir=os.path.join('data', 'processed', 'keys')):
+        self.base_dir = base_dir
+        self._maps = {}
+
+    def _path(self, column):
+        return os.path.join(self.base_dir, f"{column.lower().replace(' ', '_')}.parquet")
+
+    def mapping(self, column):
+        if column not in self._maps:
+            path = self._path(column)
+            if os.path.exists(path):
+                dim = pd.read_parquet(path)
+                self._maps[column] = pd.Series(dim['key'].values, index=dim['value'].astype(str).values)
+            else:
+                self._maps[column] = pd.Series(dtype='int32')
+        return self._maps[column]
+
+    def assign(self, df):
+        """Adds a surrogate key column for every natural key column present in df."""
+        for column, key_column in KEY_COLUMNS.items():
+            if column not in df.columns:
+                continue
+            # Look up each distinct value once and broadcast through the factorized codes
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+            uniques = pd.Index(uniques).astype(str)
+            mapping = self.mapping(column)
+            new_values = uniques.difference(mapping.index)
+            if len(new_values):
+                start = int(mapping.max()) + 1 if len(mapping) else 1
+                mapping = pd.concat([mapping, pd.Series(np.arange(start, start + len(new_values)), index=new_values)])
+                self._maps[column] = mapping
+            df[key_column] = mapping.reindex(uniques).values.astype('int32')[codes]
+        return df
+
+    def save(self):
+        os.makedirs(self.base_dir, exist_ok=True)
+        for column, mapping in self._maps.items():
+            dim = pd.DataFrame({'value': mapping.index.astype(str), 'key': mapping.values.astype('int32')})
+            tmp_path = f"{self._path(column)}.tmp"
+            dim.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self._path(column))
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.pipeline_runner import content_hash
+from src.aggregates import AGGREGATE_KEYS, refresh_aggregates
+from src.query_engine import QueryEngine
+
+SHARED_DIR = os.path.join('data', 'shared')
+POINTER_NAME = 'CURRENT'
+# Transaction columns published next to the query engine's dimensions and measures
+PUBLISHED_COLUMNS = ['Discount', 'Profit', 'Category', 'Product Name']
+
+
+def publish_dataset(store, base_dir=SHARED_DIR, name='retail_sales_cleaned', columns=PUBLISHED_COLUMNS, keep=2):
+    """Publishes the current data version as memory-mappable files and returns its version id.
+
+    The query engine is written as .npy arrays and the dashboard aggregates as
+    uncompressed Arrow files into a new version directory; the CURRENT pointer file
+    is then swapped atomically, so readers see either the old or the new version.
+    Publishing an already published data version only moves the pointer.
+    """
+    data_version = store.data_version(name)
+    if data_version is None:
+        raise ValueError(f"Artifact '{name}' not found")
+    version = content_hash([data_version, list(columns)])[:16]
+    version_dir = os.path.join(base_dir, version)
+    os.makedirs(base_dir, exist_ok=True)
+
+    if not os.path.exists(version_dir):
+        aggs, _ = refresh_aggregates(store, name)
+        tmp_dir = tempfile.mkdtemp(prefix=f'.{version}-', dir=base_dir)
+        try:
+            QueryEngine(store.load(name), extra_columns=columns).save(os.path.join(tmp_dir, 'engine'))
+            for table in AGGREGATE_KEYS:
+                feather.write_feather(aggs[table], os.path.join(tmp_dir, f'agg_{table}.arrow'),
+                                      compression='uncompressed')
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({'data_version': data_version, 'kpis': aggs['kpis'], 'created_at': time.time()}, f)
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Another process published the same version first
+            if not os.path.exists(version_dir):
+                raise
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    pointer_path = os.path.join(base_dir, POINTER_NAME)
+    with open(f"{pointer_path}.{os.getpid()}.tmp", 'w') as f:
+        f.write(version)
+    os.replace(f"{pointer_path}.{os.getpid()}.tmp", pointer_path)
+    print(f"Published dataset version {version}.")
+
+    # Readers that still map an old version keep their open files until they move on
+    versions = sorted((entry for entry in os.scandir(base_dir) if entry.is_dir() and not entry.name.startswith('.')),
+                      key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[keep:]:
+        if entry.name != version:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    return version
+
+
+class SharedDataset:
+    """Read side of publish_dataset: maps the version CURRENT points to.
+
+    get() re-reads the pointer on every call and only remaps when it has changed,
+    so every worker process shares the same page-cache copy of the data. Readers
+    never publish; if the new version cannot be opened they keep the last one.
+    """
+
+    def __init__(self, base_dir=SHARED_DIR):
+        self.base_dir = base_dir
+        self.version = None
+        self.data_version = None
+        self.engine = None
+        self.aggs = None
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.base_dir, POINTER_NAME), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def get(self):
+        """Returns self mapped to the current version, or None if nothing is published."""
+        for _ in range(3):
+            version = self.current_version()
+            if version is None:
+                return None
+            if version == self.version:
+                return self
+            try:
+                self._open(version)
+                return self
+            except FileNotFoundError:
+                # The version was pruned between reading the pointer and opening it
+                continue
+        if self.version is not None:
+            print(f"Could not open the published dataset in {self.base_dir}; keeping version {self.version}")
+            return self
+        raise RuntimeError(f"Could not open the published dataset in {self.base_dir}")
+
+    def _open(self, version):
+        version_dir = os.path.join(self.base_dir, version)
+        with open(os.path.join(version_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        aggs = {'kpis': meta['kpis']}
+        for table in AGGREGATE_KEYS:
+            source = pa.memory_map(os.path.join(version_dir, f'agg_{table}.arrow'))
+            aggs[table] = pa.ipc.open_file(source).read_all().to_pandas()
+        self.engine = QueryEngine.load(os.path.join(version_dir, 'engine'))
+        self.aggs, self.data_version, self.version = aggs, meta['data_version'], version
@@ -0,0 +1,60 @@
+import os
+import pandas as pd
+
+from src.artifact_store import ArtifactStore
+
+
+def _orders(start, n):
+    return pd.DataFrame({
+        'Order ID': range(start, start + n),
+        'Region': ['East', 'West'] * (n // 2),
+        'Total Sales': [10.5 * i for i in range(n)],
+    })
+
+
+def test_append_and_compact_keep_every_row(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.save(_orders(1, 4), 'orders')
+    store.append(_orders(5, 2), 'orders')
+    store.append(_orders(7, 2), 'orders')
+    assert len(store.parts('orders')) == 2
+    assert store.load('orders')['Order ID'].tolist() == list(range(1, 9))
+
+    version = store.data_version('orders')
+    store.compact('orders')
+    assert store.parts('orders') == []
+    assert store.load('orders')['Order ID'].tolist() == list(range(1, 9))
+    assert store.data_version('orders') != version
+
+
+def test_append_and_compact_keep_the_index(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    daily = pd.DataFrame({'Total Sales': [1.0, 2.0]}, index=pd.date_range('2024-01-01', periods=2, name='Date'))
+    store.save(daily, 'daily', index=True)
+    store.append(pd.DataFrame({'Total Sales': [3.0]}, index=pd.DatetimeIndex(['2024-01-03'], name='Date')), 'daily')
+    store.compact('daily')
+    loaded = store.load('daily')
+    assert loaded.index.name == 'Date'
+    assert list(loaded.index) == list(pd.date_range('2024-01-01', periods=3))
+
+
+def test_find_returns_the_newest_format(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.save(_orders(1, 2), 'orders')
+    csv_store = ArtifactStore(str(tmp_path), fmt='csv')
+    csv_store.save(_orders(1, 4), 'orders')
+    parquet_path = store.path('orders')
+    os.utime(parquet_path, (0, 0))
+
+    path, fmt = store.find('orders')
+    assert fmt == 'csv'
+    assert len(store.load('orders')) == 4
+
+
+def test_remove_deletes_every_format_and_part(tmp_path):
+    store = ArtifactStore(str(tmp_path), export_csv=True)
+    store.save(_orders(1, 2), 'orders')
+    store.append(_orders(3, 2), 'orders')
+    store.remove('orders')
+    assert not store.exists('orders')
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,28 @@
+import os
+import time
+
+from src.job_queue import JobStore, FAILED, RUNNING, SUCCEEDED, process_owner
+
+
+def test_mark_interrupted_fails_only_abandoned_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    own = store.create('ingest', 'a', {})
+    dead = store.create('ingest', 'b', {})
+    remote_stale = store.create('ingest', 'c', {})
+    remote_fresh = store.create('ingest', 'd', {})
+    done = store.create('ingest', 'e', {})
+
+    host = process_owner().rpartition(':')[0]
+    # A pid above the kernel's limit cannot belong to a live process
+    store.update(dead, status=RUNNING, owner=f"{host}:{2 ** 22 + 1}")
+    store.update(remote_stale, status=RUNNING, owner='elsewhere:1', heartbeat=time.time() - 600)
+    store.update(remote_fresh, status=RUNNING, owner='elsewhere:2', heartbeat=time.time())
+    store.update(done, status=SUCCEEDED, owner=f"{host}:{2 ** 22 + 1}")
+
+    assert sorted(store.mark_interrupted(timeout=120)) == sorted([dead, remote_stale])
+    assert store.get(dead)['status'] == FAILED
+    assert store.get(remote_stale)['status'] == FAILED
+    assert store.get(own)['owner'] == f"{host}:{os.getpid()}"
+    assert store.get(own)['status'] != FAILED
+    assert store.get(remote_fresh)['status'] == RUNNING
+    assert store.get(done)['status'] == SUCCEEDED
@@ -0,0 +1,36 @@
+import numpy as np
+
+from src.metrics import forecast_metrics, aggregate_metrics
+
+
+def test_batched_metrics_match_per_series_metrics():
+    rng = np.random.default_rng(0)
+    y_true = rng.uniform(0, 100, size=(50, 14))
+    y_true[3] = 0.0
+    y_true[7, :5] = 0.0
+    y_pred = y_true + rng.normal(0, 5, size=y_true.shape)
+    y_train = rng.uniform(0, 100, size=(50, 60))
+
+    batched = forecast_metrics(y_true, y_pred, y_train=y_train, season=7)
+    for i in range(len(y_true)):
+        single = forecast_metrics(y_true[i], y_pred[i], y_train=y_train[i], season=7)
+        assert np.allclose(batched.iloc[i].to_numpy(), single.iloc[0].to_numpy(), equal_nan=True)
+
+
+def test_metrics_match_their_definitions():
+    y_true = np.array([2.0, 0.0, 4.0])
+    y_pred = np.array([1.0, 1.0, 4.0])
+    y_train = np.array([1.0, 3.0, 2.0, 6.0])
+    row = forecast_metrics(y_true, y_pred, y_train=y_train).iloc[0]
+
+    assert np.isclose(row['RMSE'], np.sqrt(2 / 3))
+    assert np.isclose(row['MAE'], 2 / 3)
+    # The zero actual is skipped by MAPE
+    assert np.isclose(row['MAPE'], (0.5 + 0.0) / 2)
+    assert np.isclose(row['sMAPE'], (2 / 3 + 2 + 0) / 3)
+    assert np.isclose(row['MASE'], (2 / 3) / np.mean([2.0, 1.0, 4.0]))
+
+
+def test_aggregate_skips_nan_series():
+    metrics = forecast_metrics([[1.0, 2.0], [0.0, 0.0]], [[1.0, 3.0], [1.0, 1.0]])
+    assert np.isclose(aggregate_metrics(metrics)['MAPE'], 0.25)
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from src.pipeline_runner import PipelineRunner, Stage
+
+
+def double(df):
+    return df * 2
+
+
+def total(df):
+    return float(df['x'].sum())
+
+
+def _runner(tmp_path, version=1):
+    stages = [
+        Stage('doubled', double, inputs=['raw'], version=version),
+        Stage('total', total, inputs=['doubled']),
+    ]
+    return PipelineRunner(stages, cache_dir=str(tmp_path), executor='thread')
+
+
+def test_unchanged_inputs_are_served_from_the_cache(tmp_path):
+    raw = pd.DataFrame({'x': [1, 2, 3]})
+    first = _runner(tmp_path)
+    assert first.run({'raw': raw})['total'] == 12.0
+    assert sorted(first.executed) == ['doubled', 'total']
+
+    second = _runner(tmp_path)
+    assert second.run({'raw': raw.copy()})['total'] == 12.0
+    assert second.executed == []
+    assert sorted(second.skipped) == ['doubled', 'total']
+
+
+def test_changed_input_or_version_reruns_the_stage(tmp_path):
+    _runner(tmp_path).run({'raw': pd.DataFrame({'x': [1, 2, 3]})})
+
+    changed = _runner(tmp_path)
+    assert changed.run({'raw': pd.DataFrame({'x': [1, 2, 4]})})['total'] == 14.0
+    assert sorted(changed.executed) == ['doubled', 'total']
+
+    bumped = _runner(tmp_path, version=2)
+    bumped.run({'raw': pd.DataFrame({'x': [1, 2, 4]})})
+    # Same output as before, so the downstream stage stays cached
+    assert bumped.executed == ['doubled']
+    assert bumped.skipped == ['total']
+
+
+def test_uncached_stages_always_run(tmp_path):
+    stages = [Stage('doubled', double, inputs=['raw'], cache=False)]
+    raw = pd.DataFrame({'x': [1]})
+    PipelineRunner(stages, cache_dir=str(tmp_path), executor='thread').run({'raw': raw})
+    runner = PipelineRunner(stages, cache_dir=str(tmp_path), executor='thread')
+    runner.run({'raw': raw})
+    assert runner.executed == ['doubled']
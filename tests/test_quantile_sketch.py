@@ -0,0 +1,29 @@
+import numpy as np
+
+from src.data_cleaner import QuantileSketch
+
+
+def test_small_input_is_exact():
+    values = np.arange(101, dtype=float)
+    sketch = QuantileSketch(k=256).update(values)
+    assert np.allclose(sketch.quantile([0.25, 0.5, 0.75]), np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def test_merged_sketches_match_one_sketch_over_the_stream():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=200_000)
+    merged = QuantileSketch(k=512)
+    for part in np.array_split(values, 7):
+        merged.merge(QuantileSketch(k=512).update(part))
+
+    assert merged.count == len(values)
+    for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+        # Rank error is roughly 1/k of the stream length
+        rank = np.searchsorted(np.sort(values), merged.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01
+
+
+def test_nans_are_ignored():
+    sketch = QuantileSketch().update([1.0, np.nan, 3.0])
+    assert sketch.count == 2
+    assert sketch.quantile(0.5) == 2.0
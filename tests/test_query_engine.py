@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.query_engine import QueryEngine
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(0)
+    n = 1000
+    return pd.DataFrame({
+        'Order Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'Region': pd.Categorical(rng.choice(['East', 'West', 'South', 'Central'], n)),
+        'Category': rng.choice(['Furniture', 'Technology', 'Office Supplies'], n),
+        'Segment': rng.choice(['Consumer', 'Corporate'], n),
+        'State': rng.choice(['Ohio', 'Texas'], n),
+        'Product Name': rng.choice(['A', 'B', 'C'], n),
+        'Total Sales': rng.uniform(1, 100, n),
+        'Profit': rng.normal(5, 10, n),
+    })
+
+
+FILTERS = [
+    {},
+    {'Region': ['East']},
+    {'Region': ['East', 'West'], 'Category': ['Technology']},
+    {'Segment': ['Corporate'], 'start': '2024-02-01', 'end': '2024-02-29'},
+    {'Region': ['South'], 'Category': ['Furniture', 'Office Supplies'], 'start': '2024-01-15'},
+    {'Region': ['Nowhere']},
+]
+
+
+def _pandas_mask(df, filters):
+    mask = pd.Series(True, index=df.index)
+    if filters.get('start'):
+        mask &= df['Order Date'] >= pd.Timestamp(filters['start'])
+    if filters.get('end'):
+        mask &= df['Order Date'] < pd.Timestamp(filters['end']) + pd.Timedelta(days=1)
+    for col in ('Region', 'Category', 'Segment'):
+        if filters.get(col):
+            mask &= df[col].isin(filters[col])
+    return mask
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_bitmap_filters_match_pandas_masks(orders, filters):
+    engine = QueryEngine(orders)
+    expected = orders[_pandas_mask(orders, filters)]
+
+    assert engine.count(filters) == len(expected)
+    frame = engine.frame(filters, columns=['Total Sales'])
+    assert np.isclose(frame['Total Sales'].sum(), expected['Total Sales'].sum())
+
+
+@pytest.mark.parametrize('filters', FILTERS[:3])
+def test_saved_engine_answers_the_same(orders, filters, tmp_path):
+    engine = QueryEngine(orders)
+    engine.save(str(tmp_path))
+    assert QueryEngine.load(str(tmp_path)).count(filters) == engine.count(filters)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.hierarchical_forecast import build_hierarchy, reconcile
+
+
+@pytest.fixture
+def hierarchy():
+    columns = pd.MultiIndex.from_tuples([
+        ('Furniture', 'East', 'New York'), ('Furniture', 'East', 'Ohio'),
+        ('Furniture', 'West', 'Oregon'), ('Technology', 'West', 'Oregon'),
+    ])
+    return build_hierarchy(pd.DataFrame(columns=columns))
+
+
+@pytest.mark.parametrize('method', ['bottom_up', 'ols', 'wls'])
+def test_reconciled_forecasts_are_coherent(hierarchy, method):
+    nodes, S = hierarchy
+    rng = np.random.default_rng(0)
+    base = rng.uniform(50, 150, size=(len(nodes), 6))
+    variances = rng.uniform(1, 10, size=len(nodes))
+
+    reconciled = reconcile(base, S, method=method, variances=variances)
+    bottom = reconciled[-S.shape[1]:]
+    assert np.allclose(reconciled, S @ bottom)
+
+
+def test_bottom_up_keeps_the_bottom_forecasts(hierarchy):
+    nodes, S = hierarchy
+    base = np.arange(len(nodes) * 2, dtype=float).reshape(len(nodes), 2)
+    assert np.allclose(reconcile(base, S, method='bottom_up')[-S.shape[1]:], base[-S.shape[1]:])
+
+
+def test_coherent_base_forecasts_are_unchanged(hierarchy):
+    nodes, S = hierarchy
+    base = S @ np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0], [7.0, 8.0]])
+    for method in ('ols', 'wls'):
+        assert np.allclose(reconcile(base, S, method=method, variances=np.arange(1, len(nodes) + 1)), base)